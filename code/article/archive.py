@@ -0,0 +1,304 @@
+from json import dump, load
+from os.path import exists, getsize
+from bisect import bisect_right
+from gzip import compress
+from hashlib import sha1
+from mmap import mmap, ACCESS_READ
+from io import BufferedReader, RawIOBase, TextIOWrapper, SEEK_SET, SEEK_CUR, SEEK_END
+from zlib import decompressobj, MAX_WBITS
+
+GZIP_MAGIC = b"\x1f\x8b"
+COMPRESSLEVEL = 6
+
+def is_archive(filepath):
+    """
+    Check whether a revision file is a block-compressed archive.
+
+    Args:
+        filepath: The path to the revision file.
+
+    Returns:
+        True if the file starts with a gzip header, else False.
+    """
+    with open(filepath, "rb") as file:
+        return file.read(2) == GZIP_MAGIC
+
+def open_revision_file(filepath, mode = "rb"):
+    """
+    Open a revision file for reading, decompressing it transparently if it is an archive.
+    Offsets used with seek and tell always refer to the uncompressed line JSON.
+
+    Args:
+        filepath: The path to the revision file.
+        mode: 'rb' for bytes or 'r' for strings.
+
+    Returns:
+        A file object.
+    """
+    if not is_archive(filepath):
+        return open(filepath, mode)
+    file = BufferedReader(Archive(filepath))
+    return file if "b" in mode else TextIOWrapper(file, encoding="utf-8")
+
+def revision_file_size(filepath):
+    """
+    Get the size of the uncompressed line JSON of a revision file.
+
+    Args:
+        filepath: The path to the revision file.
+
+    Returns:
+        The size in bytes.
+    """
+    if not is_archive(filepath):
+        return getsize(filepath)
+    with Archive(filepath) as archive:
+        return archive.uncompressed_size()
+
+def line_digest(filepath, end, length):
+    """
+    Hash the line of the uncompressed line JSON of a revision file that ends at the given offset,
+    e.g. the last line indexed, to check whether the file was only appended to since.
+
+    Args:
+        filepath: The path to the revision file.
+        end: The offset the line ends at.
+        length: The length of the line in bytes.
+
+    Returns:
+        The hex digest; None if the file ends before the offset.
+    """
+    with open_revision_file(filepath) as file:
+        file.seek(end - length)
+        line = file.read(length)
+    return sha1(line).hexdigest() if len(line) == length else None
+
+def map_revision_file(filepath):
+    """
+    Map a revision file into memory read-only. The mapping is backed by the page cache,
+    so processes mapping the same file share its pages rather than each buffering a copy.
+
+    Args:
+        filepath: The path to the revision file.
+
+    Returns:
+        An mmap object; None if the file is empty or an archive, which cannot be mapped.
+    """
+    if not getsize(filepath) or is_archive(filepath):
+        return None
+    with open(filepath, "rb") as file:
+        return mmap(file.fileno(), 0, access=ACCESS_READ)
+
+def write_archive(lines, filepath, blocksize = 100, mode = "w"):
+    """
+    Write revision lines to a block-compressed archive,
+    i.e. a sequence of gzip members of blocksize lines each.
+
+    Args:
+        lines: An iterable of line JSON strings ending with a line break.
+        filepath: The path to the archive.
+        blocksize: The number of revisions per block.
+        mode: 'w' to write a new archive, 'a' to append blocks to an existing one.
+    """
+    with open(filepath, mode + "b") as file:
+        block = []
+        for line in lines:
+            block.append(line)
+            if len(block) == blocksize:
+                file.write(compress("".join(block).encode("utf-8"), COMPRESSLEVEL))
+                block = []
+        if block:
+            file.write(compress("".join(block).encode("utf-8"), COMPRESSLEVEL))
+
+class Archive(RawIOBase):
+    """
+    Read-only view of the line JSON of a block-compressed revision file.
+
+    The archive is a sequence of gzip members, each holding a block of revision lines,
+    so that it remains readable with gzip and can be appended to block by block.
+    The block index is saved next to the archive as <filepath>_blocks.json and
+    holds one entry per block:
+        [offset, length, uncompressed_offset, uncompressed_length]
+    It is updated whenever the size of the archive has changed; the digest of the last block
+    indexed tells whether blocks were only appended or whether the index needs to be rebuilt. Reading at an uncompressed
+    offset decompresses only the block containing it; the last block read is kept.
+
+    Attributes:
+        filepath: The path to the archive.
+        blockspath: The path to the block index.
+        size: The size of the archive in bytes when the block index was last updated.
+        blocks: The block index entries in the order of the archive.
+        tail: The hex digest of the last block indexed.
+        position: The current uncompressed read position.
+        block: Tuple of number and uncompressed data of the last block read.
+        starts: The uncompressed offsets of all blocks.
+    """
+    OFFSET = 0
+    LENGTH = 1
+    UNCOMPRESSED_OFFSET = 2
+    UNCOMPRESSED_LENGTH = 3
+
+    def __init__(self, filepath):
+        """
+        Args:
+            filepath: The path to the archive.
+        """
+        super().__init__()
+        self.filepath = filepath
+        self.blockspath = filepath + "_blocks.json"
+        self.size = 0
+        self.blocks = []
+        self.tail = None
+        if exists(self.blockspath):
+            try:
+                with open(self.blockspath) as file:
+                    blocks = load(file)
+                self.size = blocks["size"]
+                self.blocks = blocks["blocks"]
+                self.tail = blocks["tail"]
+            except (ValueError, KeyError):
+                self.size = 0
+                self.blocks = []
+                self.tail = None
+        self.update()
+        self.starts = [block[self.UNCOMPRESSED_OFFSET] for block in self.blocks]
+        self.position = 0
+        self.block = (None, b"")
+
+    def update(self):
+        """
+        Update the block index if the archive changed since it was last indexed.
+        Blocks appended to the archive are indexed incrementally, any other change triggers a rebuild.
+
+        Returns:
+            True if the block index was updated, else False.
+        """
+        size = getsize(self.filepath)
+        appended = self._appended()
+        if size == self.size and appended:
+            return False
+        if size < self.size or not appended:
+            self.size = 0
+            self.blocks = []
+            self.tail = None
+        uncompressed_offset = self.uncompressed_size()
+        with open(self.filepath, "rb") as file:
+            file.seek(self.size)
+            offset = self.size
+            decompressor = decompressobj(16 + MAX_WBITS)
+            uncompressed_length = 0
+            length = 0
+            while True:
+                data = file.read(1024**2)
+                if not data:
+                    break
+                while data:
+                    uncompressed_length += len(decompressor.decompress(data))
+                    length += len(data) - len(decompressor.unused_data)
+                    if not decompressor.eof:
+                        break
+                    self.blocks.append([offset, length, uncompressed_offset, uncompressed_length])
+                    offset += length
+                    uncompressed_offset += uncompressed_length
+                    data = decompressor.unused_data
+                    decompressor = decompressobj(16 + MAX_WBITS)
+                    uncompressed_length = 0
+                    length = 0
+        # An incomplete block of an archive that is currently being written is not indexed.
+        self.size = offset
+        self.tail = self._block_digest(len(self.blocks) - 1) if self.blocks else None
+        self.save()
+        return True
+
+    def save(self):
+        """
+        Save block index to file.
+        """
+        with open(self.blockspath, "w") as file:
+            dump({"size":self.size, "blocks":self.blocks, "tail":self.tail}, file)
+
+    def _appended(self):
+        """
+        Check whether the last block indexed is still in place,
+        i.e. whether blocks were only appended to the archive.
+
+        Returns:
+            True if the last block indexed is unchanged, else False.
+        """
+        if not self.size:
+            return True
+        if not self.blocks or self.tail is None:
+            return False
+        return self._block_digest(len(self.blocks) - 1) == self.tail
+
+    def _block_digest(self, number):
+        """
+        Hash the compressed data of a block.
+
+        Args:
+            number: The number of the block in the archive.
+
+        Returns:
+            The hex digest; None if the archive ends before the end of the block.
+        """
+        offset, length = self.blocks[number][self.OFFSET], self.blocks[number][self.LENGTH]
+        with open(self.filepath, "rb") as file:
+            file.seek(offset)
+            data = file.read(length)
+        return sha1(data).hexdigest() if len(data) == length else None
+
+    def uncompressed_size(self):
+        """
+        Get the size of the indexed line JSON.
+
+        Returns:
+            The size in bytes.
+        """
+        if not self.blocks:
+            return 0
+        return self.blocks[-1][self.UNCOMPRESSED_OFFSET] + self.blocks[-1][self.UNCOMPRESSED_LENGTH]
+
+    def read_block(self, number):
+        """
+        Decompress a block.
+
+        Args:
+            number: The number of the block in the archive.
+
+        Returns:
+            The uncompressed data of the block.
+        """
+        if self.block[0] != number:
+            offset, length = self.blocks[number][self.OFFSET], self.blocks[number][self.LENGTH]
+            with open(self.filepath, "rb") as file:
+                file.seek(offset)
+                self.block = (number, decompressobj(16 + MAX_WBITS).decompress(file.read(length)))
+        return self.block[1]
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence = SEEK_SET):
+        if whence == SEEK_CUR:
+            offset += self.position
+        elif whence == SEEK_END:
+            offset += self.uncompressed_size()
+        self.position = max(offset, 0)
+        return self.position
+
+    def readinto(self, buffer):
+        if not self.blocks or self.position >= self.uncompressed_size():
+            return 0
+        number = bisect_right(self.starts, self.position) - 1
+        data = self.read_block(number)
+        start = self.position - self.blocks[number][self.UNCOMPRESSED_OFFSET]
+        length = min(len(buffer), len(data) - start)
+        buffer[:length] = data[start:start + length]
+        self.position += length
+        return length
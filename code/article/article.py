@@ -1,12 +1,42 @@
 from .revision.revision import Revision
+from .revision.timestamp import Timestamp, timestamp_column
+from .revision.lazyrevision import HEAVY_FIELDS, LazyRevision
+from .revisionindex import RevisionIndex
+from .metadata import Metadata
+from .statistics import Statistics
+from .extraction import Extraction
+from .sectionhistory import SectionHistory
+from .archive import map_revision_file, open_revision_file
+from .delta import apply_delta, is_delta
 from os.path import basename, exists, sep
 from os import makedirs
 from json import loads, dump
+from functools import reduce
+from multiprocessing import Pool
 import matplotlib.pyplot as plt
 from unicodedata import normalize
 #from Levenshtein import distance
 from urllib.parse import unquote
 
+def map_shard(filepath, first, final, func, reducer = None, lazy = False):
+    """
+    Applies a function to a range of revisions of an article, e.g. in a worker process.
+
+    Args:
+        filepath: The path to the JSON file.
+        first: First revision index of the shard.
+        final: Final revision index of the shard.
+        func: Function taking a revision and returning its features.
+        reducer: Optional function combining two results into one.
+        lazy: Decode wikitext and html only on first access.
+
+    Returns:
+        The list of results in the order of the revisions if no reducer is provided,
+        else the reduced result.
+    """
+    results = (func(revision) for revision in Article(filepath).yield_revisions(lazy, first, final))
+    return reduce(reducer, results) if reducer else list(results)
+
 class Article:
     """
     Reads line JSON file of revision history of Wikipedia article and
@@ -17,6 +47,10 @@ class Article:
         filename: The name of the JSON file.
         name: The name of the article.
         timestamps: The timestamps of all revisions.
+        revision_index: The byte-offset index of the JSON file, loaded on first use.
+        revision_metadata: The columnar metadata store of the JSON file, loaded on first use.
+        revision_statistics: The cached revision statistics of the JSON file, loaded on first use.
+        revision_mapping: The read-only memory map of the JSON file, mapped on first random access.
     """
     def __init__(self, filepath):
         """
@@ -27,13 +61,143 @@ class Article:
         self.filename = basename(filepath)
         self.name = unquote(" ".join(self.filename.split("_")[:-1]))
         self.timestamps = []
+        self.revision_index = None
+        self.revision_metadata = None
+        self.revision_statistics = None
+        self.revision_mapping = None
+
+    def get_index(self):
+        """
+        Get the byte-offset index of the JSON file.
+        The index is built on first use and updated if the file has changed.
+
+        Returns:
+            A RevisionIndex.
+        """
+        if self.revision_index is None:
+            self.revision_index = RevisionIndex(self.filepath)
+        self.revision_index.update()
+        return self.revision_index
+
+    def metadata(self):
+        """
+        Get the columnar metadata store of the JSON file, i.e. index, revid, parentid,
+        user, userid, timestamp, size, minor and comment of all revisions.
+        The store is built on first use and updated if the file has changed.
+
+        Returns:
+            A Metadata object.
+        """
+        if self.revision_metadata is None:
+            self.revision_metadata = Metadata(self.filepath)
+        self.revision_metadata.update()
+        return self.revision_metadata
+
+    def statistics(self):
+        """
+        Get the revision statistics of the JSON file, i.e. timestamps, revisions per month,
+        size differences and revisions per editor.
+        The statistics are computed on first use and recomputed if the file has changed.
+
+        Returns:
+            A Statistics object.
+        """
+        if self.revision_statistics is None:
+            self.revision_statistics = Statistics(self.filepath)
+        if not self.revision_statistics.current():
+            self.revision_statistics.update(self.metadata())
+        return self.revision_statistics
+
+    def get_timestamp_column(self):
+        """
+        Get the timestamps of all revisions of the JSON file as NumPy column,
+        e.g. to bucket revisions by month with column.astype("datetime64[M]").
+
+        Returns:
+            A NumPy array of dtype datetime64[s].
+        """
+        return timestamp_column(self.metadata()["timestamp"].tolist())
+
+    def extraction(self, update = False, source_cache = None):
+        """
+        Get the values extracted from the HTML of the revisions of the JSON file,
+        i.e. text, sources with their titles, authors, DOIs and PMIDs, and categories.
+
+        Args:
+            update: Extract the revisions not yet extracted.
+            source_cache: A SourceCache to look up the features of sources already seen when extracting.
+
+        Returns:
+            An Extraction object.
+        """
+        extraction = Extraction(self.filepath, self.filename.split("_")[-1], source_cache)
+        if update:
+            extraction.update(self)
+        return extraction
+
+    def section_history(self, update = False):
+        """
+        Get the change history of the sections of the revisions of the JSON file,
+        i.e. the revisions in which the content hash of each section changed.
+
+        Args:
+            update: Add the revisions not yet in the history.
+
+        Returns:
+            A SectionHistory object.
+        """
+        section_history = SectionHistory(self.filepath)
+        if update:
+            section_history.update(self)
+        return section_history
+
+    def yield_extracted_revisions(self, first = 0, final = float("inf")):
+        """
+        Provides an iterator over the extracted revisions from first to final (both included)
+        if the extraction is current, else over the revisions on file, which provide the same getters.
+        Will iterate over all revisions if no range provided.
+
+        Args:
+            first: First revision index to yield.
+            final: Final revision index to yield.
+
+        Yields:
+            An ExtractedRevision or Revision.
+        """
+        extraction = self.extraction()
+        if extraction.current():
+            yield from extraction.yield_revisions(first = first, final = final)
+        else:
+            yield from self.yield_revisions(first = first, final = final)
+
+    def get_mapping(self, size = None):
+        """
+        Get the read-only memory map of the JSON file, used to slice revision lines
+        at the offsets of the index without buffered reads.
+        The file is remapped if the map is shorter than required; the previous map
+        is left to generators still reading from it and released once they are done.
+
+        Args:
+            size: The number of bytes the map must cover; the indexed size of the file if None.
+
+        Returns:
+            An mmap object; None if the file cannot be mapped, e.g. if it is an archive.
+        """
+        if size is None:
+            size = self.get_index().size
+        if self.revision_mapping is None or len(self.revision_mapping) < size:
+            self.revision_mapping = map_revision_file(self.filepath)
+        return self.revision_mapping
+
+    def close(self):
+        """
+        Release the memory map of the JSON file.
+        Generators still reading from the map keep it until they are done.
+        """
+        self.revision_mapping = None
 
     def get_revision_count(self):
-        revision_count = 0
-        with open(self.filepath) as file:
-            for line in file:
-                revision_count += 1
-        return revision_count
+        return len(self.get_index())
 
     def get_revisions(self, first = 0, final = float("inf")):
         """
@@ -47,49 +211,215 @@ class Article:
         Returns:
             A list of revisions.
         """
-        revisions = []
-        with open(self.filepath) as file:
-            for line in enumerate(file):
-                if line[0] < first:
-                    continue
-                if line[0] > final:
-                    break
-                revision = loads(line[1])
-                revisions.append(Revision(**revision))
+        revisions = list(self.yield_revisions(first = first, final = final))
         self.timestamps = [revision.timestamp.string for revision in revisions]
         return revisions
 
-    def get_revision(self, index = None, revid = None):
+    def get_revision(self, index = None, revid = None, timestamp = None):
         """
-        Gets the first revision on file with the provided index or revid.
+        Gets the first revision on file with the provided index, revid or timestamp.
 
         Args:
             index: The index of the revision.
             revid: The revid of the revision.
+            timestamp: The timestamp string of the revision, i.e. YYYY-MM-DDTHH:MM:SSZ.
 
         Returns:
-            A revision; None if neither index or revid match.
+            A revision; None if neither index, revid or timestamp match.
         """
-        revisions = self.yield_revisions()
-        revision = next(revisions)
-        while revision:
-            if revision.index == index:
-                return revision
-            if revision.revid == revid:
-                return revision
-            revision = next(revisions)
+        entry = self.get_index().entry(index, revid, timestamp)
+        if entry:
+            return self.read_revision(entry)
+
+    def revision_at(self, timestamp):
+        """
+        Gets the revision live at the provided time, i.e. the last revision not after it.
+
+        Args:
+            timestamp: A Timestamp or timestamp string, i.e. YYYY-MM-DDTHH:MM:SSZ.
+
+        Returns:
+            A revision; None if the time precedes the first revision.
+        """
+        index = self.get_index()
+        position = index.position_at(self._timestamp_string(timestamp))
+        if position is not None:
+            return self.read_revision(index.entries[position])
+
+    def revisions_between(self, start, end):
+        """
+        Gets all revisions from start to end (both included).
 
-    def yield_revisions(self):
+        Args:
+            start: A Timestamp or timestamp string, i.e. YYYY-MM-DDTHH:MM:SSZ.
+            end: A Timestamp or timestamp string, i.e. YYYY-MM-DDTHH:MM:SSZ.
+
+        Returns:
+            A list of revisions in chronological order.
         """
-        Provides an iterartor over all revisions on file.
+        index = self.get_index()
+        positions = index.positions_between(self._timestamp_string(start), self._timestamp_string(end))
+        if positions and positions == list(range(positions[0], positions[-1] + 1)):
+            return self.get_revisions(positions[0], positions[-1])
+        return [self.read_revision(index.entries[position]) for position in positions]
+
+    def _timestamp_string(self, timestamp):
+        return timestamp.timestamp_string() if isinstance(timestamp, Timestamp) else timestamp
+
+    def read_revision(self, entry, lazy = False):
+        """
+        Reads the revision of the index entry provided from file.
+
+        Args:
+            entry: An entry of the RevisionIndex.
+            lazy: Decode wikitext and html only on first access;
+                  delta-encoded revisions are always decoded.
+
+        Returns:
+            A revision.
+        """
+        if entry[RevisionIndex.KEYFRAME] != entry[RevisionIndex.OFFSET]:
+            index = self.get_index()
+            previous = {}
+            for line in self._read_lines(index.entries[index.offsets[entry[RevisionIndex.KEYFRAME]]:
+                                                       index.offsets[entry[RevisionIndex.OFFSET]] + 1]):
+                revision = self._reconstruct(loads(line), previous)
+            return Revision(**revision)
+        line = next(self._read_lines([entry]))
+        if lazy:
+            return LazyRevision(line, entry[RevisionIndex.SPANS])
+        return Revision(**loads(line))
+
+    def yield_revisions(self, lazy = False, first = 0, final = float("inf")):
+        """
+        Provides an iterartor over the revisions from first to final (both included).
+        Will iterate over all revisions on file if no range provided.
+
+        Args:
+            lazy: Decode wikitext and html only on first access,
+                  using the spans recorded in the index;
+                  revisions of delta-encoded files are always decoded.
+            first: First revision index to yield.
+            final: Final revision index to yield.
 
         Yields:
             A revision.
         """
-        with open(self.filepath) as file:
-            for line in file:
-                revision = loads(line)
-                yield Revision(**revision)
+        if not lazy and first == 0 and final == float("inf"):
+            previous = {}
+            with open_revision_file(self.filepath, "r") as file:
+                for line in file:
+                    revision = self._reconstruct(loads(line), previous)
+                    yield Revision(**revision)
+            return
+        entries = self.get_index().entries
+        final = min(final, len(entries) - 1)
+        if first > final:
+            return
+        if lazy and all(entry[RevisionIndex.KEYFRAME] == entry[RevisionIndex.OFFSET] for entry in entries[first:final + 1]):
+            for entry, line in zip(entries[first:final + 1], self._read_lines(entries[first:final + 1])):
+                yield LazyRevision(line, entry[RevisionIndex.SPANS])
+        else:
+            # Delta-encoded revisions are reconstructed from the preceding keyframe on.
+            start = first
+            while entries[start][RevisionIndex.OFFSET] != entries[first][RevisionIndex.KEYFRAME]:
+                start -= 1
+            previous = {}
+            for position, line in enumerate(self._read_lines(entries[start:final + 1]), start):
+                revision = self._reconstruct(loads(line), previous)
+                if position >= first:
+                    yield Revision(**revision)
+
+    def _read_lines(self, entries):
+        """
+        Reads the lines of consecutive index entries, slicing them out of the memory map
+        of the JSON file if it can be mapped.
+
+        Args:
+            entries: Consecutive entries of the RevisionIndex.
+
+        Yields:
+            A line JSON string.
+        """
+        mapping = self.get_mapping(entries[-1][RevisionIndex.OFFSET] + entries[-1][RevisionIndex.LENGTH]) if entries else None
+        if mapping is not None:
+            for entry in entries:
+                offset = entry[RevisionIndex.OFFSET]
+                # Decoding straight from a view of the map avoids copying the line to bytes first.
+                yield str(memoryview(mapping)[offset:offset + entry[RevisionIndex.LENGTH]], "utf-8")
+        else:
+            with open_revision_file(self.filepath) as file:
+                if entries:
+                    file.seek(entries[0][RevisionIndex.OFFSET])
+                for entry in entries:
+                    yield file.read(entry[RevisionIndex.LENGTH]).decode("utf-8")
+
+    def shards(self, number):
+        """
+        Splits the revisions on file into contiguous ranges of about equal byte size.
+
+        Args:
+            number: The maximum number of shards.
+
+        Returns:
+            A list of tuples of first and final revision index of each shard.
+        """
+        entries = self.get_index().entries
+        if not entries:
+            return []
+        size = entries[-1][RevisionIndex.OFFSET] + entries[-1][RevisionIndex.LENGTH]
+        shards = []
+        first = 0
+        for position, entry in enumerate(entries):
+            end = entry[RevisionIndex.OFFSET] + entry[RevisionIndex.LENGTH]
+            if end >= size * (len(shards) + 1) / number or position == len(entries) - 1:
+                shards.append((first, position))
+                first = position + 1
+        return shards
+
+    def map_revisions(self, func, reducer = None, workers = 1, lazy = False):
+        """
+        Applies a function to all revisions on file, splitting the file into byte-range
+        shards that are processed in a pool of worker processes.
+        Only the results of the function are sent back from the workers, never the revisions.
+
+        Args:
+            func: Picklable function taking a revision and returning its features.
+            reducer: Optional picklable, associative function combining two results into one;
+                     each shard is reduced by its worker before the shard results are reduced.
+            workers: The number of worker processes; no pool is started if 1.
+            lazy: Decode wikitext and html only on first access.
+
+        Returns:
+            The list of results in the order of the revisions if no reducer is provided,
+            else the reduced result; None if there are no revisions.
+        """
+        shards = [(self.filepath, first, final, func, reducer, lazy) for first, final in self.shards(workers * 4)]
+        if workers > 1:
+            with Pool(workers) as pool:
+                results = pool.starmap(map_shard, shards)
+        else:
+            results = [map_shard(*shard) for shard in shards]
+        if reducer:
+            return reduce(reducer, results) if results else None
+        return [result for shard_results in results for result in shard_results]
+
+    def _reconstruct(self, revision, previous):
+        """
+        Reconstructs the heavy fields of a delta-encoded revision from those of its predecessor.
+
+        Args:
+            revision: The dictionary of a revision as on file.
+            previous: The heavy fields of the predecessor; updated to those of the revision.
+
+        Returns:
+            The dictionary of the revision with all heavy fields in full.
+        """
+        for field in HEAVY_FIELDS:
+            if is_delta(revision.get(field)):
+                revision[field] = apply_delta(previous[field], revision[field])
+            previous[field] = revision.get(field)
+        return revision
 
     def bibliography_analysis(self, clean_titles = False):
         """
@@ -102,7 +432,7 @@ class Article:
         Args:
             clean_titles: Clean near-duplicate titles if set to True.
         """
-        revisions = self.yield_revisions()
+        revisions = self.yield_extracted_revisions()
 
         revision = next(revisions, None)
 
@@ -211,7 +541,6 @@ class Article:
                             ...}).
             directory: The directory to which the file will be written.
         """
-        revisions = self.get_revisions()
         bibkey = track[0]
         bibkey_value_dictionary = track[1]
         filename = self.name.lower() + "_wikipedia_revision_history_" + bibkey + ".txt"
@@ -231,7 +560,7 @@ class Article:
                            ...}).
             directory: The directory to which the plot will be saved.
         """
-        revisions = self.get_revisions()
+        self.timestamps = [Timestamp(timestamp).string for timestamp in self.statistics().timestamps]
         track_name = track[0]
         value_dictionary = track[1]
         plt.figure(figsize=(int(len(self.timestamps) * 0.15), int(len(value_dictionary)) * 0.12), dpi=75)
@@ -254,22 +583,7 @@ class Article:
         Args:
             directory: The directory to which the plot will be saved.
         """
-        revisions = self.yield_revisions()
-        revision = next(revisions, None)
-        first_year = revision.timestamp.year
-        while True:
-            next_revision = next(revisions, None)
-            if next_revision:
-                revision = next_revision
-            else:
-                break
-        final_year = revision.timestamp.year
-        distribution = {}
-        for year in range(first_year, final_year + 1):
-            for month in range(1, 13):
-                distribution[str(year) + "/" + str(month).rjust(2, "0")] = 0
-        for revision in self.yield_revisions():
-            distribution[str(revision.timestamp.year) + "/" + str(revision.timestamp.month).rjust(2, "0")] += 1
+        distribution = self.statistics().months
 
         plt.figure(figsize=(int(len(distribution) * 0.15), 10), dpi=150)
         plt.title(self.name + " Revision Distribition")
@@ -289,14 +603,7 @@ class Article:
         Returns:
             A list of n integers for the size difference between all n revisions on file. Value for first revision is set to revision.size
         """
-        revisions = self.yield_revisions()        
-        revision = next(revisions)
-        size_differences = [revision.size]
-        for next_revision in revisions:
-            size_differences.append(next_revision.size - revision.size)
-            revision = next_revision
-
-        return size_differences
+        return self.statistics().size_differences
 
     def plot_revision_size_difference_to_file(self, directory):
         """
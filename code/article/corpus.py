@@ -0,0 +1,196 @@
+from .article import Article
+from .revisionindex import RevisionIndex
+from .archive import revision_file_size
+from glob import glob
+from json import dump, load
+from multiprocessing import Pool
+from os.path import basename, exists, getmtime, getsize, sep
+
+def catalog_entry(filepath):
+    """
+    Build the catalog entry of an article file from its index, see Corpus.
+
+    Args:
+        filepath: The path to the article file.
+
+    Returns:
+        The dictionary of the catalog entry.
+    """
+    index = Article(filepath).get_index()
+    entries = index.entries
+    return {"size":getsize(filepath),
+            "mtime":getmtime(filepath),
+            "count":len(entries),
+            "first":entries[0][RevisionIndex.TIMESTAMP] if entries else None,
+            "last":entries[-1][RevisionIndex.TIMESTAMP] if entries else None,
+            "indexed":index.size}
+
+def apply_and_catalog(filepath, func, args, stale):
+    """
+    Applies a function to an article file and builds its catalog entry if it is stale,
+    so that the catalog is updated by the processes that open the articles anyway.
+
+    Args:
+        filepath: The path to the article file.
+        func: Function taking a filepath and args.
+        args: Tuple of further arguments to func.
+        stale: Whether the catalog entry of the article file is stale.
+
+    Returns:
+        A tuple of the result of func and the catalog entry; None if not stale.
+    """
+    result = func(filepath, *args)
+    return result, catalog_entry(filepath) if stale else None
+
+class Corpus:
+    """
+    Catalog of the line JSON files of revision histories in an article directory.
+
+    The catalog is saved in the directory as corpus.json and holds one entry per article file:
+        {"size", "mtime", "count", "first", "last", "indexed"}
+    i.e. size in bytes and modification time of the file when catalogued, the number of revisions,
+    the timestamp strings of the first and last revision and the size of the file covered by its index.
+    Entries of files that changed since they were catalogued are updated on update()
+    and by the worker processes of map_articles().
+
+    Attributes:
+        directory: The path to the article directory.
+        language: The language suffix of the article files, e.g. 'en'.
+        catalogpath: The path to the catalog file.
+        catalog: Maps article filenames to catalog entries.
+    """
+    def __init__(self, directory, language = "en"):
+        """
+        Args:
+            directory: The path to the article directory.
+            language: The language suffix of the article files.
+        """
+        self.directory = directory
+        self.language = language
+        self.catalogpath = directory + sep + "corpus.json"
+        self.catalog = {}
+        if exists(self.catalogpath):
+            try:
+                with open(self.catalogpath) as file:
+                    self.catalog = load(file)
+            except ValueError:
+                self.catalog = {}
+
+    def __len__(self):
+        return len(self.catalog)
+
+    def filepaths(self):
+        """
+        Get the paths to all article files in the directory.
+
+        Returns:
+            A sorted list of filepaths.
+        """
+        return sorted(glob(self.directory + sep + "*_" + self.language))
+
+    def stale(self):
+        """
+        Get the article files that were added or changed since they were catalogued.
+
+        Returns:
+            A list of filepaths.
+        """
+        return [filepath for filepath in self.filepaths() if not self._current(filepath)]
+
+    def update(self):
+        """
+        Catalog articles that were added or changed and drop articles that were removed.
+        The indices of added or changed articles are updated along the way.
+
+        Returns:
+            True if the catalog was updated, else False.
+        """
+        filepaths = self.filepaths()
+        filenames = set(basename(filepath) for filepath in filepaths)
+        removed = [filename for filename in self.catalog if filename not in filenames]
+        for filename in removed:
+            del self.catalog[filename]
+        stale = [filepath for filepath in filepaths if not self._current(filepath)]
+        for filepath in stale:
+            self.catalog[basename(filepath)] = catalog_entry(filepath)
+        if removed or stale:
+            self.save()
+            return True
+        return False
+
+    def save(self):
+        """
+        Save catalog to file.
+        """
+        with open(self.catalogpath, "w") as file:
+            dump(self.catalog, file)
+
+    def fresh(self, filepath):
+        """
+        Check whether the index of an article file covers the whole file.
+
+        Args:
+            filepath: The path to the article file.
+
+        Returns:
+            True if the catalog entry is current and the index covers the file as catalogued, else False.
+        """
+        if not self._current(filepath):
+            return False
+        entry = self.catalog[basename(filepath)]
+        return exists(filepath + "_index.json") and entry["indexed"] == revision_file_size(filepath)
+
+    def schedule(self):
+        """
+        Get the article files ordered for processing, largest first,
+        so that long-running articles do not end up as stragglers.
+        The sizes are taken from the catalog where the catalog entries are current.
+
+        Returns:
+            A list of filepaths.
+        """
+        return sorted(self.filepaths(), key=lambda filepath: (-self._size(filepath), filepath))
+
+    def map_articles(self, func, args = (), workers = 1):
+        """
+        Applies a function to all article files in a pool of worker processes,
+        starting with the largest article. Articles that were added or changed
+        are catalogued by the workers along the way and the catalog is saved.
+
+        Args:
+            func: Picklable function taking a filepath and args.
+            args: Tuple of further arguments to func.
+            workers: The number of worker processes; no pool is started if 1.
+
+        Returns:
+            The list of results in the order of the sorted filepaths.
+        """
+        schedule = self.schedule()
+        stale = set(self.stale())
+        arguments = [(filepath, func, tuple(args), filepath in stale) for filepath in schedule]
+        if workers > 1:
+            with Pool(workers) as pool:
+                results = pool.starmap(apply_and_catalog, arguments, chunksize=1)
+        else:
+            results = [apply_and_catalog(*argument) for argument in arguments]
+        filenames = set(basename(filepath) for filepath in schedule)
+        self.catalog = {filename:entry for filename, entry in self.catalog.items() if filename in filenames}
+        for filepath, (_, entry) in zip(schedule, results):
+            if entry is not None:
+                self.catalog[basename(filepath)] = entry
+        self.save()
+        results = dict(zip(schedule, [result for result, _ in results]))
+        return [results[filepath] for filepath in sorted(schedule)]
+
+    def _size(self, filepath):
+        """
+        Get the size of an article file from its catalog entry if it is current, else from the file.
+        """
+        return self.catalog[basename(filepath)]["size"] if self._current(filepath) else getsize(filepath)
+
+    def _current(self, filepath):
+        """
+        Check whether the catalog entry of an article file matches its size and modification time.
+        """
+        entry = self.catalog.get(basename(filepath))
+        return entry is not None and entry["size"] == getsize(filepath) and entry["mtime"] == getmtime(filepath)
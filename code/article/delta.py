@@ -0,0 +1,154 @@
+from .revision.lazyrevision import HEAVY_FIELDS, split_revision_line
+from difflib import SequenceMatcher
+from json import dumps, loads
+from re import split
+
+KEYFRAME_INTERVAL = 50
+
+def is_delta(value):
+    """
+    Check whether a heavy field value is a delta.
+
+    Args:
+        value: The decoded value of a heavy field.
+
+    Returns:
+        True if the value is a list of delta operations, else False.
+    """
+    return isinstance(value, list)
+
+def encode_delta(old, new):
+    """
+    Encode a string as delta against its predecessor.
+
+    Common prefix and suffix are trimmed first; the remainder is
+    diffed on tokens ending with a line break or a closing angle bracket.
+
+    Args:
+        old: The predecessor string.
+        new: The string to encode.
+
+    Returns:
+        A list of delta operations, i.e. [start, end] to copy old[start:end]
+        and strings to insert.
+    """
+    prefix = _common_length(old, new, lambda string, length: string[:length])
+    suffix = _common_length(old[prefix:], new[prefix:], lambda string, length: string[len(string) - length:])
+    delta = []
+    if prefix:
+        delta.append([0, prefix])
+    old_tokens = [token for token in split(r"(?<=[>\n])", old[prefix:len(old) - suffix]) if token]
+    new_tokens = [token for token in split(r"(?<=[>\n])", new[prefix:len(new) - suffix]) if token]
+    old_starts = [prefix]
+    for token in old_tokens:
+        old_starts.append(old_starts[-1] + len(token))
+    matcher = SequenceMatcher(None, old_tokens, new_tokens, autojunk=False)
+    for operation, old_first, old_final, new_first, new_final in matcher.get_opcodes():
+        if operation == "equal":
+            _append(delta, [old_starts[old_first], old_starts[old_final]])
+        elif new_first != new_final:
+            _append(delta, "".join(new_tokens[new_first:new_final]))
+    if suffix:
+        _append(delta, [len(old) - suffix, len(old)])
+    return delta
+
+def apply_delta(old, delta):
+    """
+    Reconstruct a string from its predecessor and delta.
+
+    Args:
+        old: The predecessor string.
+        delta: A list of delta operations as returned by encode_delta.
+
+    Returns:
+        The reconstructed string.
+    """
+    return "".join(old[operation[0]:operation[1]] if isinstance(operation, list) else operation
+                   for operation in delta)
+
+def encode_revisions(lines, interval = KEYFRAME_INTERVAL):
+    """
+    Delta-encode revision lines. Every interval-th revision is kept in full as keyframe,
+    the heavy fields of all other revisions are stored as deltas against their predecessor.
+
+    Args:
+        lines: An iterable of line JSON strings of revisions without deltas.
+        interval: The number of revisions from one keyframe to the next.
+
+    Yields:
+        A line JSON string ending with a line break.
+    """
+    previous = {}
+    for position, line in enumerate(lines):
+        revision = loads(line)
+        items = []
+        for field, value in revision.items():
+            if field in HEAVY_FIELDS and position % interval and isinstance(value, str) and isinstance(previous.get(field), str):
+                # Compact separators keep ', "' unique to field boundaries.
+                items.append(dumps(field) + ": " + dumps(encode_delta(previous[field], value), separators=(",", ":")))
+            else:
+                items.append(dumps(field) + ": " + dumps(value))
+        previous = {field:revision.get(field) for field in HEAVY_FIELDS}
+        yield "{" + ", ".join(items) + "}\n"
+
+def decode_revisions(lines):
+    """
+    Reconstruct delta-encoded revision lines. Lines without deltas are passed through unchanged.
+
+    Args:
+        lines: An iterable of line JSON strings of revisions.
+
+    Yields:
+        A line JSON string ending with a line break.
+    """
+    previous = {}
+    encoded = {}
+    for line in lines:
+        revision, spans = split_revision_line(line)
+        if spans and not any(line[start] == "[" for start, end in spans.values()):
+            # Keep the encoded values; they are only decoded if a delta follows.
+            encoded = {field:line[start:end] for field, (start, end) in spans.items()}
+            yield line
+            continue
+        if encoded:
+            previous = {field:loads(value) for field, value in encoded.items()}
+            encoded = {}
+        revision = loads(line)
+        for field in HEAVY_FIELDS:
+            if is_delta(revision.get(field)):
+                revision[field] = apply_delta(previous[field], revision[field])
+        previous = {field:revision.get(field) for field in HEAVY_FIELDS}
+        yield dumps(revision) + "\n"
+
+def _common_length(old, new, part):
+    """
+    Get the length of the longest common prefix or suffix of two strings by bisection,
+    comparing parts of the strings rather than single characters.
+
+    Args:
+        old: The first string.
+        new: The second string.
+        part: Function returning the prefix or suffix of a string of a given length.
+
+    Returns:
+        The length of the longest common part.
+    """
+    low, high = 0, min(len(old), len(new))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if part(old, middle) == part(new, middle):
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+def _append(delta, operation):
+    """
+    Append an operation to a delta, merging it with the last one if possible.
+    """
+    if delta and isinstance(operation, list) and isinstance(delta[-1], list) and delta[-1][1] == operation[0]:
+        delta[-1][1] = operation[1]
+    elif delta and isinstance(operation, str) and isinstance(delta[-1], str):
+        delta[-1] += operation
+    else:
+        delta.append(operation)
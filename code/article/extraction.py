@@ -0,0 +1,177 @@
+from .revision.extractedrevision import ExtractedRevision
+from .archive import line_digest, revision_file_size
+from .revisionindex import RevisionIndex
+from json import dump, dumps, load, loads
+from os.path import exists, getsize
+
+class Extraction:
+    """
+    Values extracted from the HTML of all revisions of the line JSON file of revision history
+    of Wikipedia article, i.e. text, 'References' and 'Further Reading' with their texts, titles,
+    authors, DOIs and PMIDs, and categories, so that analyses do not have to parse the HTML again.
+
+    The extracted revisions are saved next to the revision file as <filepath>_extraction.jsonl,
+    one line per revision, and the state of the extraction as <filepath>_extraction.json.
+    Revisions appended to the revision file are extracted incrementally; the extraction is
+    redone from scratch if the last revision extracted changed, the revision file shrank
+    or the extractor version changed.
+
+    Attributes:
+        filepath: The path to the revision file.
+        extractionpath: The path to the extracted revisions.
+        statepath: The path to the state of the extraction.
+        language: The language titles and authors are extracted for, e.g. 'en'.
+        version: The extractor version of the extracted revisions.
+        size: The size of the revision file in bytes when last extracted.
+        tail: List of length and hex digest of the line of the last revision extracted; None if there is none.
+        count: The number of extracted revisions.
+        length: The size of the extracted revisions in bytes.
+        source_cache: The SourceCache looking up the features of sources already seen; None if not used.
+    """
+    VERSION = 1
+
+    def __init__(self, filepath, language, source_cache = None):
+        """
+        Args:
+            filepath: The path to the revision file.
+            language: The language titles and authors are extracted for.
+            source_cache: A SourceCache to look up the features of sources already seen.
+        """
+        self.filepath = filepath
+        self.extractionpath = filepath + "_extraction.jsonl"
+        self.statepath = filepath + "_extraction.json"
+        self.language = language
+        self.source_cache = source_cache
+        self.version = None
+        self.size = 0
+        self.tail = None
+        self.count = 0
+        self.length = 0
+        if exists(self.statepath) and exists(self.extractionpath):
+            try:
+                with open(self.statepath) as file:
+                    state = load(file)
+                if state["language"] == language and getsize(self.extractionpath) >= state["length"]:
+                    self.version = state["version"]
+                    self.size = state["size"]
+                    self.tail = state["tail"]
+                    self.count = state["count"]
+                    self.length = state["length"]
+            except (ValueError, KeyError):
+                self.version = None
+                self.size = 0
+                self.tail = None
+
+    def __len__(self):
+        return self.count
+
+    def current(self):
+        """
+        Check whether all revisions on file are extracted with the current extractor version.
+
+        Returns:
+            True if the extraction is current, else False.
+        """
+        return self.version == self.VERSION and self.size == revision_file_size(self.filepath) and self._appended()
+
+    def update(self, article):
+        """
+        Extract the revisions not yet extracted.
+
+        Args:
+            article: The Article of the revision file.
+
+        Returns:
+            True if the extraction was updated, else False.
+        """
+        if self.current():
+            return False
+        if self.version != self.VERSION or revision_file_size(self.filepath) < self.size or not self._appended():
+            self.version = self.VERSION
+            self.size = 0
+            self.tail = None
+            self.count = 0
+            self.length = 0
+        index = article.get_index()
+        with open(self.extractionpath, "r+b" if exists(self.extractionpath) else "wb") as file:
+            # Drop lines written after the last saved state, e.g. by an interrupted extraction.
+            file.truncate(self.length)
+            file.seek(self.length)
+            for revision in article.yield_revisions(first = self.count):
+                line = (dumps(self.extract(revision)) + "\n").encode("utf-8")
+                file.write(line)
+                self.length += len(line)
+                self.count += 1
+        self.size = index.size
+        self.tail = [index.entries[-1][RevisionIndex.LENGTH], index.tail] if index.entries else None
+        self.save()
+        return True
+
+    def save(self):
+        """
+        Save state of the extraction to file.
+        """
+        with open(self.statepath, "w") as file:
+            dump({"version":self.version,
+                  "language":self.language,
+                  "size":self.size,
+                  "tail":self.tail,
+                  "count":self.count,
+                  "length":self.length}, file)
+
+    def _appended(self):
+        """
+        Check whether the line of the last revision extracted is still in place,
+        i.e. whether the revision file was only appended to.
+        """
+        if not self.size:
+            return True
+        if self.tail is None:
+            return False
+        return line_digest(self.filepath, self.size, self.tail[0]) == self.tail[1]
+
+    def extract(self, revision):
+        """
+        Extract the values of a revision and release its parsed HTML.
+
+        Args:
+            revision: A Revision.
+
+        Returns:
+            The dictionary of an ExtractedRevision.
+        """
+        extracted_revision = {"revid":revision.revid,
+                              "parentid":revision.parentid,
+                              "url":revision.url,
+                              "user":revision.user,
+                              "timestamp":revision.timestamp.timestamp_string(),
+                              "size":revision.size,
+                              "index":revision.index,
+                              "text":revision.get_text(),
+                              "references":[self._extract_source(features) for features in revision.get_reference_features(self.language, self.source_cache)],
+                              "further_reading":[self._extract_source(features) for features in revision.get_further_reading_features(self.language, self.source_cache)],
+                              "categories":revision.get_categories()}
+        revision.release()
+        return extracted_revision
+
+    def yield_revisions(self, first = 0, final = float("inf")):
+        """
+        Provides an iterator over the extracted revisions from first to final (both included).
+        Will iterate over all extracted revisions if no range provided.
+
+        Args:
+            first: First revision index to yield.
+            final: Final revision index to yield.
+
+        Yields:
+            An ExtractedRevision.
+        """
+        with open(self.extractionpath, "rb") as file:
+            for position in range(min(self.count, final + 1)):
+                line = file.readline()
+                # Lines before the range are skipped without decoding them.
+                if position >= first:
+                    yield ExtractedRevision(**loads(line))
+
+    def _extract_source(self, features):
+        return {key:features[key] for key in ["text", "reference_ids", "title", "authors", "dois", "pmids"]}
@@ -0,0 +1,134 @@
+from .revision.lazyrevision import split_revision_line
+from .archive import line_digest, open_revision_file, revision_file_size
+from hashlib import sha1
+from os.path import exists
+import numpy as np
+
+class Metadata:
+    """
+    Columnar store of the revision metadata of the line JSON file of revision history of Wikipedia article.
+
+    The columns are saved as NumPy arrays next to the revision file as <filepath>_metadata.npz,
+    so analyses that only need metadata never have to decode the HTML and wikitext of the revisions.
+    The store is updated whenever the size of the revision file or its last line added has changed;
+    lines appended to the revision file are added incrementally, i.e. if the last line added is unchanged,
+    any other change triggers a rebuild.
+
+    Attributes:
+        filepath: The path to the revision file.
+        metadatapath: The path to the metadata file.
+        size: The size of the revision file in bytes when the store was last updated.
+        tail: Tuple of length and hex digest of the last line added; None if there is none.
+        columns: Dictionary of column names and NumPy arrays.
+    """
+    COLUMNS = {"index":np.int64,
+               "revid":np.int64,
+               "parentid":np.int64,
+               "user":np.str_,
+               "userid":np.int64,
+               "timestamp":np.str_,
+               "size":np.int64,
+               "minor":np.str_,
+               "comment":np.str_}
+
+    def __init__(self, filepath):
+        """
+        Args:
+            filepath: The path to the revision file.
+        """
+        self.filepath = filepath
+        self.metadatapath = filepath + "_metadata.npz"
+        self.size = 0
+        self.tail = None
+        self.columns = self._empty()
+        if exists(self.metadatapath):
+            try:
+                with np.load(self.metadatapath) as metadata:
+                    self.size = int(metadata["_size"])
+                    self.tail = (int(metadata["_tail_length"]), str(metadata["_tail"])) if metadata["_tail"] else None
+                    self.columns = {column:metadata[column] for column in self.COLUMNS}
+            except (ValueError, KeyError, OSError):
+                self.size = 0
+                self.tail = None
+                self.columns = self._empty()
+
+    def __len__(self):
+        return len(self.columns["index"])
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def update(self):
+        """
+        Update the store if the revision file changed since it was last updated.
+
+        Returns:
+            True if the store was updated, else False.
+        """
+        size = revision_file_size(self.filepath)
+        appended = self._appended()
+        if size == self.size and appended:
+            return False
+        if size < self.size or not appended:
+            self.size = 0
+            self.tail = None
+            self.columns = self._empty()
+        rows = {column:[] for column in self.COLUMNS}
+        with open_revision_file(self.filepath) as file:
+            file.seek(self.size)
+            offset = self.size
+            for line in file:
+                if not line.endswith(b"\n"):
+                    # Incomplete line of a file that is currently being written.
+                    break
+                revision, spans = split_revision_line(line.decode("utf-8"))
+                for column in rows:
+                    value = revision.get(column)
+                    if value is None:
+                        value = -1 if self.COLUMNS[column] == np.int64 else ""
+                    rows[column].append(value)
+                offset += len(line)
+                self.tail = (len(line), sha1(line).hexdigest())
+        self.size = offset
+        self.columns = {column:np.concatenate([self.columns[column], np.array(rows[column], dtype=self.COLUMNS[column])])
+                        for column in self.COLUMNS}
+        self.save()
+        return True
+
+    def save(self):
+        """
+        Save store to file.
+        """
+        with open(self.metadatapath, "wb") as file:
+            np.savez(file,
+                     _size=np.array(self.size),
+                     _tail_length=np.array(self.tail[0] if self.tail else 0),
+                     _tail=np.array(self.tail[1] if self.tail else ""),
+                     **self.columns)
+
+    def rows(self):
+        """
+        Provides an iterator over the metadata of all revisions on file.
+
+        Yields:
+            A dictionary of column names and values.
+        """
+        for position in range(len(self)):
+            yield {column:self.columns[column][position].item() for column in self.COLUMNS}
+
+    def _empty(self):
+        return {column:np.array([], dtype=dtype) for column, dtype in self.COLUMNS.items()}
+
+    def _appended(self):
+        """
+        Check whether the last line added is still in place,
+        i.e. whether the file was only appended to.
+
+        Returns:
+            True if the last line added is unchanged, else False.
+        """
+        if not self.size:
+            return True
+        if self.tail is None:
+            return False
+        return line_digest(self.filepath, self.size, self.tail[0]) == self.tail[1]
@@ -0,0 +1,82 @@
+from .timestamp import Timestamp
+from .extractedsource import ExtractedSource
+from pprint import pformat
+
+class ExtractedRevision:
+    """
+    Revision as stored in the extraction file of an article, i.e. its metadata and the values
+    extracted from its HTML, providing the same getters as Revision for these values.
+
+    Attributes:
+        revid: The ID of the revision
+        parentid: The ID of the previsious revision; 0 if none.
+        url: The url of this revision.
+        user: The username of the user who penned this revision.
+        timestamp: The Timestamp object pertaining to the revision.
+        size: The size of this revision in Bytes.
+        index: The 0-indexed position in the revision history.
+        text: The full text of the revision.
+        references: The ExtractedSources of 'References'.
+        further_reading: The ExtractedSources of 'Further Reading'.
+        categories: List of tuples (category, href).
+    """
+    def __init__(self, revid, parentid, url, user, timestamp, size, index, text, references, further_reading, categories):
+        """
+        Args:
+            revid: The ID of the revision
+            parentid: The ID of the previsious revision; 0 if none.
+            url: The url of this revision.
+            user: The username of the user who penned this revision.
+            timestamp: The timestamp string of the revision, i.e. YYYY-MM-DDTHH:MM:SSZ.
+            size: The size of this revision in Bytes.
+            index: The 0-indexed position in the revision history.
+            text: The full text of the revision.
+            references: The source dictionaries of 'References'.
+            further_reading: The source dictionaries of 'Further Reading'.
+            categories: List of [category, href] lists.
+        """
+        self.revid = revid
+        self.parentid = parentid
+        self.url = url
+        self.user = user
+        self.timestamp = Timestamp(timestamp)
+        self.size = size
+        self.index = index
+        self.text = text
+        self.references = [ExtractedSource(**source) for source in references]
+        self.further_reading = [ExtractedSource(**source) for source in further_reading]
+        self.categories = [tuple(category) for category in categories]
+
+    def get_text(self):
+        return self.text
+
+    def get_references(self):
+        return list(self.references)
+
+    def get_further_reading(self):
+        return list(self.further_reading)
+
+    def get_categories(self):
+        return list(self.categories)
+
+    def json(self):
+        """
+        Return this revision as a json object.
+
+        Returns:
+            This revision as a dictionary.
+        """
+        return {"revid":self.revid,
+                "parentid":self.parentid,
+                "url":self.url,
+                "user":self.user,
+                "timestamp":self.timestamp.timestamp_string(),
+                "size":self.size,
+                "index":self.index,
+                "text":self.text,
+                "references":[source.json() for source in self.references],
+                "further_reading":[source.json() for source in self.further_reading],
+                "categories":self.categories}
+
+    def __str__(self):
+        return pformat(self.json())
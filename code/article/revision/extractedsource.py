@@ -0,0 +1,63 @@
+class ExtractedSource:
+    """
+    Source as stored in the extraction file of an article, i.e. the values extracted from
+    the HTML of a 'References' or 'Further Reading' element, providing the same getters as Source.
+
+    Attributes:
+        text: The full text of the source.
+        reference_ids: The HTML ids the source links to.
+        title: The title of the source.
+        authors: List of tuples (surname, firstname).
+        dois: List of DOIs as strings.
+        pmids: List of PMIDs as strings.
+    """
+    def __init__(self, text, reference_ids, title, authors, dois, pmids):
+        """
+        Args:
+            text: The full text of the source.
+            reference_ids: The HTML ids the source links to.
+            title: The title of the source.
+            authors: List of [surname, firstname] lists.
+            dois: List of DOIs as strings.
+            pmids: List of PMIDs as strings.
+        """
+        self.text = text
+        self.reference_ids = reference_ids
+        self.title = title
+        self.authors = [tuple(author) for author in authors]
+        self.dois = dois
+        self.pmids = pmids
+
+    def get_text(self):
+        return self.text
+
+    def get_reference_ids(self):
+        return self.reference_ids
+
+    def get_title(self, language):
+        # Extracted for the language of the article.
+        return self.title
+
+    def get_authors(self, language):
+        # Extracted for the language of the article.
+        return self.authors
+
+    def get_dois(self):
+        return self.dois
+
+    def get_pmids(self):
+        return self.pmids
+
+    def json(self):
+        """
+        Return this source as a json object.
+
+        Returns:
+            This source as a dictionary.
+        """
+        return {"text":self.text,
+                "reference_ids":self.reference_ids,
+                "title":self.title,
+                "authors":self.authors,
+                "dois":self.dois,
+                "pmids":self.pmids}
@@ -0,0 +1,135 @@
+from .revision import Revision
+from json import loads
+from pprint import pformat
+
+HEAVY_FIELDS = ("wikitext", "html")
+
+def split_revision_line(line, fields = HEAVY_FIELDS):
+    """
+    Splits the line JSON of a revision into its light fields and the spans of its heavy fields.
+
+    The heavy fields are located without decoding them: inside a JSON string every quotation
+    mark is escaped, so ', "' can only occur between two fields of the revision.
+
+    Args:
+        line: The line JSON of a revision as string.
+        fields: The heavy fields to skip.
+
+    Returns:
+        A tuple of the dictionary of decoded light fields and a dictionary
+        of heavy fields and the [start, end] spans of their values in the line;
+        all fields decoded and no spans if the line is not laid out as expected.
+    """
+    try:
+        return _split_revision_line(line, fields)
+    except ValueError:
+        return loads(line), {}
+
+def _split_revision_line(line, fields):
+    items = []
+    spans = {}
+    end = line.rindex("}")
+    position = line.index('"')
+    while position != -1:
+        value_start = line.index('": ', position) + 3
+        key = line[position + 1:value_start - 3]
+        value_end = line.find(', "', value_start)
+        if value_end == -1:
+            value_end = end
+        if key in fields:
+            spans[key] = [value_start, value_end]
+        else:
+            items.append(line[position:value_end])
+        position = value_end + 2 if value_end != end else -1
+    return loads("{" + ", ".join(items) + "}"), spans
+
+def load_light_fields(line, spans):
+    """
+    Decodes the light fields of the line JSON of a revision
+    using the known spans of its heavy fields.
+
+    Args:
+        line: The line JSON of a revision as string.
+        spans: Dictionary of heavy fields and the [start, end] spans of their values in the line.
+
+    Returns:
+        The dictionary of decoded light fields.
+    """
+    segments = []
+    position = 0
+    for start, end in sorted(spans.values()):
+        segments.append(line[position:start])
+        segments.append("null")
+        position = end
+    segments.append(line[position:])
+    fields = loads("".join(segments))
+    for field in spans:
+        del fields[field]
+    return fields
+
+class LazyRevision(Revision):
+    """
+    Revision initialised from its line JSON that decodes the heavy fields,
+    i.e. wikitext and html, only on first access.
+
+    Attributes:
+        line: The line JSON of the revision; None once all heavy fields are decoded.
+        spans: The spans of the heavy fields not yet decoded.
+        values: The values of decoded heavy fields.
+    """
+    def __init__(self, line, spans = None):
+        """
+        Args:
+            line: The line JSON of the revision as string or bytes.
+            spans: The spans of the heavy fields in the line, e.g. as recorded by the RevisionIndex;
+                   located by scanning the line if None.
+        """
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if spans is None:
+            fields, spans = split_revision_line(line)
+        else:
+            spans = dict(spans)
+            fields = load_light_fields(line, spans)
+        fields.setdefault("html", None)
+        self.values = {}
+        self.spans = {}
+        super().__init__(**fields)
+        self.line = line if spans else None
+        self.spans = spans
+
+    @property
+    def html(self):
+        return self._decode("html")
+
+    @html.setter
+    def html(self, html):
+        self._encode("html", html)
+
+    @property
+    def wikitext(self):
+        return self._decode("wikitext")
+
+    @wikitext.setter
+    def wikitext(self, wikitext):
+        self._encode("wikitext", wikitext)
+
+    def _decode(self, field):
+        if field in self.spans:
+            start, end = self.spans.pop(field)
+            self.values[field] = loads(self.line[start:end])
+            if not self.spans:
+                self.line = None
+        return self.values.get(field)
+
+    def _encode(self, field, value):
+        self.spans.pop(field, None)
+        self.values[field] = value
+        if field == "html":
+            self.cache = {}
+
+    def __str__(self):
+        revision = {key:value for key,value in self.__dict__.items() if key not in ["line", "spans", "values", "cache"]}
+        revision["html"] = self.html
+        revision["wikitext"] = self.wikitext
+        return pformat(revision)
@@ -1,5 +1,5 @@
 from .timestamp import Timestamp
-from .source import Source
+from .source import Source, map_reference_ids
 from .section import Section
 from pprint import pformat
 from lxml import html, etree
@@ -8,6 +8,41 @@ from re import findall, finditer, search, split, sub, S
 DEFAULT_HTML = ("<div class='mw-parser-output'></div>"
                 "<div id='mw-normal-catlinks' class='mw-normal-catlinks'></div>")
 
+def stream_sources(html_string):
+    """
+    Extracts the source elements of 'References' and 'Further Reading' without parsing the whole HTML,
+    i.e. only the outermost ordered and unordered lists are located by their tags and parsed.
+    Tags within comments, scripts and styles are skipped.
+
+    Args:
+        html_string: The HTML of a revision.
+
+    Returns:
+        A tuple of the lists of reference and further reading elements in document order,
+        matching './/ol[@class='references']/li | .//ol/li/cite' and './/ul/li/cite' respectively;
+        None if the list tags are not balanced, in which case the whole HTML needs to be parsed.
+    """
+    blocks = []
+    tags = []
+    for match in finditer(r"<!--.*?-->|<script\b.*?</script\s*>|<style\b.*?</style\s*>|<(/?)(ol|ul)\b", html_string, flags=S):
+        if not match.group(2):
+            continue
+        if not match.group(1):
+            if not tags:
+                start = match.start()
+            tags.append(match.group(2))
+        elif not tags or tags.pop() != match.group(2):
+            return None
+        elif not tags:
+            blocks.append(html_string[start:html_string.find(">", match.end()) + 1])
+    if tags:
+        return None
+    if not blocks:
+        return [], []
+    tree = html.fromstring("<div>" + sub(r"<style.*?</style>", "", "".join(blocks), flags=S) + "</div>")
+    return (tree.xpath(".//ol[@class='references']/li | .//ol/li/cite"),
+            tree.xpath(".//ul/li/cite"))
+
 class Revision:
     """
     Wrapper class for revision
@@ -24,6 +59,8 @@ class Revision:
         comment: The comment the user left.
         minor: Flag for minor revision.
         self.index: The 0-indexed position in the revision history.
+        cache: The parsed HTML tree and the artifacts derived from it, i.e. text,
+               sources, categories and section trees, computed on first use.
         
     """
     def __init__(self, revid, parentid, url, user, userid, timestamp, size, html, comment, minor, index, wikitext = ""):
@@ -56,21 +93,36 @@ class Revision:
         self.comment = comment
         self.minor = minor
         self.index = index
+        self.cache = {}
 
     def etree_from_html(self):
-        try:
-            return html.fromstring(sub(r"<style.*?</style>", "", self.html, flags=S))
-        except etree.ParserError:
-            return html.fromstring(DEFAULT_HTML)
+        if "etree" not in self.cache:
+            try:
+                self.cache["etree"] = html.fromstring(sub(r"<style.*?</style>", "", self.html, flags=S))
+            except etree.ParserError:
+                self.cache["etree"] = html.fromstring(DEFAULT_HTML)
+        return self.cache["etree"]
+
+    def release(self):
+        """
+        Releases the parsed HTML tree and all artifacts derived from it.
+        """
+        self.cache = {}
 
     def section_tree(self, name = "root"):
-        return Section(self.etree_from_html().find_class('mw-parser-output')[0], name).tree()
+        # Sections refer to ranges of elements of the parsed HTML tree, which building them leaves as is.
+        if ("section_tree", name) not in self.cache:
+            root = self.etree_from_html().find_class('mw-parser-output')[0]
+            self.cache[("section_tree", name)] = Section(root, name).tree()
+        return self.cache[("section_tree", name)]
 
     def get_wikitext(self):
         return self.wikitext
     
     def get_text(self):
-        return self.etree_from_html().find_class('mw-parser-output')[0].xpath("string()").strip()
+        if "text" not in self.cache:
+            self.cache["text"] = self.etree_from_html().find_class('mw-parser-output')[0].xpath("string()").strip()
+        return self.cache["text"]
 
     def get_headings(self):
         #get all headlines
@@ -93,13 +145,79 @@ class Revision:
         return self.section_tree().get_tables()
 
     def get_categories(self):
-        return [(element.text, element.get("href")) for element in self.etree_from_html().xpath("..//div[@id='mw-normal-catlinks']//a")[1:]]
+        if "categories" not in self.cache:
+            self.cache["categories"] = [(element.text, element.get("href")) for element in self.etree_from_html().xpath("..//div[@id='mw-normal-catlinks']//a")[1:]]
+        return list(self.cache["categories"])
 
     def get_references(self):
-        return [Source(source) for source in self.etree_from_html().xpath(".//ol[@class='references']/li | .//ol/li/cite")]
+        if "references" not in self.cache:
+            self._sources()
+        return list(self.cache["references"])
 
     def get_further_reading(self):
-        return [Source(source) for source in self.etree_from_html().xpath(".//ul/li/cite")]
+        if "further_reading" not in self.cache:
+            self._sources()
+        return list(self.cache["further_reading"])
+
+    def get_reference_map(self):
+        """
+        Get the map of reference ids the 'References' sources link to, see map_reference_ids,
+        to match sections against the sources with Section.get_sources.
+
+        Returns:
+            A dictionary of reference ids and lists of positions in get_references().
+        """
+        if "reference_map" not in self.cache:
+            self.cache["reference_map"] = map_reference_ids(self.get_references())
+        return self.cache["reference_map"]
+
+    def get_reference_features(self, language, source_cache = None):
+        """
+        Get the features of all 'References' sources, see Source.features.
+
+        Args:
+            language: The language titles and authors are extracted for, e.g. 'en'.
+            source_cache: A SourceCache to look up the features of sources already seen.
+
+        Returns:
+            A list of feature dictionaries.
+        """
+        if ("reference_features", language) not in self.cache:
+            self.cache[("reference_features", language)] = [source_cache.get(source, language) if source_cache is not None else source.features(language)
+                                                       for source in self.get_references()]
+        return list(self.cache[("reference_features", language)])
+
+    def get_further_reading_features(self, language, source_cache = None):
+        """
+        Get the features of all 'Further Reading' sources, see Source.features.
+
+        Args:
+            language: The language titles and authors are extracted for, e.g. 'en'.
+            source_cache: A SourceCache to look up the features of sources already seen.
+
+        Returns:
+            A list of feature dictionaries.
+        """
+        if ("further_reading_features", language) not in self.cache:
+            self.cache[("further_reading_features", language)] = [source_cache.get(source, language) if source_cache is not None else source.features(language)
+                                                       for source in self.get_further_reading()]
+        return list(self.cache[("further_reading_features", language)])
+
+    def _sources(self):
+        """
+        Extracts 'References' and 'Further Reading' sources together,
+        querying the parsed HTML tree if there is one or if the lists of the HTML are not balanced
+        and parsing only the lists of the HTML otherwise.
+        """
+        sources = stream_sources(self.html) if "etree" not in self.cache else None
+        if sources is None:
+            tree = self.etree_from_html()
+            references = tree.xpath(".//ol[@class='references']/li | .//ol/li/cite")
+            further_reading = tree.xpath(".//ul/li/cite")
+        else:
+            references, further_reading = sources
+        self.cache["references"] = [Source(source) for source in references]
+        self.cache["further_reading"] = [Source(source) for source in further_reading]
 
     def get_referenced_authors(self, language, sources):
         return [source.get_authors(language) for source in sources]
@@ -141,5 +259,11 @@ class Revision:
                 contexts.append((left, right))
         return contexts
 
+    def __getstate__(self):
+        # Parsed trees cannot be pickled, e.g. to send the revision to a worker process.
+        state = self.__dict__.copy()
+        state["cache"] = {}
+        return state
+
     def __str__(self):
-        return pformat(self.__dict__)    
+        return pformat({key:value for key,value in self.__dict__.items() if key != "cache"})
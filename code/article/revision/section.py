@@ -1,19 +1,37 @@
+from .source import map_reference_ids
 from re import sub
-from lxml import html as HTML
+from lxml import etree
 from queue import Queue
-from copy import deepcopy
+from hashlib import sha1
+
+def normalise_name(name):
+    """
+    Normalise a section title for lookups.
+
+    Args:
+        name: The title of a section.
+
+    Returns:
+        The lowercased title with runs of whitespace replaced by single spaces.
+    """
+    return " ".join(name.lower().split())
 
 class Section:
     """
     A section of a Wikipedia article built from the HTML element.
     Calling tree() on this instance builds a subsection tree by
-    evaluating and collating children elements of this HTML element
-    based on their headings, initialising them as Sections,
-    adding them to the subsections attribute of this instance
-    and recursively calling tree() on them.
+    evaluating the children elements of this HTML element
+    based on their headings, initialising the ranges of elements
+    between headings as Sections and adding them to the
+    subsections attribute of the section they belong to.
+    The HTML element is neither copied nor altered.
 
     Attributes:
-        html: The lxml HMTL element used to build this instance.
+        html: The lxml HMTL element used to build this instance,
+              shared by all sections of its tree.
+        elements: The children of the HTML element belonging to this instance
+                  but not to its subsections, i.e. its heading and the elements
+                  up to its first subsection once tree() was called.
         name: The heading of this section, defaults to 'root'.
         parent: The parent of this section, if any.
         prev: The sibling section preceeding this instance, if any.
@@ -22,15 +40,26 @@ class Section:
                with root being at 0.
         subsections: The subsections of this instance, populated
                      at calling tree().
+        digest: The content hash of this instance, computed on first use.
+        names: Maps the names of the subsections in the subtree of this instance to lists of
+               their positions in document order and the subsections, built on first search.
+        normalised_names: Maps the normalised names of this instance and the subsections
+                          in its subtree to the sections, built on first search.
+        found: Maps the arguments of calls to find() to their results.
     """
-    def __init__(self, html, name = "root", parent = None, level = 0):
+    def __init__(self, html, name = "root", parent = None, level = 0, elements = None):
         self.html = html
+        self.elements = list(html) if elements is None else elements
         self.name = name
         self.parent = parent
         self.prev = None
         self.next = None
         self.level = level
         self.subsections = []
+        self.digest = None
+        self.names = None
+        self.normalised_names = None
+        self.found = {}
 
     def get_text(self, level = 0, include = ["p","li"], with_headings = False):
         """
@@ -45,7 +74,7 @@ class Section:
             The text of the section a string cleaned of superflous spaces and line breaks.
         """
         text = "\n\n".join([sub(r" +", " ", sub("\n+", "\n", element.xpath("string()")))
-                            for element in self.html.iter(include)])
+                            for element in self.iter(include)])
         heading = (self.name + ("\n\n" if text else "")) * with_headings
         if level != 0:
             return heading + text + "\n\n" + "".join([subsection.get_text(level - 1, include, with_headings) for subsection in self.subsections])
@@ -62,7 +91,7 @@ class Section:
             A list of wikilinks as strings.
         """
         def recursive_get_wikilinks(section, level, wikilinks):
-            wikilinks += [element.get("href") for element in section.html.iter() if element.get("href") and element.get("href").startswith("/wiki/")]
+            wikilinks += [element.get("href") for element in section.iter() if element.get("href") and element.get("href").startswith("/wiki/")]
             if level != 0:
                 for subsection in section.subsections:
                     recursive_get_wikilinks(subsection, level - 1, wikilinks)
@@ -94,7 +123,7 @@ class Section:
                           "/wiki/PMID_(identifier)", 
                       ] if articles_only else []
                 
-            wikilinks += [element.get("href") for element in section.html.iter() 
+            wikilinks += [element.get("href") for element in section.iter() 
                           if element.get("href") 
                           and element.get("href").startswith("/wiki/")
                           and not any(element.get("href").startswith(bad_start) for bad_start in bad_starts)
@@ -115,77 +144,100 @@ class Section:
             A list of reference ids as strings.
         """
         def recursive_get_reference_ids(section, level, reference_ids):
-            reference_ids += [element.get("id") for element in section.html.iter() if element.get("class") == "reference"]
+            reference_ids += [element.get("id") for element in section.iter() if element.get("class") == "reference"]
             if level != 0:
                 for subsection in section.subsections:
                     recursive_get_reference_ids(subsection, level - 1, reference_ids)
             return reference_ids
         return recursive_get_reference_ids(self, level, [])
 
-    def get_sources(self, sources, level = 0):
+    def get_sources(self, sources, level = 0, source_map = None):
         """
         Get all sources referenced in this section.
 
         Args:
             sources: The sources which will be matched against this section.
             level: The depth to which sources from subsections will be retrieved.
+            source_map: Maps reference ids to positions in sources, see map_reference_ids;
+                        built from the sources if None, pass it to match many sections.
         Returns:
             A list of sources.
         """
-        referenced_ids_in_section = set(self.get_reference_ids(level))
-        return [source for source in sources
-                if not set(source.get_reference_ids()).isdisjoint(referenced_ids_in_section)]     
+        if source_map is None:
+            source_map = map_reference_ids(sources)
+        positions = set()
+        for reference_id in self.get_reference_ids(level):
+            positions.update(source_map.get(reference_id, []))
+        return [sources[position] for position in sorted(positions)]
 
     def tree(self, headings = ["h1","h2","h3","h4","h5","h6"]):
         """
-        Creates a nested section tree from this section.
+        Creates a nested section tree from this section in a single pass over its elements.
+
+        The first heading among the elements of a section determines the levels of headings
+        that start its subsections; all other elements belong to the section opened last.
 
         Returns:
             A section tree of headings, paragraphs and divs.
         """
-        html = deepcopy(self.html)
-        self.html.clear()
-        heading_level = 0
-        for element in html:
-            if not heading_level and element.tag in headings:
-                heading_level = headings.index(element.tag) + 1
-            if element.tag not in headings[:max(heading_level,0)]:
-                if not self.subsections:
-                    self.html.append(element)
-                else:
-                    self.subsections[-1].append(element)
-            else:
-                self.subsections.append(HTML.fromstring('<div class="section"></div>'))
-                self.subsections[-1].append(element)
-        self.subsections = [self._html_to_section(html, headings[max(heading_level,0):]) for html in self.subsections]
-        self._siblings()
+        elements = self.elements
+        self.elements = []
+        self.subsections = []
+        self.digest = None
+        self.names = None
+        self.normalised_names = None
+        self.found = {}
+        # The open sections from this instance down to the section opened last, each with
+        # the headings its subsections may start with and the number of those that do.
+        frames = [[self, headings, 0]]
+        for element in elements:
+            for depth, frame in enumerate(frames):
+                section, section_headings, heading_level = frame
+                if not heading_level and element.tag in section_headings:
+                    frame[2] = heading_level = section_headings.index(element.tag) + 1
+                if element.tag in section_headings[:heading_level]:
+                    del frames[depth + 1:]
+                    frames.append([section._subsection(element), section_headings[heading_level:], 0])
+                    break
+                if depth == len(frames) - 1:
+                    section.elements.append(element)
         return self
 
-    def _html_to_section(self, html, headings):
+    def _subsection(self, heading):
         """
-        Turns a list of elements into a new subsection and calls tree on it.
+        Opens a new subsection of this section.
 
         Args:
-            elements: A list of HTML elements.
-            name: The name of the subsection.
-            level: The level of this subsection.
-        """
-        if html is not None:
-            name = html[0].xpath("string()").split('[edit]')[0].strip()
-            subsection = Section(html, name, self, self.level + 1)
-            subsection.tree(headings)
-            return subsection
-
-    def _siblings(self):
-        for subsection1,subsection2 in zip(self.subsections[:-1], self.subsections[1:]):
-            subsection1.next = subsection2
-            subsection2.prev = subsection1
-        for subsection in self.subsections:
-            subsection._siblings()
+            heading: The heading element starting the subsection.
+
+        Returns:
+            The subsection.
+        """
+        name = heading.xpath("string()").split('[edit]')[0].strip()
+        subsection = Section(self.html, name, self, self.level + 1, [heading])
+        if self.subsections:
+            self.subsections[-1].next = subsection
+            subsection.prev = self.subsections[-1]
+        self.subsections.append(subsection)
+        return subsection
+
+    def iter(self, tags = None):
+        """
+        Iterate over the elements of this section without those of its subsections.
+
+        Args:
+            tags: The HTML element tag or list of tags to iterate over; all elements if None.
+
+        Yields:
+            An lxml HTML element.
+        """
+        for element in self.elements:
+            yield from element.iter(tags)
 
     def find(self, strings, lower = False):
         """
         Recursively finds all subsections in the section tree with any of the given strings in the title.
+        Each distinct title is tested once and the results are kept for repeated searches.
 
         Args:
             strings: A list of strings to search in the title.
@@ -193,20 +245,44 @@ class Section:
         Returns:
             A list of sections.
         """
-        def recursive_find(section, strings, lower, sections):
-            for subsection in section.subsections:
-                for string in [(string.lower() if lower else string) for string in strings]:
-                    if string in (subsection.name.lower() if lower else subsection.name):
-                        sections.append(subsection)
-                        break
-                recursive_find(subsection, strings, lower, sections)
-            return sections
-        return recursive_find(self, strings, lower,
-                              [self] if any([string in self.name for string in strings]) else [])
+        key = (tuple(strings), lower)
+        if key not in self.found:
+            self._index()
+            strings = [(string.lower() if lower else string) for string in strings]
+            names = [name for name in self.names
+                     if any(string in (name.lower() if lower else name) for string in strings)]
+            sections = sorted([item for name in names for item in self.names[name]], key=lambda item: item[0])
+            self.found[key] = ([self] if any([string in self.name for string in key[0]]) else []) + [section for _, section in sections]
+        return list(self.found[key])
+
+    def lookup(self, name):
+        """
+        Finds all sections in the section tree, including this one, with the given title,
+        ignoring case and superfluous spaces.
+
+        Args:
+            name: The title to look up.
+        Returns:
+            A list of sections in document order.
+        """
+        self._index()
+        return list(self.normalised_names.get(normalise_name(name), []))
+
+    def _index(self):
+        """
+        Builds the name indices of the subtree of this section.
+        """
+        if self.names is None:
+            self.names = {}
+            self.normalised_names = {}
+            for position, section in enumerate(self.walk()):
+                if section is not self:
+                    self.names.setdefault(section.name, []).append((position, section))
+                self.normalised_names.setdefault(normalise_name(section.name), []).append(section)
 
     def get_paragraphs(self):
         def recursive_get_paragraphs(section, paragraphs):
-            paragraphs += [element for element in section.html.iter(["p"])]
+            paragraphs += [element for element in section.iter(["p"])]
             for subsection in section.subsections:
                 recursive_get_paragraphs(subsection, paragraphs)
             return paragraphs
@@ -214,7 +290,7 @@ class Section:
 
     def get_headings(self):
         def recursive_get_paragraphs(section, headings):
-            headings += [element for element in section.html.iter(["h2","h3","h4","h5","h6"])]
+            headings += [element for element in section.iter(["h2","h3","h4","h5","h6"])]
             for subsection in section.subsections:
                 recursive_get_paragraphs(subsection, headings)
             return headings
@@ -222,7 +298,7 @@ class Section:
 
     def get_lists(self):
         def recursive_get_lists(section, lists):
-            lists += [element for element in section.html.iter(["ol","ul"])]
+            lists += [element for element in section.iter(["ol","ul"])]
             for subsection in section.subsections:
                 recursive_get_lists(subsection, lists)
             return lists
@@ -230,7 +306,7 @@ class Section:
 
     def get_tables(self):
         def recursive_get_tables(section, tables):
-            tables += [element for element in section.html.iter(["table"])]
+            tables += [element for element in section.iter(["table"])]
             for subsection in section.subsections:
                 recursive_get_tables(subsection, tables)
             return tables
@@ -238,12 +314,35 @@ class Section:
 
     def get_captions(self):
         def recursive_get_captions(section, captions):
-            captions += [element for element in section.html.iter() if element.get("class") == "thumbcaption"]
+            captions += [element for element in section.iter() if element.get("class") == "thumbcaption"]
             for subsection in section.subsections:
                 recursive_get_captions(subsection, captions)
             return captions
         return recursive_get_captions(self, [])
 
+    def get_hash(self):
+        """
+        Get the content hash of this section, i.e. of its own HTML elements
+        without those of its subsections, which have hashes of their own.
+
+        Returns:
+            The hex digest of the serialised elements of this section.
+        """
+        if self.digest is None:
+            self.digest = sha1(b"".join(etree.tostring(element) for element in self.elements)).hexdigest()
+        return self.digest
+
+    def walk(self):
+        """
+        Iterate over this section and all its subsections in document order.
+
+        Yields:
+            A section.
+        """
+        yield self
+        for subsection in self.subsections:
+            yield from subsection.walk()
+
     def parent_path(self):
         """
         Get the path of parent names.
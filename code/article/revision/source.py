@@ -1,4 +1,42 @@
-from re import findall, finditer, search, split, sub, S
+from re import compile
+
+DOI_PATTERN = compile(r"10.\d{4,9}/[-\._;\(\)/:a-zA-Z0-9]+")
+PMID_PATTERN = compile(r"pmid.*?\d+")
+PMC_PATTERN = compile(r"pmc.*?\d+")
+NUMBER_PATTERN = compile(r"\d+")
+QUOTED_PATTERN = compile(r"\".*?\"")
+YEAR_PATTERN = compile(r"\(.*?\)\.? ?")
+CITE_PATTERN = compile(r"^#cite")
+# Patterns of the authors of English references.
+AFTER_QUOTE_PATTERN = compile(r'".*')
+AFTER_PARENTHESIS_PATTERN = compile(r"\(.*")
+ET_AL_PATTERN = compile(r"[;,]? *et al.*")
+REFERENCE_NUMBER_PATTERN = compile(r" [a-z] ")
+SURNAME_COMMA_PATTERN = compile(r"(\w{3,10}), ")
+AUTHOR_SEPARATOR_PATTERN = compile(r"[,;] ?")
+SURNAME_PATTERN = compile(r".* ")
+# Patterns of the authors of German references.
+DE_ET_AL_PATTERN = compile(r",? *et al\.?")
+DE_AUTHOR_SEPARATOR_PATTERN = compile(r", ?")
+DE_FIRSTNAME_PATTERN = compile(r".*\. ")
+
+def map_reference_ids(sources):
+    """
+    Map the reference ids the sources link to onto the positions of the sources.
+
+    Args:
+        sources: A list of sources.
+
+    Returns:
+        A dictionary of reference ids and lists of positions in sources.
+    """
+    source_map = {}
+    for position, source in enumerate(sources):
+        for reference_id in source.get_reference_ids():
+            positions = source_map.setdefault(reference_id, [])
+            if not positions or positions[-1] != position:
+                positions.append(position)
+    return source_map
 
 class Source:
     """
@@ -6,6 +44,7 @@ class Source:
 
     Attributes:
         source: The source of the reference as HTML/XML.
+        text: The full text of the reference once it was computed.
     """
 
     def __init__(self, html):
@@ -15,6 +54,7 @@ class Source:
         source: The html of the reference.
         """
         self.html = html
+        self.text = None
 
     def get_text(self):
         """
@@ -23,11 +63,34 @@ class Source:
         Returns:
             The full reference as a string.
         """
-        reference_text = self.html.find(".//cite")
-        if reference_text is not None:
-            return reference_text.xpath("string()")
-        else:
-            return self.html.xpath("string()")
+        if self.text is None:
+            reference_text = self.html.find(".//cite")
+            if reference_text is not None:
+                self.text = reference_text.xpath("string()")
+            else:
+                self.text = self.html.xpath("string()")
+        return self.text
+
+    def features(self, language):
+        """
+        Get text, title, authors, identifiers and reference ids of the reference at once,
+        collecting the links of the reference in a single traversal.
+
+        Args:
+            language: The language title and authors are extracted for, e.g. 'en'.
+
+        Returns:
+            A dictionary with keys 'text', 'reference_ids', 'title', 'authors', 'dois', 'pmids' and 'pmcs'.
+        """
+        text = self.get_text()
+        hrefs = [(element.get("href"), element.text) for element in self.html.iter("a")]
+        return {"text":text,
+                "reference_ids":[CITE_PATTERN.sub("cite", href) for href, _ in hrefs],
+                "title":self.get_title(language),
+                "authors":self.get_authors(language),
+                "dois":self._dois(text, hrefs),
+                "pmids":self._numbers(text, hrefs, "pubmed", PMID_PATTERN),
+                "pmcs":self._numbers(text, hrefs, "pmc/", PMC_PATTERN)}
 
     def get_reference_ids(self):
         """
@@ -36,7 +99,7 @@ class Source:
         Returns:
             A string id.
         """
-        return [sub("^#cite","cite", element.get("href")) for element in self.html.iter("a")]
+        return [CITE_PATTERN.sub("cite", element.get("href")) for element in self.html.iter("a")]
 
     def get_superscript(self, revision): # unreliable!
         """
@@ -79,42 +142,38 @@ class Source:
         if language == "en":
             if "(" in text:
                 #remove everything after first "
-                text = sub(r'".*', "", text)
+                text = AFTER_QUOTE_PATTERN.sub("", text)
                 #remove everything after first (
-                text = sub(r"\(.*", "", text)
+                text = AFTER_PARENTHESIS_PATTERN.sub("", text)
                 #remove everything after et al.
-                text = sub(r"[;,]? *et al.*", "", text)
+                text = ET_AL_PATTERN.sub("", text)
                 #remove caret
                 text = text.replace("^", "")
                 #remove leading reference numbers
-                while search(r" [a-z] ", text):
-                    text = sub(r" [a-z] ", " ", text)
+                while REFERENCE_NUMBER_PATTERN.search(text):
+                    text = REFERENCE_NUMBER_PATTERN.sub(" ", text)
                 #remove commas
-                text = sub(r"(\w{3,10}), ", r"\1 ", text)
+                text = SURNAME_COMMA_PATTERN.sub(r"\1 ", text)
                 #remove abbreviation dots
                 text = text.replace(".", "")
                 #strip text
                 text = text.strip()
                 #get surnames and fistnames
-                for author in split(r"[,;] ?", text):
-                    try:
-                        match = next(finditer(r".* ", author))
+                for author in AUTHOR_SEPARATOR_PATTERN.split(text):
+                    match = SURNAME_PATTERN.search(author)
+                    if match:
                         AUTHORS.append((author[0:match.end()-1], author[match.end():]))
-                    except StopIteration:
-                        pass
         if language == "de":
             try:
                 #split at :
                 text = text.split(":")[0]
                 #remove et al.
-                text = sub(r",? *et al\.?", "", text).strip()
+                text = DE_ET_AL_PATTERN.sub("", text).strip()
                 #get surnames and fist names
-                for author in split(r", ?", text):
-                    try:
-                        match = next(finditer(r".*\. ", author))
+                for author in DE_AUTHOR_SEPARATOR_PATTERN.split(text):
+                    match = DE_FIRSTNAME_PATTERN.search(author)
+                    if match:
                         AUTHORS.append((author[match.end():], author[0:match.end()-1]))
-                    except StopIteration:
-                        pass
             except IndexError:
                 pass
         return AUTHORS
@@ -131,7 +190,7 @@ class Source:
         if language == "en":
             try:
                 #try to find quoted title
-                matches = list(finditer(r"\".*?\"", text))
+                matches = list(QUOTED_PATTERN.finditer(text))
                 #get longest match
                 match = sorted(matches, key=lambda match: match.end() - match.start(), reverse=True)[0]
                 #get span of match
@@ -141,7 +200,7 @@ class Source:
             except IndexError:
                 try:
                     #split at year
-                    text = split(r"\(.*?\)\.? ?", text, 1)[1].strip()
+                    text = YEAR_PATTERN.split(text, 1)[1].strip()
                     #split at stop and get first element
                     text = text.split(".")[0]
                     #remove quotation marks
@@ -152,7 +211,7 @@ class Source:
         if language == "de":
             try:
                 #split at :
-                text = split(":", text, 1)[1].strip()
+                text = text.split(":", 1)[1].strip()
                 #split at .
                 title = text.split(".")[0].strip()
                 return title
@@ -166,18 +225,7 @@ class Source:
         Returns:
             A list of DOIs as strings.
         """
-        DOIs = set()
-        #dois from hrefs
-        for element in self.html.xpath(".//a[contains(@href, 'doi.org/')]"):
-            #dois from links
-            DOIs.add(element.get("href").split("doi.org/")[-1].replace("%2F","/"))
-            #dois from element text
-            DOIs.add(element.text)
-        #dois from text
-        for doi in findall("10.\d{4,9}/[-\._;\(\)/:a-zA-Z0-9]+", self.get_text()):
-            if doi[-1] == ".": doi = doi[:-1]
-            DOIs.add(doi)
-        return [doi for doi in DOIs if " " not in doi]
+        return self._dois(self.get_text(), self._hrefs())
 
     def get_pmids(self):
         """
@@ -186,18 +234,7 @@ class Source:
         Returns:
             A list of PMIDs as strings.
         """
-        PMIDs = set()
-        #pmids from hrefs
-        for element in self.html.xpath(".//a[contains(@href, 'pubmed')]"):
-            pmid = search("\d+", element.get("href").split("/")[-1])
-            if pmid:
-                PMIDs.add(pmid.group(0))
-        #pmifs in text
-        for pmid in findall("pmid.*?\d+", self.get_text().lower()):
-            pmid = search("\d+", pmid)
-            if pmid:
-                PMIDs.add(pmid.group(0))
-        return [pmid for pmid in PMIDs if pmid]
+        return self._numbers(self.get_text(), self._hrefs(), "pubmed", PMID_PATTERN)
 
     def get_pmcs(self):
         """
@@ -206,18 +243,7 @@ class Source:
         Returns:
             A list of PMCs as strings.
         """
-        PMCs = set()
-        #pmids from hrefs
-        for element in self.html.xpath(".//a[contains(@href, 'pmc/')]"):
-            pmc = search("\d+", element.get("href").split("/")[-1])
-            if pmc:
-                PMCs.add(pmc.group(0))
-        #pmifs in text
-        for pmc in findall("pmc.*?\d+", self.get_text().lower()):
-            pmc = search("\d+", pmc)
-            if pmc:
-                PMCs.add(pmc.group(0))
-        return [pmc for pmc in PMCs if pmc]
+        return self._numbers(self.get_text(), self._hrefs(), "pmc/", PMC_PATTERN)
 
     def get_identifiers(self):
         """
@@ -227,10 +253,58 @@ class Source:
             A dictionary of found identifiers (values as strings) 
             Emty if nothing found.
         """
+        text = self.get_text()
+        hrefs = self._hrefs()
+        dois = self._dois(text, hrefs)
+        pmids = self._numbers(text, hrefs, "pubmed", PMID_PATTERN)
+        pmcs = self._numbers(text, hrefs, "pmc/", PMC_PATTERN)
         return {
-            'DOI': self.get_dois()[0] if self.get_dois() else '',
-            'PMID': self.get_pmids()[0] if self.get_pmids() else '',
-            'PMC': self.get_pmcs()[0] if self.get_pmcs() else '',
+            'DOI': dois[0] if dois else '',
+            'PMID': pmids[0] if pmids else '',
+            'PMC': pmcs[0] if pmcs else '',
         }
 
+    def _hrefs(self):
+        """
+        Get href and text of all links in the reference.
+        """
+        return [(element.get("href"), element.text) for element in self.html.iter("a")]
+
+    def _dois(self, text, hrefs):
+        """
+        Get all unique DOIs from the links and the text of the reference.
+        """
+        DOIs = set()
+        #dois from hrefs
+        for href, link_text in hrefs:
+            if href is not None and "doi.org/" in href:
+                #dois from links
+                DOIs.add(href.split("doi.org/")[-1].replace("%2F","/"))
+                #dois from element text
+                DOIs.add(link_text)
+        #dois from text
+        for doi in DOI_PATTERN.findall(text):
+            if doi[-1] == ".": doi = doi[:-1]
+            DOIs.add(doi)
+        return [doi for doi in DOIs if " " not in doi]
+
+    def _numbers(self, text, hrefs, url_part, pattern):
+        """
+        Get all unique numeric identifiers, i.e. PMIDs or PMCs, from the links containing url_part
+        and the parts of the lowercased text matching pattern.
+        """
+        numbers = set()
+        #numbers from hrefs
+        for href, _ in hrefs:
+            if href is not None and url_part in href:
+                number = NUMBER_PATTERN.search(href.split("/")[-1])
+                if number:
+                    numbers.add(number.group(0))
+        #numbers in text
+        for number in pattern.findall(text.lower()):
+            number = NUMBER_PATTERN.search(number)
+            if number:
+                numbers.add(number.group(0))
+        return [number for number in numbers if number]
+
     
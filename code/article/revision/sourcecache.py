@@ -0,0 +1,131 @@
+from collections import OrderedDict
+from hashlib import sha1
+from json import dumps, loads
+from lxml import etree
+import sqlite3
+
+class SourceCache:
+    """
+    Cache of the features of sources, see Source.features, keyed by a hash of the serialised HTML
+    of the source and the language, so that a reference occurring unchanged in many revisions
+    or articles is only parsed once.
+
+    The most recently used features are kept in memory; optionally, all features are also stored
+    in an SQLite database on disk that is shared by all runs and worker processes using it.
+
+    Attributes:
+        maxsize: The maximum number of features kept in memory.
+        databasepath: The path to the SQLite database; None if there is no disk tier.
+        features: Maps keys to features in the order of their last use.
+        hits: The number of lookups answered from memory or disk.
+        misses: The number of lookups the features had to be computed for.
+    """
+    def __init__(self, maxsize = 10000, databasepath = None):
+        """
+        Args:
+            maxsize: The maximum number of features kept in memory.
+            databasepath: The path to the SQLite database; no disk tier if None.
+        """
+        self.maxsize = maxsize
+        self.databasepath = databasepath
+        self.features = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.connection = None
+
+    def __len__(self):
+        return len(self.features)
+
+    def get(self, source, language):
+        """
+        Get the features of a source, computing them if they are not cached.
+
+        Args:
+            source: A Source.
+            language: The language title and authors are extracted for, e.g. 'en'.
+
+        Returns:
+            A feature dictionary, see Source.features.
+        """
+        key = self.key(source, language)
+        if key in self.features:
+            self.features.move_to_end(key)
+            self.hits += 1
+            return self._copy(self.features[key])
+        features = self._load(key)
+        if features is None:
+            features = source.features(language)
+            self.misses += 1
+            self._store(key, features)
+        else:
+            self.hits += 1
+        self.features[key] = features
+        if len(self.features) > self.maxsize:
+            self.features.popitem(last=False)
+        return self._copy(features)
+
+    def key(self, source, language):
+        """
+        Get the cache key of a source.
+
+        Args:
+            source: A Source.
+            language: The language title and authors are extracted for.
+
+        Returns:
+            The hex digest of the serialised HTML of the source and the language.
+        """
+        return sha1(etree.tostring(source.html, with_tail=False) + language.encode("utf-8")).hexdigest()
+
+    def close(self):
+        """
+        Close the connection to the database.
+        """
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def _connect(self):
+        """
+        Open the connection to the database and create its table if necessary.
+        """
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.databasepath, timeout=60)
+            self.connection.execute("CREATE TABLE IF NOT EXISTS features (key TEXT PRIMARY KEY, features TEXT)")
+            self.connection.commit()
+        return self.connection
+
+    def _load(self, key):
+        """
+        Load features from the database.
+        """
+        if self.databasepath is None:
+            return None
+        row = self._connect().execute("SELECT features FROM features WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        features = loads(row[0])
+        features["authors"] = [tuple(author) for author in features["authors"]]
+        return features
+
+    def _store(self, key, features):
+        """
+        Store features in the database; features stored by another process meanwhile are kept.
+        """
+        if self.databasepath is None:
+            return
+        connection = self._connect()
+        connection.execute("INSERT OR IGNORE INTO features VALUES (?, ?)", (key, dumps(features)))
+        connection.commit()
+
+    def _copy(self, features):
+        """
+        Copy the lists of features so that callers cannot alter the cached ones.
+        """
+        return {key:list(value) if isinstance(value, list) else value for key, value in features.items()}
+
+    def __getstate__(self):
+        # Connections cannot be pickled; worker processes open their own.
+        state = self.__dict__.copy()
+        state["connection"] = None
+        return state
@@ -1,5 +1,78 @@
 from datetime import datetime
 from pprint import pformat
+import numpy as np
+
+FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+def parse_timestamp(timestamp_string):
+    """
+    Parses a timestamp string of the fixed format YYYY-MM-DDTHH:MM:SSZ by slicing its fields;
+    strings of any other format are left to datetime.strptime.
+
+    Args:
+        timestamp_string: Timestamp as string as extracted from revision history.
+
+    Returns:
+        A datetime object.
+    """
+    if is_fixed_format(timestamp_string):
+        try:
+            return datetime(int(timestamp_string[0:4]), int(timestamp_string[5:7]), int(timestamp_string[8:10]),
+                            int(timestamp_string[11:13]), int(timestamp_string[14:16]), int(timestamp_string[17:19]))
+        except ValueError:
+            pass
+    return datetime.strptime(timestamp_string, FORMAT)
+
+def is_fixed_format(timestamp_string):
+    """
+    Check whether a timestamp string is of the fixed format YYYY-MM-DDTHH:MM:SSZ.
+
+    Args:
+        timestamp_string: Timestamp as string.
+
+    Returns:
+        True if all separators are in place and all fields are digits, else False.
+    """
+    return len(timestamp_string) == 20 and timestamp_string[4] == timestamp_string[7] == "-" and timestamp_string[10] == "T" and \
+           timestamp_string[13] == timestamp_string[16] == ":" and timestamp_string[19] == "Z" and \
+           timestamp_string.isascii() and timestamp_string.replace("-", "").replace(":", "")[:-1].replace("T", "").isdigit()
+
+def timestamp_column(timestamp_strings):
+    """
+    Converts timestamp strings to a NumPy column, e.g. the timestamps of a whole revision history.
+
+    Args:
+        timestamp_strings: Iterable of timestamp strings of the format YYYY-MM-DDTHH:MM:SSZ.
+
+    Returns:
+        A NumPy array of dtype datetime64[s].
+    """
+    # Cutting off the 'Z' leaves ISO 8601 strings NumPy parses without timezone warnings.
+    return np.array(list(timestamp_strings), dtype=np.str_).astype("U19").astype("datetime64[s]")
+
+def column_years(column):
+    """
+    Get the years of a timestamp column.
+
+    Args:
+        column: A NumPy array of dtype datetime64.
+
+    Returns:
+        A NumPy array of years as integers.
+    """
+    return column.astype("datetime64[Y]").astype(np.int64) + 1970
+
+def column_months(column):
+    """
+    Get the months of a timestamp column.
+
+    Args:
+        column: A NumPy array of dtype datetime64.
+
+    Returns:
+        A NumPy array of months as integers from 1 to 12.
+    """
+    return column.astype("datetime64[M]").astype(np.int64) % 12 + 1
 
 class Timestamp:
     """
@@ -14,8 +87,9 @@ class Timestamp:
         minute: The minute of the timestamp.
         second: The second of the timestamp.
         string: Timestamp as string.
-    """    
-    
+    """
+    __slots__ = ("datetime", "year", "month", "day", "hour", "minute", "second", "string")
+
     def __init__(self, timestamp_string):
         """
         Initialises the timestamp.
@@ -24,14 +98,15 @@ class Timestamp:
             timestamp_string: Timestamp as string as extracted from revision history.
         """
 
-        self.datetime = datetime.strptime(timestamp_string, "%Y-%m-%dT%H:%M:%SZ")
+        self.datetime = parse_timestamp(timestamp_string)
         self.year = self.datetime.year
         self.month = self.datetime.month
         self.day = self.datetime.day
         self.hour = self.datetime.hour
         self.minute = self.datetime.minute
         self.second = self.datetime.second
-        self.string = str(self.datetime)
+        # Slicing a string of the fixed format is faster than formatting the datetime object.
+        self.string = timestamp_string[:10] + " " + timestamp_string[11:19] if is_fixed_format(timestamp_string) else str(self.datetime)
 
     def timestamp_string(self):
         """
@@ -40,9 +115,7 @@ class Timestamp:
         Returns:
             A string of the format YYYY-MM-DDTHH:MM:SSZ.
         """
-        return self.datetime.strftime("%Y-%m-%dT%H:%M:%SZ")
+        return self.string[:10] + "T" + self.string[11:] + "Z"
 
     def __str__(self):
-        return pformat(self.__dict__)
-
-
+        return pformat({attribute:getattr(self, attribute) for attribute in self.__slots__})
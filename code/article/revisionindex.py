@@ -0,0 +1,209 @@
+from .revision.lazyrevision import HEAVY_FIELDS, split_revision_line
+from .delta import is_delta
+from .archive import line_digest, open_revision_file, revision_file_size
+from bisect import bisect_left, bisect_right, insort
+from hashlib import sha1
+from json import dump, load
+from os.path import exists
+
+class RevisionIndex:
+    """
+    Byte-offset index of the line JSON file of revision history of Wikipedia article.
+
+    The index is saved next to the revision file as <filepath>_index.json and
+    holds one entry per revision line:
+        [index, revid, parentid, timestamp, offset, length, spans, keyframe]
+    with spans mapping the heavy fields wikitext and html to the [start, end]
+    character spans of their values in the line, which allows decoding them lazily,
+    and keyframe the offset of the nearest line at or before the revision that stores
+    its heavy fields in full, i.e. the line to start from to reconstruct delta-encoded revisions.
+    It is updated whenever the size of the revision file or its last line indexed has changed;
+    lines appended to the revision file are indexed incrementally,
+    i.e. if the last line indexed is unchanged, any other change triggers a rebuild.
+
+    Attributes:
+        filepath: The path to the revision file.
+        indexpath: The path to the index file.
+        size: The size of the revision file in bytes when last indexed.
+        tail: The hex digest of the last line indexed; None if there is none.
+        entries: The index entries in the order of the revision file.
+        positions: Maps revision index to position in entries.
+        revids: Maps revid to position in entries.
+        timestamps: Maps timestamp string to position in entries.
+        chronology: Sorted list of tuples of timestamp string and position in entries.
+        offsets: Maps byte offset to position in entries.
+    """
+    INDEX = 0
+    REVID = 1
+    PARENTID = 2
+    TIMESTAMP = 3
+    OFFSET = 4
+    LENGTH = 5
+    SPANS = 6
+    KEYFRAME = 7
+    VERSION = 3
+
+    def __init__(self, filepath):
+        """
+        Args:
+            filepath: The path to the revision file.
+        """
+        self.filepath = filepath
+        self.indexpath = filepath + "_index.json"
+        self.size = 0
+        self.tail = None
+        self.entries = []
+        self.positions = {}
+        self.revids = {}
+        self.timestamps = {}
+        self.chronology = []
+        self.offsets = {}
+        if exists(self.indexpath):
+            try:
+                with open(self.indexpath) as file:
+                    index = load(file)
+                if index.get("version") == self.VERSION:
+                    self.size = index["size"]
+                    self.tail = index["tail"]
+                    self.entries = index["entries"]
+            except (ValueError, KeyError):
+                self.size = 0
+                self.tail = None
+                self.entries = []
+        self._map(0)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def update(self):
+        """
+        Update the index if the revision file changed since it was last indexed.
+
+        Returns:
+            True if the index was updated, else False.
+        """
+        size = revision_file_size(self.filepath)
+        appended = self._appended()
+        if size == self.size and appended:
+            return False
+        if size < self.size or not appended:
+            self.size = 0
+            self.tail = None
+            self.entries = []
+            self.positions = {}
+            self.revids = {}
+            self.timestamps = {}
+            self.chronology = []
+            self.offsets = {}
+        start = len(self.entries)
+        keyframe = self.entries[-1][self.KEYFRAME] if self.entries else 0
+        with open_revision_file(self.filepath) as file:
+            file.seek(self.size)
+            offset = self.size
+            for line in file:
+                if not line.endswith(b"\n"):
+                    # Incomplete line of a file that is currently being written.
+                    break
+                text = line.decode("utf-8")
+                revision, spans = split_revision_line(text)
+                if not any(text[first] == "[" for first, final in spans.values()) and \
+                   not any(is_delta(revision.get(field)) for field in HEAVY_FIELDS):
+                    keyframe = offset
+                self.entries.append([revision["index"],
+                                     revision["revid"],
+                                     revision["parentid"],
+                                     revision["timestamp"],
+                                     offset,
+                                     len(line),
+                                     spans,
+                                     keyframe])
+                offset += len(line)
+                self.tail = sha1(line).hexdigest()
+        self.size = offset
+        self._map(start)
+        self.save()
+        return True
+
+    def save(self):
+        """
+        Save index to file.
+        """
+        with open(self.indexpath, "w") as file:
+            dump({"version":self.VERSION, "size":self.size, "tail":self.tail, "entries":self.entries}, file)
+
+    def entry(self, index = None, revid = None, timestamp = None):
+        """
+        Get the first entry with the provided index, revid or timestamp.
+
+        Args:
+            index: The index of the revision.
+            revid: The revid of the revision.
+            timestamp: The timestamp string of the revision, i.e. YYYY-MM-DDTHH:MM:SSZ.
+
+        Returns:
+            An index entry; None if neither index, revid or timestamp match.
+        """
+        candidates = [mapping[key] for mapping, key in [(self.positions, index),
+                                                         (self.revids, revid),
+                                                         (self.timestamps, timestamp)]
+                      if key is not None and key in mapping]
+        return self.entries[min(candidates)] if candidates else None
+
+    def position_at(self, timestamp):
+        """
+        Get the position of the revision live at the provided time,
+        i.e. the last revision with a timestamp not after it.
+
+        Args:
+            timestamp: The timestamp string, i.e. YYYY-MM-DDTHH:MM:SSZ.
+
+        Returns:
+            The position in entries; None if the time precedes the first revision.
+        """
+        position = bisect_right(self.chronology, (timestamp, float("inf"))) - 1
+        return self.chronology[position][1] if position >= 0 else None
+
+    def positions_between(self, start, end):
+        """
+        Get the positions of all revisions with timestamps from start to end (both included).
+
+        Args:
+            start: The first timestamp string, i.e. YYYY-MM-DDTHH:MM:SSZ.
+            end: The final timestamp string, i.e. YYYY-MM-DDTHH:MM:SSZ.
+
+        Returns:
+            A list of positions in entries in chronological order.
+        """
+        first = bisect_left(self.chronology, (start, -1))
+        final = bisect_right(self.chronology, (end, float("inf")))
+        return [position for timestamp, position in self.chronology[first:final]]
+
+    def _appended(self):
+        """
+        Check whether the last line indexed is still in place,
+        i.e. whether the file was only appended to.
+
+        Returns:
+            True if the last line indexed is unchanged, else False.
+        """
+        if not self.size:
+            return True
+        if not self.entries or self.tail is None:
+            return False
+        return line_digest(self.filepath, self.size, self.entries[-1][self.LENGTH]) == self.tail
+
+    def _map(self, start):
+        """
+        Add entries from start onwards to the lookup maps.
+        Only the first occurrence of each key is mapped.
+
+        Args:
+            start: The position of the first entry to map.
+        """
+        for position in range(start, len(self.entries)):
+            entry = self.entries[position]
+            self.positions.setdefault(entry[self.INDEX], position)
+            self.revids.setdefault(entry[self.REVID], position)
+            self.timestamps.setdefault(entry[self.TIMESTAMP], position)
+            insort(self.chronology, (entry[self.TIMESTAMP], position))
+            self.offsets[entry[self.OFFSET]] = position
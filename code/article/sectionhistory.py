@@ -0,0 +1,264 @@
+from .archive import line_digest, revision_file_size
+from .revisionindex import RevisionIndex
+from bisect import bisect_left
+from hashlib import sha1
+from json import dump, dumps, load
+from os.path import exists
+
+class SectionHistory:
+    """
+    Change history of the sections of all revisions of the line JSON file of revision history
+    of Wikipedia article, so that section-scoped analyses can skip revisions in which
+    the sections they analyse did not change, without parsing them.
+
+    Sections are identified by their path in the section tree, see Section.parent_path;
+    repeated paths within a revision are numbered from the second one on, e.g. 'root|Notes#2'.
+    Revisions are identified by their position in the revision file.
+
+    The history is saved next to the revision file as <filepath>_sections.json.
+    Revisions appended to the revision file are added incrementally;
+    the history is rebuilt if the last revision in the history changed or the revision file shrank.
+
+    Attributes:
+        filepath: The path to the revision file.
+        historypath: The path to the section history.
+        size: The size of the revision file in bytes when the history was last updated.
+        tail: List of length and hex digest of the line of the last revision in the history; None if there is none.
+        count: The number of revisions in the history.
+        orders: List of [position, sections] for every revision in which the section tree changed,
+                sections being the list of [key, name, level] of all sections in document order.
+        hashes: Maps section keys to lists of [position, hash] for every revision in which
+                the content hash of the section changed; the hash is None from the revision on
+                in which the section was removed.
+        sources: List of [position, hash] for every revision in which the reference ids of the sources changed.
+    """
+    KEY = 0
+    NAME = 1
+    LEVEL = 2
+
+    def __init__(self, filepath):
+        """
+        Args:
+            filepath: The path to the revision file.
+        """
+        self.filepath = filepath
+        self.historypath = filepath + "_sections.json"
+        self.size = 0
+        self.tail = None
+        self.count = 0
+        self.orders = []
+        self.hashes = {}
+        self.sources = []
+        if exists(self.historypath):
+            try:
+                with open(self.historypath) as file:
+                    history = load(file)
+                self.size = history["size"]
+                self.tail = history["tail"]
+                self.count = history["count"]
+                self.orders = history["orders"]
+                self.hashes = history["hashes"]
+                self.sources = history["sources"]
+            except (ValueError, KeyError):
+                self.size = 0
+                self.tail = None
+                self.count = 0
+                self.orders = []
+                self.hashes = {}
+                self.sources = []
+
+    def __len__(self):
+        return self.count
+
+    def update(self, article):
+        """
+        Add the revisions not yet in the history.
+
+        Args:
+            article: The Article of the revision file.
+
+        Returns:
+            True if the history was updated, else False.
+        """
+        size = revision_file_size(self.filepath)
+        appended = self._appended()
+        if size == self.size and appended:
+            return False
+        if size < self.size or not appended:
+            self.count = 0
+            self.orders = []
+            self.hashes = {}
+            self.sources = []
+        index = article.get_index()
+        for position, revision in enumerate(article.yield_revisions(first = self.count), self.count):
+            self.add(position, revision)
+        self.size = index.size
+        self.tail = [index.entries[-1][RevisionIndex.LENGTH], index.tail] if index.entries else None
+        self.save()
+        return True
+
+    def add(self, position, revision):
+        """
+        Record the sections and sources of a revision.
+
+        Args:
+            position: The position of the revision in the revision file.
+            revision: A Revision.
+        """
+        sections = []
+        hashes = {}
+        occurrences = {}
+        for section in revision.section_tree().walk():
+            path = section.parent_path()
+            occurrences[path] = occurrences.get(path, 0) + 1
+            key = path if occurrences[path] == 1 else path + "#" + str(occurrences[path])
+            sections.append([key, section.name, section.level])
+            hashes[key] = section.get_hash()
+        previous_sections = self.orders[-1][1] if self.orders else []
+        if sections != previous_sections:
+            self.orders.append([position, sections])
+            for key, _, _ in previous_sections:
+                if key not in hashes:
+                    self.hashes[key].append([position, None])
+        for key, digest in hashes.items():
+            changes = self.hashes.setdefault(key, [])
+            if not changes or changes[-1][1] != digest:
+                changes.append([position, digest])
+        digest = sha1(dumps([source.get_reference_ids() for source in revision.get_references()]).encode("utf-8")).hexdigest()
+        if not self.sources or self.sources[-1][1] != digest:
+            self.sources.append([position, digest])
+        revision.release()
+        self.count = position + 1
+
+    def save(self):
+        """
+        Save section history to file.
+        """
+        with open(self.historypath, "w") as file:
+            dump({"size":self.size,
+                  "tail":self.tail,
+                  "count":self.count,
+                  "orders":self.orders,
+                  "hashes":self.hashes,
+                  "sources":self.sources}, file)
+
+    def sections(self, position):
+        """
+        Get the sections of a revision.
+
+        Args:
+            position: The position of the revision in the revision file.
+
+        Returns:
+            The list of [key, name, level] of all sections in document order.
+        """
+        sections = self._at(self.orders, position)
+        return sections if sections is not None else []
+
+    def changes(self, key):
+        """
+        Get the revisions in which a section changed.
+
+        Args:
+            key: The key of the section.
+
+        Returns:
+            A list of positions.
+        """
+        return [position for position, _ in self.hashes.get(key, [])]
+
+    def get_hash(self, key, position):
+        """
+        Get the content hash of a section in a revision.
+
+        Args:
+            key: The key of the section.
+            position: The position of the revision in the revision file.
+
+        Returns:
+            The hex digest; None if the section does not exist in the revision.
+        """
+        return self._at(self.hashes.get(key, []), position)
+
+    def get_sources_hash(self, position):
+        """
+        Get the hash of the reference ids of the sources of a revision.
+
+        Args:
+            position: The position of the revision in the revision file.
+
+        Returns:
+            The hex digest; None if the revision is not in the history.
+        """
+        return self._at(self.sources, position)
+
+    def find(self, strings, position, lower = False):
+        """
+        Find all sections of a revision with any of the given strings in the name, like Section.find.
+
+        Args:
+            strings: A list of strings to search in the name.
+            position: The position of the revision in the revision file.
+            lower: Lower search strings if True.
+
+        Returns:
+            A list of section keys.
+        """
+        sections = self.sections(position)
+        if not sections:
+            return []
+        strings = [(string.lower() if lower else string) for string in strings]
+        keys = [sections[0][self.KEY]] if any([string in sections[0][self.NAME] for string in strings]) else []
+        for key, name, _ in sections[1:]:
+            if any(string in (name.lower() if lower else name) for string in strings):
+                keys.append(key)
+        return keys
+
+    def state(self, key, position, level = 0):
+        """
+        Get the state of a section in a revision, i.e. the keys and content hashes of the section
+        and its subsections to the given depth, which only differs between two revisions
+        if the text of the section to that depth differs.
+
+        Args:
+            key: The key of the section.
+            position: The position of the revision in the revision file.
+            level: The depth to which subsections are included; all subsections if negative.
+
+        Returns:
+            A list of [key, hash] in document order; empty if the section does not exist in the revision.
+        """
+        sections = self.sections(position)
+        keys = [section[self.KEY] for section in sections]
+        if key not in keys:
+            return []
+        first = keys.index(key)
+        base = sections[first][self.LEVEL]
+        state = [[key, self.get_hash(key, position)]]
+        for subsection_key, _, subsection_level in sections[first + 1:]:
+            if subsection_level <= base:
+                break
+            if level < 0 or subsection_level - base <= level:
+                state.append([subsection_key, self.get_hash(subsection_key, position)])
+        return state
+
+    def _appended(self):
+        """
+        Check whether the line of the last revision in the history is still in place,
+        i.e. whether the revision file was only appended to.
+        """
+        if not self.size:
+            return True
+        if self.tail is None:
+            return False
+        return line_digest(self.filepath, self.size, self.tail[0]) == self.tail[1]
+
+    def _at(self, changes, position):
+        """
+        Get the value of a list of [position, value] changes at a position.
+        """
+        if position >= self.count:
+            return None
+        # [position + 1] sorts before all changes from the next position on, whatever their value.
+        number = bisect_left(changes, [position + 1]) - 1
+        return changes[number][1] if number >= 0 else None
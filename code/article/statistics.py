@@ -0,0 +1,118 @@
+from .metadata import Metadata
+from .archive import line_digest, revision_file_size
+from .revision.timestamp import timestamp_column
+from json import dump, load
+from os.path import exists
+import numpy as np
+
+class Statistics:
+    """
+    Revision statistics of the line JSON file of revision history of Wikipedia article,
+    i.e. the revision timestamps, the number of revisions per month, the size differences
+    between consecutive revisions and the number of revisions per editor.
+
+    The statistics are aggregated in one pass over the metadata store and cached
+    next to the revision file as <filepath>_statistics.json.
+    They are recomputed whenever the size of the revision file or its last revision counted has changed.
+
+    Attributes:
+        filepath: The path to the revision file.
+        statisticspath: The path to the statistics file.
+        size: The size of the revision file in bytes when the statistics were last computed.
+        tail: List of end offset, length and hex digest of the line of the last revision counted,
+              see Metadata; None if there is none.
+        timestamps: The timestamp strings of all revisions, i.e. YYYY-MM-DDTHH:MM:SSZ.
+        months: Maps every month of the years from the first to the last revision, i.e. YYYY/MM, to its number of revisions.
+        size_differences: The size differences between all revisions; the first value is the size of the first revision.
+        editors: Maps usernames to their number of revisions.
+    """
+    def __init__(self, filepath):
+        """
+        Args:
+            filepath: The path to the revision file.
+        """
+        self.filepath = filepath
+        self.statisticspath = filepath + "_statistics.json"
+        self.size = 0
+        self.tail = None
+        self.timestamps = []
+        self.months = {}
+        self.size_differences = []
+        self.editors = {}
+        if exists(self.statisticspath):
+            try:
+                with open(self.statisticspath) as file:
+                    statistics = load(file)
+                self.size = statistics["size"]
+                self.tail = statistics["tail"]
+                self.timestamps = statistics["timestamps"]
+                self.months = statistics["months"]
+                self.size_differences = statistics["size_differences"]
+                self.editors = statistics["editors"]
+            except (ValueError, KeyError):
+                self.size = 0
+                self.tail = None
+
+    def current(self):
+        """
+        Check whether the statistics cover the revision file as it is.
+
+        Returns:
+            True if neither the size of the revision file nor the last revision counted changed, else False.
+        """
+        return self.size == revision_file_size(self.filepath) and self._unchanged()
+
+    def update(self, metadata = None):
+        """
+        Recompute the statistics if the revision file changed since they were last computed.
+
+        Args:
+            metadata: The Metadata store of the revision file; loaded if None.
+
+        Returns:
+            True if the statistics were recomputed, else False.
+        """
+        if self.current():
+            return False
+        size = revision_file_size(self.filepath)
+        if metadata is None:
+            metadata = Metadata(self.filepath)
+        metadata.update()
+        self.timestamps = metadata["timestamp"].tolist()
+        self.months = {}
+        sizes = metadata["size"]
+        self.size_differences = np.diff(sizes, prepend=0).tolist() if len(sizes) else []
+        self.editors = {}
+        for user in metadata["user"].tolist():
+            self.editors[user] = self.editors.get(user, 0) + 1
+        if self.timestamps:
+            # Revisions are counted per month from January of the first year to December of the last year.
+            months = timestamp_column(self.timestamps).astype("datetime64[M]")
+            first = months.min().astype("datetime64[Y]").astype("datetime64[M]")
+            final = (months.max().astype("datetime64[Y]") + 1).astype("datetime64[M]")
+            counts = np.bincount((months - first).astype(np.int64), minlength=int((final - first).astype(np.int64)))
+            self.months = {month.replace("-", "/"):count for month, count in zip(np.datetime_as_string(np.arange(first, final)).tolist(), counts.tolist())}
+        self.size = size
+        self.tail = [metadata.size, metadata.tail[0], metadata.tail[1]] if metadata.tail else None
+        self.save()
+        return True
+
+    def save(self):
+        """
+        Save statistics to file.
+        """
+        with open(self.statisticspath, "w") as file:
+            dump({"size":self.size,
+                  "tail":self.tail,
+                  "timestamps":self.timestamps,
+                  "months":self.months,
+                  "size_differences":self.size_differences,
+                  "editors":self.editors}, file)
+
+    def _unchanged(self):
+        """
+        Check whether the line of the last revision counted is still in place.
+        """
+        if self.tail is None:
+            return True
+        return line_digest(self.filepath, self.tail[0], self.tail[1]) == self.tail[2]
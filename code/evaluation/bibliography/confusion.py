@@ -8,8 +8,8 @@ from numpy import std, mean
 from datetime import datetime
 
 def delta(timestamp1, timestamp2):
-    date1 = datetime.strptime(timestamp1, "%Y-%m-%d %H:%M:%S")
-    date2 = datetime.strptime(timestamp2, "%Y-%m-%d %H:%M:%S")
+    date1 = datetime.fromisoformat(timestamp1)
+    date2 = datetime.fromisoformat(timestamp2)
     return - (((date2 - date1).total_seconds() / 60) / 60) / 24
 
 methods = ["titles",
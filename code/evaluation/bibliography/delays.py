@@ -32,8 +32,8 @@ def std(array):
     return round(numpy.std(array), 1)
 
 def delta(timestamp1, timestamp2):
-    date1 = datetime.strptime(timestamp1, "%Y-%m-%d %H:%M:%S")
-    date2 = datetime.strptime(timestamp2, "%Y-%m-%d %H:%M:%S")
+    date1 = datetime.fromisoformat(timestamp1)
+    date2 = datetime.fromisoformat(timestamp2)
     return (date2 - date1).days
 
 json_paths = sorted(glob("../../../analysis/bibliography/2021_11_03_evaluated_2/publication-events-field-matched/*_correct.json"))
@@ -17,7 +17,7 @@ authors = {"Doudna":[],"Charpentier":[],"Lander":[],"Barrangou":[],"Mojica":[]}
 start = datetime.now()
 
 with Pool() as pool:
-    tokensets = pool.map(get_tokenset, article.yield_revisions())
+    tokensets = pool.map(get_tokenset, article.yield_extracted_revisions())
 
 for revid, timestamp, tokens in tokensets:
     for author in authors:
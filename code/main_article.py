@@ -1,15 +1,20 @@
 from article.article import Article
+from article.corpus import Corpus
 from timeline.eventlist import EventList
 from timeline.accountlist import AccountList
 from bibliography.bibliography import Bibliography
-from utility.utils import flatten_list_of_lists, levenshtein
+from utility.utils import flatten_list_of_lists
+from utility.multipatternmatcher import MultiPatternMatcher
+from utility.editdistanceindex import EditDistanceIndex
 from datetime import datetime
-from multiprocessing import Pool
+from multiprocessing import Pipe, Pool, Process
+from copy import deepcopy
 from unicodedata import normalize
 from argparse import ArgumentParser
 from os.path import basename, exists, sep
-from os import makedirs
-from json import load, dumps
+from os import makedirs, replace
+from json import load
+from pickle import dumps, loads
 from urllib.parse import quote, unquote
 from re import split
 import logging
@@ -33,8 +38,8 @@ def get_logger(directory):
     logger.addHandler(file_handler)
     return logger
 
-def occurrence(revision, result):
-    return {"index":revision.index,"url":revision.url,"timestamp":revision.timestamp.string,"result":result}
+def occurrence(features, result):
+    return {"index":features["index"],"url":features["url"],"timestamp":features["timestamp"],"result":result}
 
 def to_ascii(string):
     return normalize("NFD",string).encode("ASCII","ignore").decode("ASCII")
@@ -67,22 +72,22 @@ def skat(gains, ideal, expected, provided):
     return score/ideal
 
 def analyse(event,
-            revision,
-            revision_text_lower,
-            revision_text_lower_ascii,
-            revision_text_lower_ascii_alnum,
-            source_texts,
-            source_texts_ascii,
-            source_titles,
-            source_titles_lower_ascii_alnum,
-            referenced_author_sets_ascii,
-            referenced_pmids,
+            features,
             language,
             thresholds,
             article_title,
             first_or_index,
             heuristics):
 
+    source_texts = features["source_texts"]
+    source_texts_ascii = features["source_texts_ascii"]
+    title_matches = features["title_matches"]
+    referenced_author_sets_ascii = features["referenced_author_sets_ascii"]
+    referenced_pmids = features["referenced_pmids"]
+    found_titles = features["found_titles"]
+    found_dois = features["found_dois"]
+    found_pmids = features["found_pmids"]
+
     NED_LOW = thresholds["NORMALISED_EDIT_DISTANCE_THRESHOLDS"][0]
     NED_MID = thresholds["NORMALISED_EDIT_DISTANCE_THRESHOLDS"][1]
     NED_HIGH = thresholds["NORMALISED_EDIT_DISTANCE_THRESHOLDS"][2]
@@ -95,10 +100,10 @@ def analyse(event,
        and event.trace[article_title][first_or_index].get("verbatim", {}).get("titles", False) == None:
         verbatim_title_results = {}
         for event_bibkey, event_title in event.titles.items():
-            if to_alnum(to_ascii(to_lower(event_title))) in revision_text_lower_ascii_alnum:
-                verbatim_title_results[event_bibkey] = scroll_to_url(revision.url, event_title)
+            if to_alnum(to_ascii(to_lower(event_title))) in found_titles:
+                verbatim_title_results[event_bibkey] = scroll_to_url(features["url"], event_title)
         if len(verbatim_title_results) == len(event.titles.values()):
-            event.trace[article_title][first_or_index]["verbatim"]["titles"] = occurrence(revision, result=verbatim_title_results)
+            event.trace[article_title][first_or_index]["verbatim"]["titles"] = occurrence(features, result=verbatim_title_results)
                 
     ##############################################################################################
 
@@ -107,10 +112,10 @@ def analyse(event,
        and event.trace[article_title][first_or_index].get("verbatim", {}).get("dois", False) == None:
         verbatim_doi_results = {}
         for event_bibkey, event_doi in event.dois.items():
-            if event_doi and to_lower(event_doi) in revision_text_lower:
-                verbatim_doi_results[event_bibkey] = scroll_to_url(revision.url, event_doi)
+            if event_doi and to_lower(event_doi) in found_dois:
+                verbatim_doi_results[event_bibkey] = scroll_to_url(features["url"], event_doi)
         if len(verbatim_doi_results) == len(event.dois):
-            event.trace[article_title][first_or_index]["verbatim"]["dois"] = occurrence(revision, result=verbatim_doi_results)
+            event.trace[article_title][first_or_index]["verbatim"]["dois"] = occurrence(features, result=verbatim_doi_results)
 
     ##############################################################################################
 
@@ -119,10 +124,10 @@ def analyse(event,
        and event.trace[article_title][first_or_index].get("verbatim", {}).get("pmids", False) == None:
         verbatim_pmid_results = {}
         for event_bibkey, event_pmid in event.pmids.items():
-            if event_pmid and event_pmid in revision_text_lower:
-                verbatim_pmid_results[event_bibkey] = scroll_to_url(revision.url, event_pmid)
+            if event_pmid and event_pmid in found_pmids:
+                verbatim_pmid_results[event_bibkey] = scroll_to_url(features["url"], event_pmid)
         if len(verbatim_pmid_results) == len(event.pmids):
-            event.trace[article_title][first_or_index]["verbatim"]["pmids"] = occurrence(revision, result=verbatim_pmid_results)
+            event.trace[article_title][first_or_index]["verbatim"]["pmids"] = occurrence(features, result=verbatim_pmid_results)
 
     #############################################################################################
 
@@ -137,9 +142,10 @@ def analyse(event,
 
                 event_title_lower_ascii_alnum = to_alnum(to_ascii(to_lower(event_title)))
 
-                for source_title_lower_ascii_alnum, source_text in zip(source_titles_lower_ascii_alnum, source_texts):
+                # Only the sources whose titles are below the highest threshold are matched, see build_matchers.
+                for position, normalised_edit_distance in title_matches.get(event_title_lower_ascii_alnum, []):
 
-                    normalised_edit_distance = levenshtein(event_title_lower_ascii_alnum, source_title_lower_ascii_alnum)/len(event_title_lower_ascii_alnum)
+                    source_text = source_texts[position]
 
                     if normalised_edit_distance < relaxed_results[event_bibkey].get("ned_low", (None, NED_LOW))[1]:
                         relaxed_results[event_bibkey]["ned_low"] = (source_text, normalised_edit_distance)
@@ -151,26 +157,26 @@ def analyse(event,
             if event.trace[article_title][first_or_index].get("relaxed", {}).get("ned <= " + str(NED_LOW), False) == None \
                and all([relaxed_results[event_bibkey].get("ned_low", False) for event_bibkey in event.titles]):
                 relaxed_title_results_low = {event_bibkey:{"source_text":{"raw":relaxed_results[event_bibkey]["ned_low"][0],
-                                                                          "goto":scroll_to_url(revision.url, relaxed_results[event_bibkey]["ned_low"][0])},
+                                                                          "goto":scroll_to_url(features["url"], relaxed_results[event_bibkey]["ned_low"][0])},
                                                            "normalised_edit_distance <= " + str(NED_LOW):relaxed_results[event_bibkey]["ned_low"][1]
                                                            } for event_bibkey in event.titles}
-                event.trace[article_title][first_or_index]["relaxed"]["ned <= " + str(NED_LOW)] = occurrence(revision, result=relaxed_title_results_low)
+                event.trace[article_title][first_or_index]["relaxed"]["ned <= " + str(NED_LOW)] = occurrence(features, result=relaxed_title_results_low)
                 
             if event.trace[article_title][first_or_index].get("relaxed", {}).get("ned <= " + str(NED_MID), False) == None \
                and all([relaxed_results[event_bibkey].get("ned_mid", False) for event_bibkey in event.titles]):
                 relaxed_title_results_mid = {event_bibkey:{"source_text":{"raw":relaxed_results[event_bibkey]["ned_mid"][0],
-                                                                          "goto":scroll_to_url(revision.url, relaxed_results[event_bibkey]["ned_mid"][0])},
+                                                                          "goto":scroll_to_url(features["url"], relaxed_results[event_bibkey]["ned_mid"][0])},
                                                            "normalised_edit_distance <= " + str(NED_MID):relaxed_results[event_bibkey]["ned_mid"][1]
                                                            } for event_bibkey in event.titles}
-                event.trace[article_title][first_or_index]["relaxed"]["ned <= " + str(NED_MID)] = occurrence(revision, result=relaxed_title_results_mid)
+                event.trace[article_title][first_or_index]["relaxed"]["ned <= " + str(NED_MID)] = occurrence(features, result=relaxed_title_results_mid)
                 
             if event.trace[article_title][first_or_index].get("relaxed", {}).get("ned <= " + str(NED_HIGH), False) == None \
                and all([relaxed_results[event_bibkey].get("ned_high", False) for event_bibkey in event.titles]):
                 relaxed_title_results_high = {event_bibkey:{"source_text":{"raw":relaxed_results[event_bibkey]["ned_high"][0],
-                                                                           "goto":scroll_to_url(revision.url, relaxed_results[event_bibkey]["ned_high"][0])},
+                                                                           "goto":scroll_to_url(features["url"], relaxed_results[event_bibkey]["ned_high"][0])},
                                                             "normalised_edit_distance <= " + str(NED_HIGH):relaxed_results[event_bibkey]["ned_high"][1]
                                                             } for event_bibkey in event.titles}
-                event.trace[article_title][first_or_index]["relaxed"]["ned <= " + str(NED_HIGH)] = occurrence(revision, result=relaxed_title_results_high)
+                event.trace[article_title][first_or_index]["relaxed"]["ned <= " + str(NED_HIGH)] = occurrence(features, result=relaxed_title_results_high)
 
             #AUTHORS
             if event.authors and event.trace[article_title][first_or_index].get("relaxed", {}).get("ned <= " + str(NED_HIGH), False):
@@ -196,32 +202,539 @@ def analyse(event,
                     if event.trace[article_title][first_or_index].get("relaxed", {}).get("ned_and_ratio", False) == None \
                        and all([relaxed_results[event_bibkey].get("exact", False) for event_bibkey in event.authors]):
                         events_in_references_by_authors_exact_match = {event_bibkey:{"source_text":{"raw":relaxed_results[event_bibkey]["exact"][0],
-                                                                                                    "goto":scroll_to_url(revision.url, relaxed_results[event_bibkey]["exact"][0])},
+                                                                                                    "goto":scroll_to_url(features["url"], relaxed_results[event_bibkey]["exact"][0])},
                                                                                      "ratio_score": relaxed_results[event_bibkey]["exact"][1],
                                                                                      "normalised_edit_distance <= " + str(NED_HIGH):relaxed_results[event_bibkey]["exact"][2]
                                                                                      } for event_bibkey in event.authors}
-                        event.trace[article_title][first_or_index]["relaxed"]["ned_and_ratio"] = occurrence(revision, result=events_in_references_by_authors_exact_match)
+                        event.trace[article_title][first_or_index]["relaxed"]["ned_and_ratio"] = occurrence(features, result=events_in_references_by_authors_exact_match)
 
                     if event.trace[article_title][first_or_index].get("relaxed", {}).get("ned_and_jaccard", False) == None \
                        and all([relaxed_results[event_bibkey].get("jaccard", False) for event_bibkey in event.authors]):
                         events_in_references_by_authors_jaccard = {event_bibkey:{"source_text":{"raw":relaxed_results[event_bibkey]["jaccard"][0],
-                                                                                                "goto":scroll_to_url(revision.url, relaxed_results[event_bibkey]["jaccard"][0])},
+                                                                                                "goto":scroll_to_url(features["url"], relaxed_results[event_bibkey]["jaccard"][0])},
                                                                                  "jaccard_score": relaxed_results[event_bibkey]["jaccard"][1],
                                                                                  "normalised_edit_distance <= " + str(NED_HIGH):relaxed_results[event_bibkey]["jaccard"][2],
                                                                                  } for event_bibkey in event.authors}
-                        event.trace[article_title][first_or_index]["relaxed"]["ned_and_jaccard"] = occurrence(revision, result=events_in_references_by_authors_jaccard)
+                        event.trace[article_title][first_or_index]["relaxed"]["ned_and_jaccard"] = occurrence(features, result=events_in_references_by_authors_jaccard)
 
                     if event.trace[article_title][first_or_index].get("relaxed", {}).get("ned_and_skat", False) == None \
                        and all([relaxed_results[event_bibkey].get("skat", False) for event_bibkey in event.authors]):
                         events_in_references_by_authors_skat = {event_bibkey:{"source_text":{"raw":relaxed_results[event_bibkey]["skat"][0],
-                                                                                             "goto":scroll_to_url(revision.url, relaxed_results[event_bibkey]["skat"][0])},
+                                                                                             "goto":scroll_to_url(features["url"], relaxed_results[event_bibkey]["skat"][0])},
                                                                               "skat_score": relaxed_results[event_bibkey]["skat"][1],
                                                                               "normalised_edit_distance <= " + str(NED_HIGH):relaxed_results[event_bibkey]["skat"][2]
                                                                               } for event_bibkey in event.authors}
-                        event.trace[article_title][first_or_index]["relaxed"]["ned_and_skat"] = occurrence(revision, result=events_in_references_by_authors_skat)
+                        event.trace[article_title][first_or_index]["relaxed"]["ned_and_skat"] = occurrence(features, result=events_in_references_by_authors_skat)
 
     return event
 
+def build_matchers(events, thresholds):
+    """
+    Build the matchers of the verbatim heuristics over the titles, DOIs and PMIDs of all events,
+    each normalised as searched in the full text of revisions, and the index of the normalised titles
+    of all events the titles of sources are matched with in the relaxed heuristics.
+
+    Args:
+        events: A list of Events.
+        thresholds: The thresholds of the relaxed heuristics.
+
+    Returns:
+        A dictionary of MultiPatternMatchers for titles, DOIs and PMIDs and of the EditDistanceIndex of titles.
+    """
+    titles = set([to_alnum(to_ascii(to_lower(title))) for event in events for title in event.titles.values()])
+    dois = set([to_lower(doi) for event in events for doi in event.dois.values() if doi])
+    pmids = set([pmid for event in events for pmid in event.pmids.values() if pmid])
+    # PMIDs are much shorter than titles and DOIs.
+    return {"titles":MultiPatternMatcher(titles),
+            "dois":MultiPatternMatcher(dois),
+            "pmids":MultiPatternMatcher(pmids, 7),
+            "title_distances":EditDistanceIndex(titles, max(thresholds["NORMALISED_EDIT_DISTANCE_THRESHOLDS"]))}
+
+def revision_features(revision, language, matchers):
+    """
+    Get the features of a revision the heuristics are applied to;
+    these are the only data of the revision sent to the worker processes.
+
+    Args:
+        revision: A Revision or ExtractedRevision.
+        language: The language of the revision, en or de.
+        matchers: The matchers of the verbatim heuristics, see build_matchers.
+
+    Returns:
+        A dictionary of the index, URL and timestamp string of the revision,
+        the titles, DOIs and PMIDs of events found in its normalised full texts,
+        the texts and authors of its sources and the sources matching the titles of events.
+    """
+    ### The sources of the revision, i.e. 'References' and 'Further Reading' elements.
+    sources = revision.get_references() + revision.get_further_reading()
+    features = {"index":revision.index,
+                #FIX REVISION URL BY REPLACING SPACES WITH UNDERSCORES
+                "url":revision.url.replace(" ", "_"),
+                "timestamp":revision.timestamp.string}
+    ### The lowered full text.
+    revision_text_lower = to_lower(revision.get_text())
+    ### The lowered ASCII-normalised full text.
+    revision_text_lower_ascii = to_ascii(to_lower(revision_text_lower))
+    ### The lowered ASCII-normalised full text, stripped of any characters except latin alphabet and spaces.
+    revision_text_lower_ascii_alnum = to_alnum(revision_text_lower_ascii)
+    ### The normalised titles, DOIs and PMIDs of events occuring in the full texts, found in one scan each;
+    ### the full texts themselves are not sent to the workers.
+    features["found_titles"] = matchers["titles"].find(revision_text_lower_ascii_alnum)
+    features["found_dois"] = matchers["dois"].find(revision_text_lower)
+    features["found_pmids"] = matchers["pmids"].find(revision_text_lower)
+    ### The texts of all sources, both raw and ASCII-normalised.
+    features["source_texts"] = [source.get_text().strip() for source in sources]
+    features["source_texts_ascii"] = [to_ascii(source_text) for source_text in features["source_texts"]]
+    ### All titles occuring in 'References' and 'Further Reading', both raw and ASCII-normalised and lowered and stripped of any characters except latin alphabet and spaces.
+    source_titles = [source.get_title(language) for source in sources]
+    source_titles_lower_ascii_alnum = [to_alnum(to_ascii(to_lower(source_title))) for source_title in source_titles]
+    ### The positions of the sources and normalised edit distances of their titles to the normalised titles of events,
+    ### for all pairs below the highest threshold; the titles of sources are only compared once per article.
+    features["title_matches"] = {}
+    for position, source_title_lower_ascii_alnum in enumerate(source_titles_lower_ascii_alnum):
+        for title, normalised_edit_distance in matchers["title_distances"].find(source_title_lower_ascii_alnum).items():
+            features["title_matches"].setdefault(title, []).append((position, normalised_edit_distance))
+    ### All authors occuring in 'References' and 'Further Reading', ASCII-normalised.
+    features["referenced_author_sets_ascii"] = [[to_ascii(author[0]) for author in source.get_authors(language)] for source in sources]
+    ### All PMIDs occuring in 'References' and 'Further Reading'.
+    features["referenced_pmids"] = set([])#set(flatten_list_of_lists([source.get_pmids() for source in sources]))
+    return features
+
+def applicable_heuristics(event, heuristics, thresholds):
+    """
+    Determines which heuristics can resolve for an event at all, see analyse:
+    no heuristic applies to an event without titles, a verbatim DOI or PMID heuristic
+    needs the DOIs or PMIDs of all bibentries and the author heuristics need their authors.
+    The other heuristics remain None in every revision and are not waited for.
+
+    Args:
+        event: An Event.
+        heuristics: The dictionary of heuristics, all set to None.
+        thresholds: The thresholds of the relaxed heuristics.
+
+    Returns:
+        A dictionary of the sets of applicable heuristics by kind of heuristic.
+    """
+    applicable = {"verbatim":set(), "relaxed":set()}
+    if not event.titles:
+        return {kind:set() for kind in heuristics}
+    applicable["verbatim"].add("titles")
+    if all(event.dois.values()):
+        applicable["verbatim"].add("dois")
+    if all(event.pmids.values()):
+        applicable["verbatim"].add("pmids")
+    # Empty titles are not matched with the titles of sources, see build_matchers.
+    if all([to_alnum(to_ascii(to_lower(title))) for title in event.titles.values()]):
+        applicable["relaxed"].update(["ned <= " + str(threshold) for threshold in thresholds["NORMALISED_EDIT_DISTANCE_THRESHOLDS"]])
+        # The authors are only compared with the sources matched by the highest threshold.
+        if all(event.authors.values()) and "ned <= " + str(thresholds["NORMALISED_EDIT_DISTANCE_THRESHOLDS"][2]) in heuristics.get("relaxed", {}):
+            applicable["relaxed"].update(["ned_and_ratio", "ned_and_jaccard", "ned_and_skat"])
+    return {kind:set([key for key in keys if key in applicable.get(kind, set())]) for kind, keys in heuristics.items()}
+
+def is_pending(entry, applicable):
+    """
+    Check whether any applicable heuristic of a trace entry is still pending, i.e. None.
+
+    Args:
+        entry: The trace entry of an event, i.e. the dictionary of results by kind of heuristic.
+        applicable: The applicable heuristics of the event, see applicable_heuristics.
+
+    Returns:
+        True if any applicable heuristic is pending, else False.
+    """
+    return any(entry[kind][key] is None for kind, keys in applicable.items() for key in keys)
+
+def analyse_shard(events, applicable, features, language, thresholds, article_title, first_or_index, heuristics):
+    """
+    Analyses a shard of events in a revision.
+    Trace entries created for the revision, i.e. in mode 'full_trace', are removed after the analysis,
+    as only the newly resolved heuristics are kept, by the main process.
+    Events without pending applicable heuristics are skipped.
+
+    Args:
+        events: A list of Events.
+        applicable: The applicable heuristics of each event, see applicable_heuristics.
+        features: The features of the revision, see revision_features.
+        language: The language of the revision, en or de.
+        thresholds: The thresholds of the relaxed heuristics.
+        article_title: The title of the article.
+        first_or_index: 'first_mentioned' or the index of the revision.
+        heuristics: The dictionary of heuristics, all set to None.
+
+    Returns:
+        A list of (position, delta) for every event of the shard with newly resolved heuristics,
+        the delta being the dictionary of the results of these heuristics by kind of heuristic.
+    """
+    deltas = []
+    for position, event in enumerate(events):
+        trace = event.trace[article_title]
+        created = first_or_index not in trace
+        if created:
+            trace[first_or_index] = deepcopy(heuristics)
+        pending = {kind:[key for key in keys if trace[first_or_index][kind][key] is None] for kind, keys in applicable[position].items()}
+        if not any(pending.values()):
+            if created:
+                del trace[first_or_index]
+            continue
+        analyse(event, features, language, thresholds, article_title, first_or_index, heuristics)
+        delta = {kind:{key:trace[first_or_index][kind][key] for key in keys if trace[first_or_index][kind][key] is not None}
+                 for kind, keys in pending.items()}
+        delta = {kind:results for kind, results in delta.items() if results}
+        if created:
+            del trace[first_or_index]
+        if delta:
+            deltas.append((position, delta))
+    return deltas
+
+def serve_shard(connection, events, applicable, language, thresholds, article_title, heuristics):
+    """
+    Keeps a shard of events resident in a worker process and analyses it in every revision
+    whose features are received, sending back the deltas of the traces; stops when None is received.
+
+    Args:
+        connection: The worker end of the pipe to the main process.
+        events: A list of Events.
+        applicable: The applicable heuristics of each event, see applicable_heuristics.
+        language: The language of the article, en or de.
+        thresholds: The thresholds of the relaxed heuristics.
+        article_title: The title of the article.
+        heuristics: The dictionary of heuristics, all set to None.
+    """
+    message = loads(connection.recv_bytes())
+    while message is not None:
+        features, first_or_index = message
+        connection.send_bytes(dumps(analyse_shard(events, applicable, features, language, thresholds, article_title, first_or_index, heuristics)))
+        message = loads(connection.recv_bytes())
+    connection.close()
+
+def start_workers(events, applicable, workers, language, thresholds, article_title, heuristics):
+    """
+    Starts worker processes, each keeping a shard of the events resident for the whole article,
+    so that events and their traces are sent to the workers only once.
+
+    Args:
+        events: A list of Events.
+        applicable: The applicable heuristics of each event, see applicable_heuristics.
+        workers: The number of worker processes.
+        language: The language of the article, en or de.
+        thresholds: The thresholds of the relaxed heuristics.
+        article_title: The title of the article.
+        heuristics: The dictionary of heuristics, all set to None.
+
+    Returns:
+        A list of (process, connection, positions) per worker,
+        positions being the positions of the events of its shard in events.
+    """
+    shards = []
+    for number in range(min(workers, len(events))):
+        positions = list(range(number, len(events), workers))
+        connection, worker_connection = Pipe()
+        process = Process(target=serve_shard,
+                          args=(worker_connection, [events[position] for position in positions], [applicable[position] for position in positions],
+                                language, thresholds, article_title, heuristics),
+                          daemon=True)
+        process.start()
+        worker_connection.close()
+        shards.append((process, connection, positions))
+    return shards
+
+def trace_revision(shards, events, features, article_title, first_or_index, pending = None):
+    """
+    Sends the features of a revision to the workers and merges the deltas of the traces they send back into the events.
+
+    Args:
+        shards: The workers as returned by start_workers.
+        events: The list of Events the shards were taken from.
+        features: The features of the revision, see revision_features.
+        article_title: The title of the article.
+        first_or_index: 'first_mentioned' or the index of the revision.
+        pending: The set of positions of the events with pending heuristics;
+                 workers without any of them are not sent the revision. All workers are if None.
+    """
+    if pending is not None:
+        shards = [shard for shard in shards if any(position in pending for position in shard[2])]
+    # The features are pickled once for all workers.
+    message = dumps((features, first_or_index))
+    for _, connection, _ in shards:
+        connection.send_bytes(message)
+    for _, connection, positions in shards:
+        for position, delta in loads(connection.recv_bytes()):
+            for kind, results in delta.items():
+                events[positions[position]].trace[article_title][first_or_index][kind].update(results)
+
+def stop_workers(shards):
+    """
+    Stops the worker processes.
+
+    Args:
+        shards: The workers as returned by start_workers.
+    """
+    for process, connection, _ in shards:
+        try:
+            connection.send_bytes(dumps(None))
+        except (BrokenPipeError, OSError):
+            pass
+        connection.close()
+        process.join()
+
+# The events and settings kept resident in a worker process tracing chunks of revisions.
+CHUNK_WORKER = {}
+
+def initialise_chunk_worker(events, language, thresholds, article_title, heuristics):
+    """
+    Keeps the events resident in a worker process tracing chunks of revisions, see trace_chunk.
+
+    Args:
+        events: A list of Events.
+        language: The language of the article, en or de.
+        thresholds: The thresholds of the relaxed heuristics.
+        article_title: The title of the article.
+        heuristics: The dictionary of heuristics, all set to None.
+    """
+    CHUNK_WORKER.update({"events":events,
+                         "applicable":[applicable_heuristics(event, heuristics, thresholds) for event in events],
+                         "matchers":build_matchers(events, thresholds),
+                         "language":language,
+                         "thresholds":thresholds,
+                         "article_title":article_title,
+                         "heuristics":heuristics})
+
+def trace_chunk(filepath, first, final):
+    """
+    Traces the resident events in a contiguous chunk of revisions in mode 'first_mentioned',
+    all applicable heuristics of all events being pending at the start of the chunk;
+    the rest of the chunk is skipped once all events are resolved.
+
+    Args:
+        filepath: The path to the revision file of the article.
+        first: First revision index of the chunk.
+        final: Final revision index of the chunk.
+
+    Returns:
+        A tuple of first, a list of (position, delta) for every event with heuristics resolved in the chunk,
+        the delta holding the results of the earliest revision of the chunk per heuristic,
+        and the number of revisions skipped.
+    """
+    events = CHUNK_WORKER["events"]
+    applicable = CHUNK_WORKER["applicable"]
+    article_title = CHUNK_WORKER["article_title"]
+    for event in events:
+        event.trace[article_title] = {"first_mentioned":deepcopy(CHUNK_WORKER["heuristics"])}
+    hits = {}
+    pending = set([position for position in range(len(events)) if any(applicable[position].values())])
+    if not pending:
+        return first, [], final - first + 1
+    traced = 0
+    for revision in Article(filepath).yield_extracted_revisions(first, final):
+        features = revision_features(revision, CHUNK_WORKER["language"], CHUNK_WORKER["matchers"])
+        positions = sorted(pending)
+        for shard_position, delta in analyse_shard([events[position] for position in positions], [applicable[position] for position in positions], features,
+                                                   CHUNK_WORKER["language"], CHUNK_WORKER["thresholds"],
+                                                   article_title, "first_mentioned", CHUNK_WORKER["heuristics"]):
+            for kind, results in delta.items():
+                hits.setdefault(positions[shard_position], {}).setdefault(kind, {}).update(results)
+        traced += 1
+        pending = {position for position in pending if is_pending(events[position].trace[article_title]["first_mentioned"], applicable[position])}
+        if not pending:
+            break
+    return first, list(hits.items()), final - first + 1 - traced
+
+def merge_chunks(events, chunk_results, article_title):
+    """
+    Merges the results of chunks of revisions into the traces of the events in mode 'first_mentioned',
+    keeping the result of the earliest revision per event and heuristic.
+
+    Args:
+        events: The list of Events the chunks were traced for.
+        chunk_results: The results of trace_chunk for all chunks.
+        article_title: The title of the article.
+    """
+    for _, hits, _ in sorted(chunk_results, key=lambda chunk_result: chunk_result[0]):
+        for position, delta in hits:
+            trace = events[position].trace[article_title]["first_mentioned"]
+            for kind, results in delta.items():
+                for key, result in results.items():
+                    if trace[kind][key] is None:
+                        trace[kind][key] = result
+
+def article_filepath(article_directory, article_title, language):
+    """
+    Get the path to the revision file of an article.
+    """
+    return article_directory + sep + quote(article_title.replace(" ","_"), safe="") + "_" + language
+
+def output_filepath(output_directory, article_title):
+    """
+    Get the path to the output files of an article without extension.
+    """
+    return output_directory + sep + quote(article_title.replace(" ","_"), safe="")
+
+def completed(output_directory, article_title):
+    """
+    Check whether the output files of an article were written, see write_outputs.
+    """
+    return exists(output_filepath(output_directory, article_title) + ".txt") and exists(output_filepath(output_directory, article_title) + ".json")
+
+def write_outputs(eventlist, filepath):
+    """
+    Writes the events to a TXT and a JSON file, each to a temporary file first which then replaces the output file,
+    so that an interrupted analysis does not leave incomplete output files.
+
+    Args:
+        eventlist: The EventList.
+        filepath: The path to the output files without extension.
+    """
+    for extension, write in [("txt", eventlist.write_text), ("json", eventlist.write_json)]:
+        write(filepath + "." + extension + ".tmp")
+        replace(filepath + "." + extension + ".tmp", filepath + "." + extension)
+
+def trace_article(article_title, eventlist, article_directory, output_directory, language, mode, heuristics, thresholds, workers, chunks):
+    """
+    Traces the events in the revisions of an article and writes them to output files once done.
+
+    Args:
+        article_title: The title of the article.
+        eventlist: The EventList; the traces of its events are reset.
+        article_directory: The path to the directory where the articles reside.
+        output_directory: The path to the directory the output files are written to.
+        language: The language of the article, en or de.
+        mode: 'first_mentioned' or 'full_trace'.
+        heuristics: The dictionary of heuristics, all set to None.
+        thresholds: The thresholds of the relaxed heuristics.
+        workers: The number of worker processes used for the article.
+        chunks: The number of chunks of revisions traced in parallel in mode 'first_mentioned'.
+
+    Returns:
+        True if the article was traced, False if it does not exist.
+    """
+    logger = logging.getLogger("article_logger")
+    logger.info(article_title)
+
+    filepath = article_filepath(article_directory, article_title, language)
+    if not exists(filepath):
+        logger.info(filepath + " does not exist.")
+        return False
+
+    # The events are traced from scratch for every article.
+    for event in eventlist.events:
+        event.trace = {}
+
+    article = Article(filepath)
+    # Skips parsing the HTML if the revisions were extracted beforehand, see main_extract.py.
+    revisions = article.yield_extracted_revisions()
+    revision = next(revisions, None)
+
+    if mode == "first_mentioned":
+        for event in eventlist.events:
+            event.trace[article_title] = {"first_mentioned":deepcopy(heuristics)}
+    else:
+        for event in eventlist.events:
+            event.trace[article_title] = {}
+
+    if mode == "first_mentioned" and chunks > 1:
+        chunk_arguments = [(filepath, first, final) for first, final in article.shards(chunks)]
+        if workers > 1:
+            with Pool(workers, initializer=initialise_chunk_worker,
+                      initargs=(eventlist.events, language, thresholds, article_title, heuristics)) as pool:
+                chunk_results = pool.starmap(trace_chunk, chunk_arguments, chunksize=1)
+        else:
+            # The resident events are traced from scratch for every chunk, hence copied.
+            initialise_chunk_worker(deepcopy(eventlist.events), language, thresholds, article_title, heuristics)
+            chunk_results = [trace_chunk(*arguments) for arguments in chunk_arguments]
+        merge_chunks(eventlist.events, chunk_results, article_title)
+        logger.info("Skipped " + str(sum([chunk_result[2] for chunk_result in chunk_results])) + " revisions of chunks whose events were all resolved.")
+    else:
+        matchers = build_matchers(eventlist.events, thresholds)
+        # The heuristics that can resolve for each event are only determined once.
+        applicable = [applicable_heuristics(event, heuristics, thresholds) for event in eventlist.events]
+        shards = start_workers(eventlist.events, applicable, workers, language, thresholds, article_title, heuristics) if workers > 1 else []
+
+        # The positions of the events with pending applicable heuristics; all events are traced in every revision in mode 'full_trace'.
+        pending = set([position for position in range(len(applicable)) if any(applicable[position].values())]) if mode == "first_mentioned" else None
+        traced = 0
+
+        try:
+            while revision and (pending is None or pending):
+
+                print(revision.index)
+
+                first_or_index = mode if mode == "first_mentioned" else revision.index
+
+                if mode == "full_trace":
+                    for event in eventlist.events:
+                        event.trace[article_title][revision.index] = deepcopy(heuristics)
+
+                features = revision_features(revision, language, matchers)
+
+                if shards:
+                    trace_revision(shards, eventlist.events, features, article_title, first_or_index, pending)
+                else:
+                    positions = sorted(pending) if pending is not None else range(len(eventlist.events))
+                    analyse_shard([eventlist.events[position] for position in positions], [applicable[position] for position in positions],
+                                  features, language, thresholds, article_title, first_or_index, heuristics)
+                traced += 1
+
+                if pending is not None:
+                    pending = {position for position in pending if is_pending(eventlist.events[position].trace[article_title][first_or_index], applicable[position])}
+                    if not pending:
+                        # Stops reading the article once all events are resolved.
+                        break
+
+                revision = next(revisions, None)
+        finally:
+            stop_workers(shards)
+
+        if pending is not None and not pending:
+            # The revisions are only counted if they were extracted, as counting them otherwise means reading the whole file.
+            extraction = article.extraction()
+            if extraction.current():
+                logger.info("All events resolved after " + str(traced) + " revisions; skipped " + str(len(extraction) - traced) + " revisions.")
+            else:
+                logger.info("All events resolved after " + str(traced) + " revisions.")
+
+    logger.info("Done.")
+
+    write_outputs(eventlist, output_filepath(output_directory, article_title))
+
+    return True
+
+# The events and settings kept resident in a worker process tracing articles.
+ARTICLE_WORKER = {}
+
+def initialise_article_worker(eventlist, settings):
+    """
+    Keeps the events and the settings resident in a worker process tracing articles, see trace_resident_article.
+
+    Args:
+        eventlist: The EventList.
+        settings: The keyword arguments of trace_article except article_title and eventlist.
+    """
+    ARTICLE_WORKER.update({"eventlist":eventlist, "settings":settings})
+
+def trace_resident_article(article_title):
+    """
+    Traces the resident events in an article, see trace_article.
+    """
+    return trace_article(article_title, ARTICLE_WORKER["eventlist"], **ARTICLE_WORKER["settings"])
+
+def schedule(article_titles, article_directory, language):
+    """
+    Orders the articles for processing by the schedule of the Corpus of the article directory,
+    i.e. largest revision file first, so that long-running articles do not end up as stragglers;
+    missing articles come last.
+
+    Args:
+        article_titles: The list of article titles.
+        article_directory: The path to the directory where the articles reside.
+        language: The language of the articles, en or de.
+
+    Returns:
+        The list of article titles.
+    """
+    titles = {article_filepath(article_directory, article_title, language):article_title for article_title in article_titles}
+    scheduled = [titles[filepath] for filepath in Corpus(article_directory, language).schedule() if filepath in titles]
+    return scheduled + [article_title for article_title in article_titles if not exists(article_filepath(article_directory, article_title, language))]
+
 if __name__ == "__main__":
 
     #Regex for matching DOIS (https://www.crossref.org/blog/dois-and-matching-regular-expressions)
@@ -278,12 +791,30 @@ if __name__ == "__main__":
                                  type=int,
                                  default=0.8,
                                  help="Skat score threshold for authors in reference.")
+    argument_parser.add_argument("-w", "--workers",
+                                 type=int,
+                                 default=8,
+                                 help="The number of worker processes each keeping a shard of the events, defaults to 8; no workers are started if 1.")
+    argument_parser.add_argument("-ch", "--chunks",
+                                 type=int,
+                                 default=1,
+                                 help="The number of contiguous chunks of revisions traced in parallel by the workers in mode 'first_mentioned', " + \
+                                      "each keeping all events; revisions are traced in order if 1, the default.")
+    argument_parser.add_argument("-aw", "--articleworkers",
+                                 type=int,
+                                 default=1,
+                                 help="The number of worker processes tracing articles concurrently, largest first, defaults to 1; " + \
+                                      "each article is traced without further workers if greater than 1.")
+    argument_parser.add_argument("-re", "--resume",
+                                 help="The relative or absolute path to an output directory of a previous analysis to continue; " + \
+                                      "articles with output files in it are skipped.")
 
     args = vars(argument_parser.parse_args())
 
     article_directory = args["articledir"]
     event_file = args["eventfile"]
-    output_directory = args["outputdir"] + sep + str(datetime.now())[:-7].replace(":","_").replace("-","_").replace(" ","_")
+    # A previous output directory is continued, skipping the articles completed there.
+    output_directory = args["resume"] if args["resume"] else args["outputdir"] + sep + str(datetime.now())[:-7].replace(":","_").replace("-","_").replace(" ","_")
     conditions = args["conditions"]
     equalling = args["equalling"]
     language = args["language"]
@@ -293,6 +824,15 @@ if __name__ == "__main__":
                   "RATIO_SCORE_THRESHOLD":args["ratio_score_threshold"],
                   "JACCARD_SCORE_THRESHOLD":args["jaccard_score_threshold"],
                   "SKAT_SCORE_THRESHOLD":args["skat_score_threshold"]}
+    workers = args["workers"]
+    chunks = args["chunks"]
+    article_workers = args["articleworkers"]
+
+    NED_LOW = thresholds["NORMALISED_EDIT_DISTANCE_THRESHOLDS"][0]
+    NED_MID = thresholds["NORMALISED_EDIT_DISTANCE_THRESHOLDS"][1]
+    NED_HIGH = thresholds["NORMALISED_EDIT_DISTANCE_THRESHOLDS"][2]
+
+    heuristics = eval(heuristics)
 
     if exists(args["articles"]):
         article_titles = flatten_list_of_lists(load(open(args["articles"])).values())
@@ -310,93 +850,38 @@ if __name__ == "__main__":
     logger.info("Using event file: " + basename(event_file))
     logger.info("Using events with conditions: " + ", ".join(conditions if conditions else ["-"]))
     logger.info("Equalling events to attributes: " + ", ".join(equalling if equalling else ["-"]))
-    logger.info("Trace mode: " + mode)
+    logger.info("Trace mode: " + mode + (" in " + str(chunks) + " chunks of revisions" if mode == "first_mentioned" and chunks > 1 else ""))
     logger.info("Using the below thresholds:")
     for threshold in thresholds:
         logger.info(threshold + ": " + str(thresholds[threshold]))    
     
-    for article_title in article_titles:
-            
-        eventlist = EventList(event_file, bibliography, accountlist, conditions, equalling)
+    if article_workers > 1:
+        logger.info("Tracing " + str(article_workers) + " articles concurrently, each without further workers.")
 
-        logger.info(article_title)
+    # The events are loaded once for all articles.
+    eventlist = EventList(event_file, bibliography, accountlist, conditions, equalling)
+    print("Number of events:", len(eventlist.events))
 
-        filename = quote(article_title.replace(" ","_"), safe="")
-        filepath = article_directory + sep + filename + "_" + language
-        if not exists(filepath):
-            logger.info(filepath + " does not exist.")
-            continue
-        
-        article = Article(filepath)
-        revisions = article.yield_revisions()
-        revision = next(revisions, None)
-
-        print("Number of events:", len(eventlist.events))
-
-        NED_LOW = thresholds["NORMALISED_EDIT_DISTANCE_THRESHOLDS"][0]
-        NED_MID = thresholds["NORMALISED_EDIT_DISTANCE_THRESHOLDS"][1]
-        NED_HIGH = thresholds["NORMALISED_EDIT_DISTANCE_THRESHOLDS"][2]
-
-        if mode == "first_mentioned":
-            for event in eventlist.events:
-                event.trace[article_title] = {"first_mentioned":eval(heuristics)}
+    scheduled_article_titles = []
+    for article_title in schedule(article_titles, article_directory, language):
+        if completed(output_directory, article_title):
+            logger.info(article_title + " already completed.")
         else:
-            for event in eventlist.events:
-                event.trace[article_title] = {}
-
-        while revision:
-
-            print(revision.index)
-
-            if mode == "full_trace":
-                for event in eventlist.events:
-                    event.trace[article_title][revision.index] = eval(heuristics)
-
-            #FIX REVISION URL BY REPLACING SPACES WITH UNDERSCORES
-            revision.url = revision.url.replace(" ", "_")
-
-            ### The lowered full text.
-            revision_text_lower = to_lower(revision.get_text())
-            ### The lowered ASCII-normalised full text.
-            revision_text_lower_ascii = to_ascii(to_lower(revision_text_lower))
-            ### The lowered ASCII-normalised full text, stripped of any characters except latin alphabet and spaces.
-            revision_text_lower_ascii_alnum = to_alnum(revision_text_lower_ascii)
-            ### The sources of the revision, i.e. 'References' and 'Further Reading' elements.
-            sources = revision.get_references() + revision.get_further_reading()
-            ### The texts of all sources, both raw and ASCII-normalised.
-            source_texts = [source.get_text().strip() for source in sources]
-            source_texts_ascii = [to_ascii(source_text) for source_text in source_texts]
-            ### All titles occuring in 'References' and 'Further Reading', both raw and ASCII-normalised and lowered and stripped of any characters except latin alphabet and spaces.
-            source_titles = [source.get_title(language) for source in sources]
-            source_titles_lower_ascii_alnum = [to_alnum(to_ascii(to_lower(source_title))) for source_title in source_titles]
-            ### All authors occuring in 'References' and 'Further Reading', ASCII-normalised.
-            referenced_author_sets_ascii = [[to_ascii(author[0]) for author in source.get_authors(language)] for source in sources]
-            ### All PMIDs occuring in 'References' and 'Further Reading'.
-            referenced_pmids = set([])#set(flatten_list_of_lists([source.get_pmids() for source in sources]))
-
-            with Pool(8) as pool:
-                eventlist.events = pool.starmap(analyse,
-                                                [(event,
-                                                  revision,
-                                                  revision_text_lower,
-                                                  revision_text_lower_ascii,
-                                                  revision_text_lower_ascii_alnum,
-                                                  source_texts,
-                                                  source_texts_ascii,
-                                                  source_titles,
-                                                  source_titles_lower_ascii_alnum,
-                                                  referenced_author_sets_ascii,
-                                                  referenced_pmids,
-                                                  language,
-                                                  thresholds,
-                                                  article_title,
-                                                  mode if mode == "first_mentioned" else revision.index,
-                                                  eval(heuristics))
-                                                 for event in eventlist.events])
-
-            revision = next(revisions, None)
-
-        logger.info("Done.")
-
-        eventlist.write_text(output_directory + sep + filename + "." + "txt")
-        eventlist.write_json(output_directory + sep + filename + "." + "json")
+            scheduled_article_titles.append(article_title)
+
+    settings = {"article_directory":article_directory,
+                "output_directory":output_directory,
+                "language":language,
+                "mode":mode,
+                "heuristics":heuristics,
+                "thresholds":thresholds,
+                "workers":workers if article_workers == 1 else 1,
+                "chunks":chunks}
+
+    if article_workers > 1:
+        with Pool(article_workers, initializer=initialise_article_worker, initargs=(eventlist, settings)) as pool:
+            for _ in pool.imap_unordered(trace_resident_article, scheduled_article_titles):
+                pass
+    else:
+        for article_title in scheduled_article_titles:
+            trace_article(article_title, eventlist, **settings)
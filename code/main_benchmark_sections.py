@@ -0,0 +1,86 @@
+from article.revision.revision import Revision
+from article.revision.section import Section
+from argparse import ArgumentParser
+from copy import deepcopy
+from json import loads
+from lxml import html as HTML
+from timeit import timeit
+
+HEADINGS = ["h1","h2","h3","h4","h5","h6"]
+
+def copy_tree(html, headings = HEADINGS):
+    """
+    Builds a section tree the way Section.tree() did before it referred to ranges of elements,
+    i.e. by copying, clearing and refilling the HTML element of every section at every level.
+
+    Args:
+        html: The lxml HTML element of the section; it is rearranged.
+        headings: The headings subsections may start with.
+
+    Returns:
+        A nested list of (name, subsections) tuples.
+    """
+    elements = deepcopy(html)
+    html.clear()
+    subsections = []
+    heading_level = 0
+    for element in elements:
+        if not heading_level and element.tag in headings:
+            heading_level = headings.index(element.tag) + 1
+        if element.tag not in headings[:max(heading_level,0)]:
+            if not subsections:
+                html.append(element)
+            else:
+                subsections[-1].append(element)
+        else:
+            subsections.append(HTML.fromstring('<div class="section"></div>'))
+            subsections[-1].append(element)
+    return [(subsection[0].xpath("string()").split('[edit]')[0].strip(), copy_tree(subsection, headings[max(heading_level,0):]))
+            for subsection in subsections]
+
+def range_tree(section):
+    """
+    Get the nested names of a section tree built by Section.tree().
+
+    Args:
+        section: A Section.
+
+    Returns:
+        A nested list of (name, subsections) tuples.
+    """
+    return [(subsection.name, range_tree(subsection)) for subsection in section.subsections]
+
+#######################################################################################
+# This file serves as an entry point to benchmark building section trees of revisions.#
+#######################################################################################
+
+if __name__ == "__main__":
+
+    argument_parser = ArgumentParser()
+
+    argument_parser.add_argument("-r", "--revisions",
+                                 default="../tests/data/revision1.json,../tests/data/revision2.json",
+                                 help="Comma-separated relative or absolute paths to line JSON files of revisions; " + \
+                                      "the first revision of each file is used.")
+    argument_parser.add_argument("-n", "--number",
+                                 type=int,
+                                 default=20,
+                                 help="The number of trees built per revision and builder, defaults to 20.")
+
+    args = vars(argument_parser.parse_args())
+
+    for filepath in args["revisions"].split(","):
+        with open(filepath) as file:
+            revision = Revision(**loads(file.readline()))
+        root = revision.etree_from_html().find_class('mw-parser-output')[0]
+
+        # The former builder worked on a copy, as it rearranges the elements.
+        copied = timeit(lambda: copy_tree(deepcopy(root)), number=args["number"]) / args["number"]
+        ranged = timeit(lambda: Section(root).tree(), number=args["number"]) / args["number"]
+
+        print(filepath, len(revision.html), "characters of HTML")
+        print("copying builder:", round(copied * 1000, 2), "ms")
+        print("range builder:  ", round(ranged * 1000, 2), "ms")
+        print("speedup:        ", round(copied / ranged, 1))
+        print("same tree:      ", copy_tree(deepcopy(root)) == range_tree(Section(root).tree()))
+        print()
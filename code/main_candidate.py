@@ -1,4 +1,5 @@
 from article.article import Article
+from article.corpus import Corpus
 from bibliography.bibliography import Bibliography
 from timeline.eventlist import EventList
 from timeline.accountlist import AccountList
@@ -13,7 +14,6 @@ from os.path import basename, exists, getsize, sep
 from os import environ
 from os import makedirs
 from glob import glob
-from multiprocessing import Pool
 from socket import gethostname
 
 import matplotlib.pyplot as plt
@@ -201,7 +201,7 @@ def analyse_scrape(article_filepath, timeslices, identifier_map, wos_keys):
     # Map to keep track of whether revision occurred in a specific timeslice         
     timeslice_revision_map = {timeslice:False for timeslice in timeslices}
 
-    for revision in article.yield_revisions():
+    for revision in article.yield_revisions(lazy=True):
         # Set timeslice this revision pertains to to True
         month = str(revision.timestamp.month).rjust(2, "0")
         year = str(revision.timestamp.year)
@@ -250,7 +250,7 @@ if __name__ == "__main__":
     pattern = ('"((10\.)(" + "|".join([doi[3:] for doi in dois]) + "))" + "|" + ' + \
                '"(([pP][mM][iI][dD][ =:]{0,5})(" + ("|".join(pmids)) + "))"')
 
-    article_filepaths = sorted(glob("../articles/2021-06-01_no_html/*_en"))
+    article_directory = "../articles/2021-06-01_no_html"
     relevant_article_filepath = [("../data/CRISPR_articles_411.txt", "_411"),
                                  ("../data/CRISPR_articles_844.txt", "_844"),
                                  ("../data/CRISPR_articles_relevant_new.txt","_relevant"),
@@ -351,9 +351,9 @@ if __name__ == "__main__":
         
         with open(plot_data_filepath, "w") as csvfile:
             csv_writer = csv.writer(csvfile, delimiter=",")
-            with Pool(16) as pool:
-                lines = [line for line in pool.starmap(analyse_scrape, [(article_filepath, timeslices, identifier_map, wos_keys)
-                                                                         for article_filepath in article_filepaths])]
+            # Largest articles are started first to avoid stragglers.
+            corpus = Corpus(article_directory)
+            lines = corpus.map_articles(analyse_scrape, (timeslices, identifier_map, wos_keys), workers=16)
 
             for line in lines:
                 csv_writer.writerow(line)
@@ -1,5 +1,6 @@
 from wikidump.wikitext_reader import WikitextReader
 from wikidump.wikipedia_dump_reader import WikipediaDumpReader
+from article.revision.timestamp import parse_timestamp
 from json import load
 from pprint import pprint
 from datetime import datetime
@@ -46,7 +47,7 @@ with open(dump_analysis_directory + corpus_batch + ".citations.csv", "w") as cit
                     doi_found = False
                     wtr = WikitextReader(title,pageid,revid,timestamp,wikitext)
                     if verbose: print(title, revid, timestamp)
-                    revision_year = datetime.strptime(wtr.timestamp, "%Y-%m-%dT%H:%M:%SZ").year
+                    revision_year = parse_timestamp(wtr.timestamp).year
                     # set title creation year to year of first revision
                     if not results[title]["title_creation_year"]:
                         title_creation_year = revision_year
@@ -33,11 +33,16 @@ def calculate_contributions(article_title,
     
     article = Article(article_directory + sep + article_title)
 
-    revisions = article.yield_revisions()
+    # Revisions in which the section did not change are not parsed but reuse the previous contribution.
+    section_history = article.section_history(update=True)
+
+    revisions = enumerate(article.yield_revisions(lazy=True))
 
     start = datetime.now()
 
-    revision = next(revisions, None)
+    position, revision = next(revisions, (None, None))
+    keys = section_history.find(section_strings, position, lower=True)
+    previous_state = section_history.state(keys[0], position, section_level) if keys else None
     sections = revision.section_tree().find(section_strings, lower=True)
     text = sections[0].get_text(section_level, include = ["p","li"], with_headings=True) if sections else ""
     previous_text = preprocessor.preprocess(text, lower=False, stopping=False, sentenize=False, tokenize=True)[0]
@@ -54,20 +59,26 @@ def calculate_contributions(article_title,
 
     while revision and revision.index < 2000:
         
-        revision = next(revisions, None)
+        position, revision = next(revisions, (None, None))
 
         if revision.revid in problematic_revids:
             print(revision.index, "- skipping revid", revision.revid)
             continue
-        
-        sections = revision.section_tree().find(section_strings, lower=True)
-        text = sections[0].get_text(section_level, include = ["p","li"], with_headings=True) if sections else ""
 
         if revision:
-            text = preprocessor.preprocess(text, lower=False, stopping=False, sentenize=False, tokenize=True)[0]
-            
-            contribution = Contribution(differ, revision.index, revision.url, len(text), text, revision.user, revision.userid)
-            contribution.diff(previous_contribution)
+            keys = section_history.find(section_strings, position, lower=True)
+            state = section_history.state(keys[0], position, section_level) if keys else None
+            contribution = Contribution(differ, revision.index, revision.url, len(previous_text), previous_text, revision.user, revision.userid)
+            if state == previous_state:
+                # Diffing an unchanged text maps every unit to its previous editor.
+                contribution.character_editor_map = list(previous_contribution.character_editor_map)
+            else:
+                sections = revision.section_tree().find(section_strings, lower=True)
+                text = sections[0].get_text(section_level, include = ["p","li"], with_headings=True) if sections else ""
+                text = preprocessor.preprocess(text, lower=False, stopping=False, sentenize=False, tokenize=True)[0]
+                revision.release()
+                contribution = Contribution(differ, revision.index, revision.url, len(text), text, revision.user, revision.userid)
+                contribution.diff(previous_contribution)
             editors = contribution.editors()
 
             JSN = contribution.json(editors)
@@ -80,7 +91,8 @@ def calculate_contributions(article_title,
             text_file.write(TBL)
 
             previous_contribution = contribution
-            previous_text = text
+            previous_text = contribution.text
+            previous_state = state
 
     end = datetime.now()
 
@@ -0,0 +1,79 @@
+from article.article import Article
+from article.archive import is_archive, open_revision_file, write_archive
+from article.delta import decode_revisions, encode_revisions
+from argparse import ArgumentParser
+from glob import glob
+from os.path import basename, exists, sep
+from os import makedirs
+from urllib.parse import quote
+from re import split
+
+################################################################
+# This file serves as an entry point to convert revision files.#
+################################################################
+
+if __name__ == "__main__":
+
+    argument_parser = ArgumentParser()
+
+    argument_parser.add_argument("-ad", "--articledir",
+                                 help="The relative or absolute path to the directory where the articles reside.")
+    argument_parser.add_argument("-od", "--outputdir",
+                                 help="The relative or absolute path to the directory the converted articles will be saved.")
+    argument_parser.add_argument("-a", "--articles",
+                                 default="",
+                                 help="Quoted string of comma-separated articles, e.g. 'Cas9,The CRISPR JOURNAL'; " + \
+                                      "all articles in the article directory if not provided.")
+    argument_parser.add_argument("-lang", "--language",
+                                 default="en",
+                                 help="en or de, defaults to en.")
+    argument_parser.add_argument("-bs", "--blocksize",
+                                 default=100,
+                                 type=int,
+                                 help="Number of revisions per gzip block, defaults to 100.")
+    argument_parser.add_argument("-kf", "--keyframes",
+                                 default=0,
+                                 type=int,
+                                 help="Number of revisions from one full keyframe to the next, " + \
+                                      "revisions in between are stored as deltas; no delta encoding if 0, the default.")
+    argument_parser.add_argument("--decompress",
+                                 action="store_true",
+                                 help="Convert block-compressed archives back to plain line JSON.")
+
+    args = vars(argument_parser.parse_args())
+
+    article_directory = args["articledir"]
+    output_directory = args["outputdir"]
+    language = args["language"]
+    blocksize = args["blocksize"]
+    keyframes = args["keyframes"]
+    decompress = args["decompress"]
+
+    if args["articles"]:
+        filepaths = [article_directory + sep + quote(article.strip().replace(" ","_"), safe="") + "_" + language
+                     for article in split(" *, *", args["articles"])]
+    else:
+        filepaths = sorted(glob(article_directory + sep + "*_" + language))
+
+    if not exists(output_directory): makedirs(output_directory)
+
+    for filepath in filepaths:
+        if not exists(filepath):
+            print(filepath, "does not exist.")
+            continue
+        output_filepath = output_directory + sep + basename(filepath)
+        with open_revision_file(filepath, "r") as file:
+            lines = decode_revisions(file)
+            if keyframes:
+                lines = encode_revisions(lines, keyframes)
+            if decompress:
+                with open(output_filepath, "w") as output_file:
+                    for line in lines:
+                        output_file.write(line)
+            else:
+                write_archive(lines, output_filepath, blocksize)
+        #Write index and metadata store alongside the converted file.
+        article = Article(output_filepath)
+        article.get_index()
+        article.metadata()
+        print(basename(filepath), "archive" if is_archive(output_filepath) else "line JSON", article.get_revision_count(), "revisions")
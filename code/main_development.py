@@ -1,7 +1,7 @@
 from csv import reader
 import matplotlib.pyplot as plt
 from article.article import Article
-from article.revision.timestamp import Timestamp
+from article.revision.timestamp import Timestamp, column_months, column_years, timestamp_column
 from differ.differ import Differ as custom_differ
 from datetime import datetime
 from json import load, loads, dumps
@@ -78,9 +78,10 @@ def timeslice_data(data, FINAL_YEAR, FINAL_MONTH):
                 timeslices.append(str(month) + "/" + str(year))
     timesliced_data = {timeslice: [] for timeslice in timeslices}
 
-    for item in data:
-        timestamp = Timestamp(item["revision_timestamp"])
-        timeslice = str(timestamp.month) + "/" + str(timestamp.year)
+    column = timestamp_column([item["revision_timestamp"] for item in data])
+
+    for item, month, year in zip(data, column_months(column).tolist(), column_years(column).tolist()):
+        timeslice = str(month) + "/" + str(year)
 
         if timeslice in timesliced_data:
             timesliced_data[timeslice].append(item)
@@ -129,10 +130,19 @@ def calculate_data(articles_filepath, logger, section_strings, section_level, di
     data = []
 
     prev_text = ""
+    prev_state = None
 
     start = datetime.now()
     
-    for revision in article.yield_revisions():
+    # Section trees need the HTML, full texts and sources can be read from the extraction.
+    # Revisions in which neither the section nor the sources changed are not parsed but reuse the previous result.
+    if section_strings != []:
+        section_history = article.section_history(update=True)
+        revisions = article.yield_revisions(lazy=True)
+    else:
+        revisions = article.yield_extracted_revisions()
+
+    for position, revision in enumerate(revisions):
 
         logger.info(str(revision.index + 1) + " " + str(revision.url))
 
@@ -141,20 +151,30 @@ def calculate_data(articles_filepath, logger, section_strings, section_level, di
             continue
         
         if section_strings != []:
-            section_tree = revision.section_tree()
-            section = section_tree.find(section_strings, True)
-            text = section[0].get_text(section_level, include=[
-                                       "p", "li"], with_headings=True) if section else ""
-            if preprocessor:
-                text = preprocessor.preprocess(
-                    text, lower=False, stopping=False, sentenize=False, tokenize=True)[0]
-            references = section[0].get_sources(
-                revision.get_references(), section_level) if section else []
+            keys = section_history.find(section_strings, position, True)
+            state = (section_history.state(keys[0], position, section_level) if keys else None,
+                     section_history.get_sources_hash(position))
+            if state == prev_state:
+                logger.info("Unchanged section")
+                text = prev_text
+            else:
+                section_tree = revision.section_tree()
+                section = section_tree.find(section_strings, True)
+                text = section[0].get_text(section_level, include=[
+                                           "p", "li"], with_headings=True) if section else ""
+                if preprocessor:
+                    text = preprocessor.preprocess(
+                        text, lower=False, stopping=False, sentenize=False, tokenize=True)[0]
+                references = section[0].get_sources(
+                    revision.get_references(), section_level, revision.get_reference_map()) if section else []
+                revision.release()
+            prev_state = state
         else:
             text = revision.get_text()
             references = revision.get_references() + revision.get_further_reading()
             
-        diffs = {differ_name: list(differ.compare(prev_text, text))
+        # The diff of equal texts marks every item as unchanged.
+        diffs = {differ_name: list(differ.compare(prev_text, text)) if text != prev_text else ["  " + item for item in text]
                  for differ_name, differ in differs.items()}
 
         data.append(
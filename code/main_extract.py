@@ -0,0 +1,57 @@
+from article.article import Article
+from article.revision.sourcecache import SourceCache
+from utility.utils import flatten_list_of_lists
+from argparse import ArgumentParser
+from glob import glob
+from json import load
+from os.path import basename, exists, sep
+from urllib.parse import quote
+from re import split
+
+########################################################################
+# This file serves as an entry point to extract revisions for analyses.#
+########################################################################
+
+if __name__ == "__main__":
+
+    argument_parser = ArgumentParser()
+
+    argument_parser.add_argument("-ad", "--articledir",
+                                 help="The relative or absolute path to the directory where the articles reside.")
+    argument_parser.add_argument("-a", "--articles",
+                                 default="",
+                                 help="Either the relative of abolute path to a JSON file of articles " + \
+                                      "or quoted string of comma-separated articles, e.g. 'Cas9,The CRISPR JOURNAL'; " + \
+                                      "all articles in the article directory if not provided.")
+    argument_parser.add_argument("-lang", "--language",
+                                 default="en",
+                                 help="en or de, defaults to en.")
+    argument_parser.add_argument("-sc", "--sourcecache",
+                                 default=None,
+                                 help="The relative or absolute path to an SQLite file caching the features of sources " + \
+                                      "across articles and runs; sources are only cached in memory if not provided.")
+
+    args = vars(argument_parser.parse_args())
+
+    article_directory = args["articledir"]
+    language = args["language"]
+    source_cache = SourceCache(databasepath=args["sourcecache"])
+
+    if not args["articles"]:
+        filepaths = sorted(glob(article_directory + sep + "*_" + language))
+    else:
+        if exists(args["articles"]):
+            article_titles = flatten_list_of_lists(load(open(args["articles"])).values())
+        else:
+            article_titles = [article.strip() for article in split(" *, *", args["articles"])]
+        filepaths = [article_directory + sep + quote(article_title.replace(" ","_"), safe="") + "_" + language
+                     for article_title in article_titles]
+
+    for filepath in filepaths:
+        if not exists(filepath):
+            print(filepath, "does not exist.")
+            continue
+        extraction = Article(filepath).extraction(update=True, source_cache=source_cache)
+        print(basename(filepath), len(extraction), "revisions extracted")
+    print(source_cache.hits, "sources cached,", source_cache.misses, "sources parsed")
+    source_cache.close()
@@ -106,7 +106,7 @@ if __name__ == "__main__":
             #Print all references in History section.
             heading("\nREFERENCES IN HISTORY SECTION", file)
             history_section_tree = section_tree.find("History")[0]
-            for source in history_section_tree.get_sources(revision.get_references()):
+            for source in history_section_tree.get_sources(revision.get_references(), source_map=revision.get_reference_map()):
                 file.write(source.get_text() + "\n")
             
             #Print references and further reading from html.
@@ -1,9 +1,11 @@
 from scraper.scraper import Scraper
+from article.article import Article
 from utility.utils import flatten_list_of_lists
 from json import load
 from re import split
 from argparse import ArgumentParser
 from datetime import datetime
+from os.path import exists, sep
 
 #########################################################
 # This file serves as an entry point to scrape articles.#
@@ -36,6 +38,11 @@ if __name__ == "__main__":
                                  default=float("inf"),
                                  type=float,
                                  help="The maximum number of revisions to scrape, defaults to infinity.")
+    argument_parser.add_argument("-bs", "--blocksize",
+                                 default=0,
+                                 type=int,
+                                 help="Number of revisions per gzip block to save a block-compressed archive, " + \
+                                      "defaults to 0, i.e. plain line JSON.")
     argument_parser.add_argument("--nohtml",
                                  action='store_false',
                                  help="Omit the HTML of the revisions.")
@@ -61,12 +68,18 @@ if __name__ == "__main__":
     NUMBER = args["number"]
     GETHTML = args["nohtml"]
     GETREDIRECT = args["noredirect"]
+    BLOCKSIZE = args["blocksize"]
 
     ARTICLES = wikipedia_articles
     for article in ARTICLES:
-        with Scraper(DIRECTORY, article, LANGUAGE, GETREDIRECT) as scraper:
+        with Scraper(DIRECTORY, article, LANGUAGE, GETREDIRECT, BLOCKSIZE) as scraper:
             scraper.scrape(directory = DIRECTORY,
                            deadline = DEADLINE,
                            number = NUMBER,
                            verbose = True,
                            gethtml = GETHTML)
+        #Write index and metadata store alongside the revision file.
+        if exists(DIRECTORY + sep + scraper.filename):
+            article = Article(DIRECTORY + sep + scraper.filename)
+            article.get_index()
+            article.metadata()
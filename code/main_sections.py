@@ -38,7 +38,7 @@ with open("section_tree.txt", "w") as file:
         file.write(pformat(SECTION_TREE.json(), width=200, sort_dicts=False) + "\n\n")
 
         file.write("Titles and Authors in " + TITLE + " Section\n\n")
-        for source in SECTION_TREE.get_sources(revision.get_references(), 1):
+        for source in SECTION_TREE.get_sources(revision.get_references(), 1, revision.get_reference_map()):
             file.write(source.get_title("en") + "\n")
             file.write(str(source.get_authors("en")) + "\n\n")
     else:
@@ -1,3 +1,7 @@
+try:
+    from ..article.archive import is_archive, open_revision_file, write_archive
+except ImportError:
+    from article.archive import is_archive, open_revision_file, write_archive
 from requests import get as GET
 from lxml import html
 from re import sub, S
@@ -32,8 +36,12 @@ class Scraper:
         revision_count: The number of revisions extracted by this Scraper.
         updating: Flag for update mode.
         update_count: Number of revisions scraped if updating.
+        blocksize: Number of revisions per gzip block if revisions are saved
+                   to a block-compressed archive; 0 for plain line JSON.
+        block: Revisions waiting to be saved as the next block.
+        block_directory: The directory the revisions waiting to be saved are saved to.
     """
-    def __init__(self, directory, title, language, get_redirect = True):
+    def __init__(self, directory, title, language, get_redirect = True, blocksize = 0):
         """
         Initialise scraper.
 
@@ -42,6 +50,8 @@ class Scraper:
             title: The title of the Wikipedia page to scrape.
             language: The language of the Wikipedia page to scrape.
             get_redirect: Scrape article the title redirects to, True by default.
+            blocksize: Number of revisions per gzip block, 0 by default, i.e. plain line JSON.
+                       Updates keep the format of an existing revision file.
         """
         self.directory = directory
         if not exists(directory): makedirs(directory)
@@ -59,6 +69,9 @@ class Scraper:
         self.revision_count = 0
         self.updating = False
         self.update_count = 0
+        self.blocksize = blocksize
+        self.block = []
+        self.block_directory = None
 
     def __enter__(self):
         """Makes the API autoclosable."""
@@ -66,9 +79,11 @@ class Scraper:
 
     def __exit__(self, type, value, traceback):
         """
-        Logs the number of scraped and updated revisions when the instance is closed.
+        Saves the revisions still collected for a gzip block and
+        logs the number of scraped and updated revisions when the instance is closed.
         Closes and removes the logging handlers.
         """
+        self._flush(self.block_directory)
         if self.updating: self.logger.info("Number of updates: " + str(self.update_count))
         self.logger.info("Done. Number of revisions: " + str(self.revision_count))
         self.logging_handlers[0].close()
@@ -185,6 +200,7 @@ class Scraper:
                 self.rvcontinue = True
             while self._collect_revisions(directory, deadline, number, verbose, gethtml):
                 pass
+            self._flush(directory)
             return 0
 
     def _rvstartid(self, filepath):
@@ -223,7 +239,7 @@ class Scraper:
         Returns:
             The the latest revision id in the revision dump.
         """
-        with open(filepath) as article:
+        with open_revision_file(filepath, "r") as article:
             for line in article:
                 self.revision_count += 1
                 LINE = line
@@ -343,14 +359,34 @@ class Scraper:
     def _save(self, directory, revision):
         """
         Save revision to directory.
+        If a blocksize is set, revisions are collected and saved as gzip block
+        once blocksize revisions are collected, unless an existing revision file is plain line JSON.
 
         Args:
             directory: The directory to which the scraped revision is saved.
             revision: A revision to save to file.
         """
         if not exists(directory): makedirs(directory)
-        with open(directory + sep + self.filename, "a") as output_file:
-            output_file.write(dumps(revision) + "\n")
+        filepath = directory + sep + self.filename
+        if self.blocksize and (not exists(filepath) or is_archive(filepath)):
+            self.block.append(dumps(revision) + "\n")
+            self.block_directory = directory
+            if len(self.block) >= self.blocksize:
+                self._flush(directory)
+        else:
+            with open(filepath, "a") as output_file:
+                output_file.write(dumps(revision) + "\n")
+
+    def _flush(self, directory):
+        """
+        Save collected revisions to directory as gzip block.
+
+        Args:
+            directory: The directory to which the scraped revisions are saved.
+        """
+        if self.block:
+            write_archive(self.block, directory + sep + self.filename, len(self.block), "a")
+            self.block = []
 
     def _before(self, timestamp, deadline):
         """
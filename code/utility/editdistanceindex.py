@@ -0,0 +1,74 @@
+from .utils import levenshtein
+
+class EditDistanceIndex:
+    """
+    Index of strings, e.g. normalised titles, to find the strings whose normalised edit distance
+    to a query is below a threshold, the edit distance being normalised by the length of the indexed string.
+
+    The strings are bucketed by length, so that only strings whose length differs from the query
+    by no more than the edit distance they may have are compared; the edit distance of these
+    is bounded, i.e. its computation stops once the threshold is exceeded.
+    The results are memoised per query, as queries such as the titles of the sources
+    of a Wikipedia article mostly recur from revision to revision.
+
+    Attributes:
+        threshold: The normalised edit distance the strings found are below.
+        buckets: Maps lengths to the strings of that length.
+        maximum_distances: Maps lengths to the maximum edit distance strings of that length may have.
+        results: Maps queries to their results.
+    """
+    def __init__(self, strings, threshold):
+        """
+        Args:
+            strings: An iterable of strings; empty strings are not indexed.
+            threshold: The normalised edit distance the strings found must be below.
+        """
+        self.threshold = threshold
+        self.buckets = {}
+        for string in set(strings):
+            if string:
+                self.buckets.setdefault(len(string), []).append(string)
+        self.maximum_distances = {length:self.maximum_distance(length) for length in self.buckets}
+        self.results = {}
+
+    def __len__(self):
+        return sum([len(strings) for strings in self.buckets.values()])
+
+    def maximum_distance(self, length):
+        """
+        Get the maximum edit distance a string of the given length may have to a query to be found.
+
+        Args:
+            length: The length of the string.
+
+        Returns:
+            The largest integer whose division by the length is below the threshold; -1 if there is none.
+        """
+        distance = int(self.threshold * length)
+        while distance >= 0 and distance / length >= self.threshold:
+            distance -= 1
+        return distance
+
+    def find(self, query):
+        """
+        Find the strings whose normalised edit distance to a query is below the threshold.
+
+        Args:
+            query: The string to compare the indexed strings to.
+
+        Returns:
+            A dictionary mapping the strings found to their normalised edit distance.
+        """
+        if query in self.results:
+            return self.results[query]
+        result = {}
+        for length, strings in self.buckets.items():
+            maximum_distance = self.maximum_distances[length]
+            if abs(length - len(query)) > maximum_distance:
+                continue
+            for string in strings:
+                distance = levenshtein(string, query, maximum = maximum_distance)
+                if distance <= maximum_distance:
+                    result[string] = distance / length
+        self.results[query] = result
+        return result
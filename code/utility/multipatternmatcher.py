@@ -0,0 +1,55 @@
+class MultiPatternMatcher:
+    """
+    Finds which of many patterns occur in a text in a single scan of the text,
+    instead of one substring search per pattern.
+
+    Patterns are indexed by their first characters, their anchor; the scan looks up the
+    characters at every position of the text in this index and only compares the patterns
+    whose anchor starts there. Patterns shorter than the anchor are searched one by one.
+
+    Attributes:
+        width: The number of characters of the anchors.
+        anchors: Maps anchors to the patterns starting with them.
+        short_patterns: The patterns shorter than the anchors.
+    """
+    def __init__(self, patterns, width = 12):
+        """
+        Args:
+            patterns: An iterable of strings.
+            width: The number of characters of the anchors; the longer, the fewer patterns
+                   are compared per position, but the more patterns are searched one by one.
+        """
+        self.width = width
+        self.anchors = {}
+        self.short_patterns = set()
+        for pattern in set(patterns):
+            if len(pattern) < width:
+                self.short_patterns.add(pattern)
+            else:
+                self.anchors.setdefault(pattern[:width], []).append(pattern)
+
+    def __len__(self):
+        return sum([len(patterns) for patterns in self.anchors.values()]) + len(self.short_patterns)
+
+    def find(self, text):
+        """
+        Find the patterns occurring in a text.
+
+        Args:
+            text: The string to search.
+
+        Returns:
+            The set of patterns that are substrings of the text.
+        """
+        found = set([pattern for pattern in self.short_patterns if pattern in text])
+        if not self.anchors:
+            return found
+        width = self.width
+        anchors = self.anchors
+        for position in range(len(text) - width + 1):
+            patterns = anchors.get(text[position:position + width])
+            if patterns:
+                for pattern in patterns:
+                    if text.startswith(pattern, position):
+                        found.add(pattern)
+        return found
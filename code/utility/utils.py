@@ -43,17 +43,18 @@ def levenshtein_custom(word1, word2, verbose = False):
         print("\n" + "EDIT DISTANCE = " + str(matrix[len(word1)][len(word2)]) + "\n")
     return matrix[-1][-1]
 
-def levenshtein(word1, word2, verbose = False):
+def levenshtein(word1, word2, verbose = False, maximum = None):
     """
     Calculate the edit distance between two words.
 
     Args:
         word1: The first string.
         word2: The second string.
+        maximum: The maximum edit distance of interest; the calculation stops once it is exceeded.
     Returns:
-        The edit distance between the two strings.
+        The edit distance between the two strings; maximum + 1 if it exceeds the maximum.
     """
-    edit_distance = distance(word1, word2)
+    edit_distance = distance(word1, word2, score_cutoff = maximum)
     if verbose:
         print("\n" + "EDIT DISTANCE = " + str(edit_distance) + "\n")
     return edit_distance
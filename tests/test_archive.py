@@ -0,0 +1,89 @@
+from code.article.archive import Archive, is_archive, open_revision_file, revision_file_size, write_archive
+from code.article.article import Article
+from os.path import exists, getsize, sep
+from os import remove
+from shutil import rmtree
+from tempfile import mkdtemp
+import unittest
+
+class TestArchive(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = mkdtemp()
+        cls.filepath = cls.directory + sep + "6S_%2F_SsrS_RNA_en"
+        with open("tests/data/6S_%2F_SsrS_RNA_en") as file:
+            cls.lines = file.readlines()
+        cls.article = Article("tests/data/6S_%2F_SsrS_RNA_en")
+
+    @classmethod
+    def tearDownClass(cls):
+        rmtree(cls.directory)
+        for sidecar in ["_index.json", "_metadata.npz", "_statistics.json"]:
+            if exists(cls.article.filepath + sidecar):
+                remove(cls.article.filepath + sidecar)
+
+    def setUp(self):
+        write_archive(self.lines, self.filepath, blocksize = 10)
+
+    def test_archive(self):
+        self.assertTrue(is_archive(self.filepath))
+        self.assertFalse(is_archive("tests/data/6S_%2F_SsrS_RNA_en"))
+        self.assertLess(getsize(self.filepath), getsize("tests/data/6S_%2F_SsrS_RNA_en"))
+        self.assertEqual(revision_file_size(self.filepath), getsize("tests/data/6S_%2F_SsrS_RNA_en"))
+        with open_revision_file(self.filepath, "r") as file:
+            self.assertEqual(file.readlines(), self.lines)
+        with Archive(self.filepath) as archive:
+            self.assertEqual(len(archive.blocks), 6)
+        self.assertTrue(exists(self.filepath + "_blocks.json"))
+
+    def test_append(self):
+        write_archive(self.lines[:50], self.filepath, blocksize = 10)
+        with Archive(self.filepath) as archive:
+            self.assertEqual(len(archive.blocks), 5)
+        write_archive(self.lines[50:], self.filepath, blocksize = 10, mode = "a")
+        with Archive(self.filepath) as archive:
+            self.assertEqual(len(archive.blocks), 6)
+        with open_revision_file(self.filepath, "r") as file:
+            self.assertEqual(file.readlines(), self.lines)
+
+    def test_rewrite(self):
+        filepath = self.directory + sep + "rewritten_en"
+        write_archive(self.lines[:20], filepath, blocksize = 10)
+        with Archive(filepath) as archive:
+            self.assertEqual(len(archive.blocks), 2)
+        write_archive(self.lines[10:20] + self.lines[:10] + self.lines[20:], filepath, blocksize = 10)
+        with open_revision_file(filepath, "r") as file:
+            self.assertEqual(file.readlines(), self.lines[10:20] + self.lines[:10] + self.lines[20:])
+        # The blocks swapped keep the size of the archive.
+        write_archive(self.lines[:20], filepath, blocksize = 10)
+        with Archive(filepath) as archive:
+            self.assertEqual(len(archive.blocks), 2)
+        write_archive(self.lines[10:20] + self.lines[:10], filepath, blocksize = 10)
+        with open_revision_file(filepath, "r") as file:
+            self.assertEqual(file.readlines(), self.lines[10:20] + self.lines[:10])
+
+    def test_random_access(self):
+        article = Article(self.filepath)
+        self.assertEqual(article.get_revision_count(), 54)
+        self.assertIsNone(article.get_mapping())
+        entry = article.get_index().entry(index=33)
+        with Archive(self.filepath) as archive:
+            archive.seek(entry[4])
+            self.assertEqual(archive.read(entry[5]).decode("utf-8"), self.lines[33])
+            self.assertEqual(archive.block[0], 3)
+        self.assertEqual(article.get_revision(index=33).revid, self.article.get_revision(index=33).revid)
+        self.assertEqual([revision.revid for revision in article.get_revisions(2,5)],
+                         [revision.revid for revision in self.article.get_revisions(2,5)])
+
+    def test_article(self):
+        article = Article(self.filepath)
+        for revision, archived_revision, lazy_archived_revision in zip(self.article.yield_revisions(),
+                                                                       article.yield_revisions(),
+                                                                       article.yield_revisions(lazy=True)):
+            self.assertEqual(revision.html, archived_revision.html)
+            self.assertEqual(revision.html, lazy_archived_revision.html)
+        self.assertEqual(article.calculate_revision_size_difference(), self.article.calculate_revision_size_difference())
+
+if __name__ == "__main__":
+    unittest.main()
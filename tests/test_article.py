@@ -1,12 +1,27 @@
 from code.article.article import Article
+from code.article.revision.timestamp import Timestamp
+from os import remove
+from os.path import exists, getsize, sep
+from shutil import rmtree
+from tempfile import mkdtemp
+from operator import add
 import unittest
 
+def wikitext_length(revision):
+    return len(revision.wikitext)
+
 class TestRevision(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
         cls.article = Article("tests/data/6S_%2F_SsrS_RNA_en")
 
+    @classmethod
+    def tearDownClass(cls):
+        for sidecar in ["_index.json", "_metadata.npz", "_statistics.json"]:
+            if exists(cls.article.filepath + sidecar):
+                remove(cls.article.filepath + sidecar)
+
     def test_name(self):
         self.assertEqual(self.article.name, "6S / SsrS RNA")
 
@@ -18,10 +33,84 @@ class TestRevision(unittest.TestCase):
         self.assertEqual(self.article.get_revision(index=53, revid=None).revid, 997696733)
         self.assertEqual(self.article.get_revision(index=None, revid=131124859).index, 0)
         self.assertEqual(self.article.get_revision(index=None, revid=997696733).index, 53)
+        self.assertEqual(self.article.get_revision(timestamp="2007-05-15T20:32:46Z").index, 0)
+        self.assertIsNone(self.article.get_revision(index=54))
 
     def test_get_revisions(self):
         revisions = self.article.get_revisions(2,5)
         self.assertEqual(len(revisions), 4)
         self.assertEqual(revisions[0].revid, 134932548)
         self.assertEqual(revisions[-1].revid, 163316452)
+
+    def test_revision_at(self):
+        self.assertIsNone(self.article.revision_at("2007-05-15T20:32:45Z"))
+        self.assertEqual(self.article.revision_at("2007-05-15T20:32:46Z").index, 0)
+        self.assertEqual(self.article.revision_at("2007-05-31T00:00:00Z").index, 1)
+        self.assertEqual(self.article.revision_at(Timestamp("2030-01-01T00:00:00Z")).index, 53)
+
+    def test_revisions_between(self):
+        revisions = self.article.revisions_between("2007-05-17T16:04:53Z", "2020-12-05T22:02:16Z")
+        self.assertEqual([revision.index for revision in revisions], list(range(1, 53)))
+        self.assertEqual(self.article.revisions_between("2008-01-01T00:00:00Z", "2007-01-01T00:00:00Z"), [])
+
+    def test_get_timestamp_column(self):
+        column = self.article.get_timestamp_column()
+        self.assertEqual(len(column), 54)
+        self.assertEqual(column[0].item(), Timestamp("2007-05-15T20:32:46Z").datetime)
+        self.assertEqual(sorted(column.tolist()), column.tolist())
+
+    def test_mapping(self):
+        mapping = self.article.get_mapping()
+        self.assertIsNotNone(mapping)
+        self.assertIs(self.article.get_mapping(), mapping)
+        entry = self.article.get_index().entry(index=20)
+        self.assertEqual(mapping[entry[4]:entry[4] + entry[5]].decode("utf-8"), next(self.article._read_lines([entry])))
+        self.assertEqual(self.article.get_revision(index=20).revid, self.article.get_revisions(20, 20)[0].revid)
+        self.article.close()
+        self.assertIsNone(self.article.revision_mapping)
+        self.assertEqual(self.article.get_revision(index=21).index, 21)
+
+    def test_remapping(self):
+        directory = mkdtemp()
+        try:
+            filepath = directory + sep + "6S_%2F_SsrS_RNA_en"
+            with open(self.article.filepath) as file:
+                lines = file.readlines()
+            with open(filepath, "w") as file:
+                file.writelines(lines[:10])
+            article = Article(filepath)
+            revisions = article.yield_revisions(lazy=True)
+            self.assertEqual(next(revisions).index, 0)
+            with open(filepath, "a") as file:
+                file.writelines(lines[10:])
+            self.assertEqual(len(article.get_mapping(getsize(filepath))), getsize(filepath))
+            self.assertEqual(next(revisions).index, 1)
+            article.close()
+            self.assertEqual([revision.index for revision in revisions], list(range(2, 10)))
+        finally:
+            rmtree(directory)
+
+    def test_yield_revisions_range(self):
+        self.assertEqual([revision.index for revision in self.article.yield_revisions(first=50)], [50, 51, 52, 53])
+        self.assertEqual([revision.index for revision in self.article.yield_revisions(True, 3, 5)], [3, 4, 5])
+
+    def test_shards(self):
+        shards = self.article.shards(4)
+        self.assertEqual(len(shards), 4)
+        self.assertEqual(shards[0][0], 0)
+        self.assertEqual(shards[-1][1], 53)
+        for shard, next_shard in zip(shards, shards[1:]):
+            self.assertEqual(shard[1] + 1, next_shard[0])
+
+    def test_map_revisions(self):
+        lengths = [len(revision.wikitext) for revision in self.article.yield_revisions()]
+        self.assertEqual(self.article.map_revisions(wikitext_length), lengths)
+        self.assertEqual(self.article.map_revisions(wikitext_length, workers=2, lazy=True), lengths)
+        self.assertEqual(self.article.map_revisions(wikitext_length, add, workers=2), sum(lengths))
+
+    def test_yield_revisions_lazy(self):
+        for revision, lazy_revision in zip(self.article.yield_revisions(), self.article.yield_revisions(lazy=True)):
+            self.assertEqual(revision.revid, lazy_revision.revid)
+            self.assertEqual(revision.wikitext, lazy_revision.wikitext)
+            self.assertEqual(revision.html, lazy_revision.html)
         
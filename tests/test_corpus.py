@@ -0,0 +1,81 @@
+from code.article.corpus import Corpus
+from os import remove
+from os.path import exists, sep
+from shutil import rmtree
+from tempfile import mkdtemp
+import unittest
+
+def revision_count(filepath, offset):
+    with open(filepath) as file:
+        return len(file.readlines()) + offset
+
+class TestCorpus(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = mkdtemp()
+        with open("tests/data/6S_%2F_SsrS_RNA_en") as file:
+            cls.lines = file.readlines()
+
+    @classmethod
+    def tearDownClass(cls):
+        rmtree(cls.directory)
+
+    def setUp(self):
+        with open(self.directory + sep + "6S_%2F_SsrS_RNA_en", "w") as file:
+            file.writelines(self.lines)
+        with open(self.directory + sep + "16S_rRNA_en", "w") as file:
+            file.writelines(self.lines[:10])
+        if exists(self.directory + sep + "corpus.json"):
+            remove(self.directory + sep + "corpus.json")
+        self.corpus = Corpus(self.directory)
+        self.corpus.update()
+
+    def test_catalog(self):
+        self.assertEqual(len(self.corpus), 2)
+        entry = self.corpus.catalog["6S_%2F_SsrS_RNA_en"]
+        self.assertEqual(entry["count"], 54)
+        self.assertEqual(entry["first"], "2007-05-15T20:32:46Z")
+        self.assertEqual(entry["last"], "2021-01-01T20:12:05Z")
+        self.assertEqual(self.corpus.catalog["16S_rRNA_en"]["count"], 10)
+        self.assertTrue(self.corpus.fresh(self.directory + sep + "16S_rRNA_en"))
+        self.assertEqual(Corpus(self.directory).catalog, self.corpus.catalog)
+
+    def test_update(self):
+        self.assertFalse(self.corpus.update())
+        with open(self.directory + sep + "16S_rRNA_en", "a") as file:
+            file.writelines(self.lines[10:12])
+        self.assertEqual(self.corpus.stale(), [self.directory + sep + "16S_rRNA_en"])
+        self.assertFalse(self.corpus.fresh(self.directory + sep + "16S_rRNA_en"))
+        self.assertTrue(self.corpus.update())
+        self.assertEqual(self.corpus.catalog["16S_rRNA_en"]["count"], 12)
+        remove(self.directory + sep + "16S_rRNA_en")
+        self.assertTrue(self.corpus.update())
+        self.assertEqual(list(self.corpus.catalog), ["6S_%2F_SsrS_RNA_en"])
+
+    def test_schedule(self):
+        self.assertEqual(self.corpus.schedule(), [self.directory + sep + "6S_%2F_SsrS_RNA_en", self.directory + sep + "16S_rRNA_en"])
+        self.assertEqual(self.corpus.filepaths(), [self.directory + sep + "16S_rRNA_en", self.directory + sep + "6S_%2F_SsrS_RNA_en"])
+        # An article that grew since it was catalogued is scheduled by its current size.
+        with open(self.directory + sep + "16S_rRNA_en", "a") as file:
+            file.writelines(self.lines * 2)
+        self.assertEqual(self.corpus.schedule(), [self.directory + sep + "16S_rRNA_en", self.directory + sep + "6S_%2F_SsrS_RNA_en"])
+        self.corpus.catalog = {}
+        self.assertEqual(self.corpus.schedule(), [self.directory + sep + "16S_rRNA_en", self.directory + sep + "6S_%2F_SsrS_RNA_en"])
+
+    def test_map_articles(self):
+        self.assertEqual(self.corpus.map_articles(revision_count, (1,)), [11, 55])
+        self.assertEqual(self.corpus.map_articles(revision_count, (1,), workers=2), [11, 55])
+
+    def test_map_articles_catalog(self):
+        remove(self.directory + sep + "corpus.json")
+        with open(self.directory + sep + "16S_rRNA_en", "a") as file:
+            file.writelines(self.lines[10:12])
+        corpus = Corpus(self.directory)
+        self.assertEqual(corpus.map_articles(revision_count, (0,), workers=2), [12, 54])
+        self.assertEqual(corpus.stale(), [])
+        self.assertEqual(Corpus(self.directory).catalog["16S_rRNA_en"]["count"], 12)
+        self.assertEqual(Corpus(self.directory).catalog["6S_%2F_SsrS_RNA_en"]["last"], "2021-01-01T20:12:05Z")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+from code.article.delta import apply_delta, decode_revisions, encode_delta, encode_revisions, is_delta
+from code.article.article import Article
+from code.article.revisionindex import RevisionIndex
+from os.path import exists, getsize, sep
+from os import remove
+from shutil import rmtree
+from tempfile import mkdtemp
+from json import loads
+import unittest
+
+class TestDelta(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = mkdtemp()
+        cls.filepath = cls.directory + sep + "6S_%2F_SsrS_RNA_en"
+        with open("tests/data/6S_%2F_SsrS_RNA_en") as file:
+            cls.lines = file.readlines()
+        with open(cls.filepath, "w") as file:
+            file.writelines(encode_revisions(cls.lines, 10))
+        cls.article = Article("tests/data/6S_%2F_SsrS_RNA_en")
+        cls.delta_article = Article(cls.filepath)
+
+    @classmethod
+    def tearDownClass(cls):
+        rmtree(cls.directory)
+        if exists(cls.article.filepath + "_index.json"):
+            remove(cls.article.filepath + "_index.json")
+
+    def test_delta(self):
+        old = "<p>CRISPR</p>\n<p>Cas9</p>\n"
+        new = "<p>CRISPR</p>\n<p>Cas12</p>\n<p>Cas9</p>\n"
+        delta = encode_delta(old, new)
+        self.assertEqual(apply_delta(old, delta), new)
+        self.assertEqual(delta, [[0, 20], "12</p>\n<p>Cas", [20, 26]])
+        self.assertEqual(apply_delta(old, encode_delta(old, "")), "")
+        self.assertEqual(apply_delta("", encode_delta("", new)), new)
+
+    def test_revisions(self):
+        with open(self.filepath) as file:
+            lines = file.readlines()
+        self.assertLess(getsize(self.filepath), getsize("tests/data/6S_%2F_SsrS_RNA_en") / 2)
+        self.assertFalse(is_delta(loads(lines[10])["wikitext"]))
+        self.assertTrue(is_delta(loads(lines[11])["wikitext"]))
+        self.assertEqual(list(decode_revisions(lines)), self.lines)
+
+    def test_index(self):
+        entries = self.delta_article.get_index().entries
+        self.assertEqual(len(entries), 54)
+        for position, entry in enumerate(entries):
+            self.assertEqual(entry[RevisionIndex.KEYFRAME], entries[position // 10 * 10][RevisionIndex.OFFSET])
+
+    def test_article(self):
+        self.assertEqual(self.delta_article.get_revision(index=37).wikitext, self.article.get_revision(index=37).wikitext)
+        self.assertEqual(self.delta_article.get_revision(index=40).wikitext, self.article.get_revision(index=40).wikitext)
+        self.assertEqual([revision.wikitext for revision in self.delta_article.get_revisions(25, 31)],
+                         [revision.wikitext for revision in self.article.get_revisions(25, 31)])
+        for revision, delta_revision, lazy_delta_revision in zip(self.article.yield_revisions(),
+                                                                 self.delta_article.yield_revisions(),
+                                                                 self.delta_article.yield_revisions(lazy=True)):
+            self.assertEqual(revision.wikitext, delta_revision.wikitext)
+            self.assertEqual(revision.wikitext, lazy_delta_revision.wikitext)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+from code.utility.editdistanceindex import EditDistanceIndex
+from code.utility.utils import levenshtein
+from code.article.revision.revision import Revision
+import unittest
+from json import loads
+
+class TestEditDistanceIndex(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        titles = []
+        for filename in ["tests/data/revision1.json", "tests/data/revision2.json"]:
+            with open(filename) as file:
+                revision = Revision(**loads(file.readline()))
+            titles += [source.get_title("en").lower() for source in revision.get_references()]
+        cls.strings = [title for title in titles[::2] if title]
+        # Altered titles at increasing edit distances.
+        cls.queries = titles[1::2] + [title[:-length] + "x" * length for length, title in enumerate(titles[:40:4], 1)] + ["", "crispr"]
+
+    def test_find(self):
+        for threshold in [0.1, 0.2, 0.4]:
+            index = EditDistanceIndex(self.strings, threshold)
+            for query in self.queries:
+                expected = {}
+                for string in self.strings:
+                    normalised_edit_distance = levenshtein(string, query) / len(string)
+                    if normalised_edit_distance < threshold:
+                        expected[string] = normalised_edit_distance
+                self.assertEqual(index.find(query), expected)
+                self.assertIn(query, index.results)
+
+    def test_maximum_distance(self):
+        index = EditDistanceIndex(["a"], 0.4)
+        self.assertEqual([index.maximum_distance(length) for length in [1, 2, 3, 5, 6, 10]], [0, 0, 1, 1, 2, 3])
+        self.assertEqual(EditDistanceIndex(["a"], 0).maximum_distance(4), -1)
+
+    def test_len(self):
+        self.assertEqual(len(EditDistanceIndex(["crispr", "crispr", "", "cas9"], 0.4)), 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+from code.article.extraction import Extraction
+from code.article.article import Article
+from code.article.revision.revision import Revision
+from os.path import exists, sep
+from shutil import rmtree
+from tempfile import mkdtemp
+from json import loads
+import unittest
+
+class TestExtraction(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = mkdtemp()
+        cls.filepath = cls.directory + sep + "CRISPR_en"
+        cls.lines = []
+        for filename in ["tests/data/revision1.json", "tests/data/revision2.json"]:
+            with open(filename) as file:
+                cls.lines.append(file.readline().strip() + "\n")
+        cls.revisions = [Revision(**loads(line)) for line in cls.lines]
+
+    @classmethod
+    def tearDownClass(cls):
+        rmtree(cls.directory)
+
+    def setUp(self):
+        with open(self.filepath, "w") as file:
+            file.writelines(self.lines)
+        self.article = Article(self.filepath)
+        self.extraction = self.article.extraction(update=True)
+
+    def test_extraction(self):
+        self.assertTrue(self.extraction.current())
+        self.assertEqual(len(self.extraction), 2)
+        for revision, extracted_revision in zip(self.revisions, self.extraction.yield_revisions()):
+            self.assertEqual(revision.revid, extracted_revision.revid)
+            self.assertEqual(revision.url, extracted_revision.url)
+            self.assertEqual(revision.timestamp.string, extracted_revision.timestamp.string)
+            self.assertEqual(revision.get_text(), extracted_revision.get_text())
+            self.assertEqual(revision.get_categories(), extracted_revision.get_categories())
+            self.assertEqual(len(revision.get_references()), len(extracted_revision.get_references()))
+            for source, extracted_source in zip(revision.get_references() + revision.get_further_reading(),
+                                                extracted_revision.get_references() + extracted_revision.get_further_reading()):
+                self.assertEqual(source.get_text(), extracted_source.get_text())
+                self.assertEqual(source.get_title("en"), extracted_source.get_title("en"))
+                self.assertEqual(source.get_authors("en"), extracted_source.get_authors("en"))
+                self.assertEqual(sorted(source.get_dois()), sorted(extracted_source.get_dois()))
+                self.assertEqual(sorted(source.get_pmids()), sorted(extracted_source.get_pmids()))
+
+    def test_persistence(self):
+        self.assertTrue(exists(self.filepath + "_extraction.jsonl"))
+        extraction = Extraction(self.filepath, "en")
+        self.assertTrue(extraction.current())
+        self.assertFalse(extraction.update(self.article))
+        self.assertFalse(Extraction(self.filepath, "de").current())
+
+    def test_append(self):
+        with open(self.filepath, "w") as file:
+            file.writelines(self.lines[:1])
+        article = Article(self.filepath)
+        extraction = article.extraction(update=True)
+        self.assertEqual(len(extraction), 1)
+        with open(self.filepath, "a") as file:
+            file.writelines(self.lines[1:])
+        self.assertFalse(extraction.current())
+        self.assertEqual(next(article.yield_extracted_revisions()).__class__.__name__, "Revision")
+        self.assertTrue(extraction.update(article))
+        self.assertEqual(len(extraction), 2)
+        self.assertEqual([revision.revid for revision in article.yield_extracted_revisions()],
+                         [revision.revid for revision in self.revisions])
+
+    def test_rewrite(self):
+        with open(self.filepath, "w") as file:
+            file.writelines(self.lines[::-1])
+        article = Article(self.filepath)
+        extraction = Extraction(self.filepath, "en")
+        self.assertFalse(extraction.current())
+        self.assertTrue(extraction.update(article))
+        self.assertEqual([revision.revid for revision in article.yield_extracted_revisions()],
+                         [revision.revid for revision in self.revisions[::-1]])
+
+    def test_yield_revisions_range(self):
+        self.assertEqual([revision.revid for revision in self.extraction.yield_revisions(first=1)], [self.revisions[1].revid])
+        self.assertEqual([revision.revid for revision in self.extraction.yield_revisions(final=0)], [self.revisions[0].revid])
+        self.assertEqual([revision.revid for revision in self.article.yield_extracted_revisions(1, 1)], [self.revisions[1].revid])
+        self.assertEqual(list(self.extraction.yield_revisions(first=2)), [])
+
+    def test_version(self):
+        Extraction.VERSION += 1
+        try:
+            extraction = Extraction(self.filepath, "en")
+            self.assertFalse(extraction.current())
+            self.assertTrue(extraction.update(self.article))
+            self.assertEqual(len(extraction), 2)
+        finally:
+            Extraction.VERSION -= 1
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+from code.article.revision.lazyrevision import LazyRevision, split_revision_line
+from code.article.revision.revision import Revision
+from json import dumps, loads
+import unittest
+
+class TestLazyRevision(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # Revision 51 (index 50) of CRISPR
+        # https://en.wikipedia.org/w/index.php?title=CRISPR&oldid=369962884
+        with open("tests/data/revision1.json") as revision_file:
+            cls.line = revision_file.readline()
+        cls.revision = Revision(**loads(cls.line))
+
+    def test_split_revision_line(self):
+        fields, spans = split_revision_line(self.line)
+        self.assertEqual(set(spans.keys()), {"wikitext", "html"})
+        self.assertNotIn("html", fields)
+        self.assertEqual(fields["revid"], 369962884)
+        self.assertEqual(loads(self.line[spans["html"][0]:spans["html"][1]]), self.revision.html)
+        self.assertEqual(loads(self.line[spans["wikitext"][0]:spans["wikitext"][1]]), self.revision.wikitext)
+
+    def test_split_revision_line_field_order(self):
+        revision = loads(self.line)
+        for fields in [["html", "revid", "comment"], ["revid", "wikitext"], ["html"], ["revid", "index"]]:
+            line = dumps({field:revision[field] for field in fields})
+            light_fields, spans = split_revision_line(line)
+            for field, (start, end) in spans.items():
+                light_fields[field] = loads(line[start:end])
+            self.assertEqual(light_fields, {field:revision[field] for field in fields})
+
+    def test_lazy_revision(self):
+        for spans in [None, split_revision_line(self.line)[1]]:
+            lazy_revision = LazyRevision(self.line.encode("utf-8"), spans)
+            self.assertEqual(lazy_revision.revid, self.revision.revid)
+            self.assertEqual(lazy_revision.timestamp.string, self.revision.timestamp.string)
+            self.assertEqual(lazy_revision.comment, self.revision.comment)
+            self.assertIn("html", lazy_revision.spans)
+            self.assertEqual(lazy_revision.wikitext, self.revision.wikitext)
+            self.assertEqual(lazy_revision.html, self.revision.html)
+            self.assertIsNone(lazy_revision.line)
+            self.assertEqual(len(lazy_revision.get_references()), len(self.revision.get_references()))
+
+    def test_lazy_revision_assignment(self):
+        lazy_revision = LazyRevision(self.line)
+        lazy_revision.html = "<div class='mw-parser-output'>foo</div>"
+        self.assertEqual(lazy_revision.get_text(), "foo")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+from code.article.article import Article
+from code.article.revision.revision import Revision
+from os.path import exists, sep
+from shutil import rmtree
+from tempfile import mkdtemp
+from json import dumps, loads
+import sys
+import unittest
+
+# The main scripts import the packages of the code directory at top level.
+sys.path.insert(0, "code")
+from main_article import applicable_heuristics, schedule, trace_article
+from timeline.eventlist import EventList
+
+class MockedAccountList:
+
+    def __init__(self):
+
+        self.accounts = {1:None}
+
+class MockedBibentry:
+
+    def __init__(self, title, authors, doi, pmid):
+
+        self.title = title
+        self.authors = authors
+        self.doi = doi
+        self.pmid = pmid
+
+class MockedBibliography:
+
+    def __init__(self, bibentries):
+
+        self.bibentries = bibentries
+
+    def get_bibentries(self, bib_keys):
+        return {bib_key:self.bibentries.get(bib_key) for bib_key in bib_keys if self.bibentries.get(bib_key)}
+
+class TestMainArticle(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = mkdtemp()
+        with open("tests/data/revision1.json") as file:
+            revision = loads(file.readline())
+        with open(cls.directory + sep + "CRISPR_en", "w") as file:
+            for index in range(6):
+                revision.update({"index":index, "revid":revision["revid"] + 1, "parentid":revision["revid"]})
+                file.write(dumps(revision) + "\n")
+        source = Revision(**revision).get_references()[0]
+        features = source.features("en")
+        bibliography = MockedBibliography({"B1":MockedBibentry(features["title"], [author[0] for author in features["authors"]], None, None)})
+        with open(cls.directory + sep + "events.csv", "w") as file:
+            file.write("event_id,event_year,event_month,event_day,account_id,sampled,event_text,type,subtype,wos_keys,extracted_from,comment\n")
+            # The DOI and PMID of the first event are None, the second event has no bibentries.
+            file.write("1,2014,,,1,,,,,B1,,\n")
+            file.write("2,2014,,,1,,,,,B2,,\n")
+        cls.eventlist = EventList(cls.directory + sep + "events.csv", bibliography, MockedAccountList())
+        cls.thresholds = {"NORMALISED_EDIT_DISTANCE_THRESHOLDS":[0.2,0.3,0.4],
+                          "RATIO_SCORE_THRESHOLD":1.0,
+                          "JACCARD_SCORE_THRESHOLD":0.8,
+                          "SKAT_SCORE_THRESHOLD":0.8}
+        cls.heuristics = {"verbatim":{"titles":None,"dois":None,"pmids":None},
+                          "relaxed":{"ned <= 0.2":None,"ned <= 0.3":None,"ned <= 0.4":None,
+                                     "ned_and_ratio":None,"ned_and_jaccard":None,"ned_and_skat":None}}
+
+    @classmethod
+    def tearDownClass(cls):
+        rmtree(cls.directory)
+
+    def trace(self, chunks):
+        with self.assertLogs("article_logger", level="INFO") as logs:
+            self.assertTrue(trace_article("CRISPR", self.eventlist, self.directory, self.directory, "en", "first_mentioned",
+                                          self.heuristics, self.thresholds, workers=1, chunks=chunks))
+        return [record.getMessage() for record in logs.records]
+
+    def test_applicable_heuristics(self):
+        event, event_without_bibentries = self.eventlist.events
+        self.assertEqual(applicable_heuristics(event, self.heuristics, self.thresholds),
+                         {"verbatim":{"titles"},
+                          "relaxed":{"ned <= 0.2","ned <= 0.3","ned <= 0.4","ned_and_ratio","ned_and_jaccard","ned_and_skat"}})
+        self.assertEqual(applicable_heuristics(event_without_bibentries, self.heuristics, self.thresholds), {"verbatim":set(), "relaxed":set()})
+        self.assertEqual(applicable_heuristics(event, {"verbatim":{"dois":None}, "relaxed":{"ned_and_ratio":None}}, self.thresholds),
+                         {"verbatim":set(), "relaxed":set()})
+
+    def test_schedule(self):
+        with open(self.directory + sep + "Cas9_en", "w") as file:
+            file.write("\n")
+        self.assertEqual(schedule(["Cas9", "Missing", "CRISPR"], self.directory, "en"), ["CRISPR", "Cas9", "Missing"])
+
+    def test_early_stop(self):
+        self.assertIn("All events resolved after 1 revisions.", self.trace(chunks=1))
+        # The revision file is not indexed just to count its revisions.
+        self.assertFalse(exists(self.directory + sep + "CRISPR_en_index.json"))
+        trace = self.eventlist.events[0].trace["CRISPR"]["first_mentioned"]
+        self.assertEqual(trace["verbatim"]["titles"]["index"], 0)
+        self.assertIsNone(trace["verbatim"]["dois"])
+        self.assertTrue(all([result["index"] == 0 for result in trace["relaxed"].values()]))
+        self.assertEqual(self.eventlist.events[1].trace["CRISPR"]["first_mentioned"], self.heuristics)
+        # The revisions skipped are counted if the revisions were extracted.
+        Article(self.directory + sep + "CRISPR_en").extraction(update=True)
+        self.assertIn("All events resolved after 1 revisions; skipped 5 revisions.", self.trace(chunks=1))
+
+    def test_early_stop_chunks(self):
+        self.assertIn("Skipped 4 revisions of chunks whose events were all resolved.", self.trace(chunks=2))
+        self.assertEqual(self.eventlist.events[0].trace["CRISPR"]["first_mentioned"]["verbatim"]["titles"]["index"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
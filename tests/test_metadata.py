@@ -0,0 +1,77 @@
+from code.article.metadata import Metadata
+from code.article.article import Article
+from os.path import exists, sep
+from shutil import copyfile, rmtree
+from tempfile import mkdtemp
+import unittest
+
+class TestMetadata(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = mkdtemp()
+        cls.filepath = cls.directory + sep + "6S_%2F_SsrS_RNA_en"
+        copyfile("tests/data/6S_%2F_SsrS_RNA_en", cls.filepath)
+        with open(cls.filepath) as file:
+            cls.lines = file.readlines()
+        cls.revisions = list(Article(cls.filepath).yield_revisions())
+
+    @classmethod
+    def tearDownClass(cls):
+        rmtree(cls.directory)
+
+    def setUp(self):
+        with open(self.filepath, "w") as file:
+            file.write("".join(self.lines))
+        self.metadata = Metadata(self.filepath)
+        self.metadata.update()
+
+    def test_columns(self):
+        self.assertEqual(len(self.metadata), 54)
+        self.assertEqual(list(self.metadata["revid"]), [revision.revid for revision in self.revisions])
+        self.assertEqual(list(self.metadata["user"]), [revision.user for revision in self.revisions])
+        self.assertEqual(list(self.metadata["timestamp"]), [revision.timestamp.timestamp_string() for revision in self.revisions])
+        self.assertEqual(list(self.metadata["size"]), [revision.size for revision in self.revisions])
+        self.assertEqual(next(self.metadata.rows())["comment"], self.revisions[0].comment)
+
+    def test_persistence(self):
+        self.assertTrue(exists(self.filepath + "_metadata.npz"))
+        metadata = Metadata(self.filepath)
+        self.assertFalse(metadata.update())
+        self.assertEqual(list(metadata["revid"]), list(self.metadata["revid"]))
+
+    def test_append(self):
+        with open(self.filepath, "w") as file:
+            file.write("".join(self.lines[:50]))
+        self.metadata.update()
+        self.assertEqual(len(self.metadata), 50)
+        with open(self.filepath, "a") as file:
+            file.write("".join(self.lines[50:]))
+        self.assertTrue(self.metadata.update())
+        self.assertEqual(list(self.metadata["index"]), list(range(54)))
+
+    def test_rewrite(self):
+        # The first two lines swapped end at the same offset with a line break, followed by further lines.
+        filepath = self.directory + sep + "rewritten_en"
+        with open(filepath, "w") as file:
+            file.write("".join(self.lines[:2]))
+        metadata = Metadata(filepath)
+        metadata.update()
+        with open(filepath, "w") as file:
+            file.write("".join([self.lines[1], self.lines[0]] + self.lines[2:]))
+        self.assertTrue(metadata.update())
+        self.assertEqual(list(metadata["index"]), [1, 0] + list(range(2, 54)))
+        # Rewritten to the same size.
+        with open(filepath, "w") as file:
+            file.write("".join(self.lines[::-1]))
+        self.assertTrue(metadata.update())
+        self.assertEqual(list(metadata["index"]), list(range(53, -1, -1)))
+        self.assertFalse(metadata.update())
+
+    def test_size_difference(self):
+        sizes = [revision.size for revision in self.revisions]
+        self.assertEqual(Article(self.filepath).calculate_revision_size_difference(),
+                         [sizes[0]] + [size - previous_size for previous_size, size in zip(sizes[:-1], sizes[1:])])
+
+if __name__ == "__main__":
+    unittest.main()
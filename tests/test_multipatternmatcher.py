@@ -0,0 +1,30 @@
+from code.utility.multipatternmatcher import MultiPatternMatcher
+from code.article.revision.revision import Revision
+import unittest
+from json import loads
+
+class TestMultiPatternMatcher(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open("tests/data/revision2.json") as file:
+            revision = Revision(**loads(file.readline()))
+        cls.text = revision.get_text().lower()
+        cls.patterns = [source.get_title("en").lower() for source in revision.get_references()] + \
+                       ["crispr", "cas9", "", "not in the text at all", "clustered regularly interspaced short palindromic repeats x"]
+
+    def test_find(self):
+        for width in [1, 4, 12, 40]:
+            matcher = MultiPatternMatcher(self.patterns, width)
+            self.assertEqual(matcher.find(self.text), set([pattern for pattern in self.patterns if pattern in self.text]))
+
+    def test_overlapping(self):
+        matcher = MultiPatternMatcher(["abcab", "bcabc", "cab", "abcabcabd", "abcabcabc"], 3)
+        self.assertEqual(matcher.find("xabcabcabcx"), {"abcab", "bcabc", "cab", "abcabcabc"})
+        self.assertEqual(matcher.find("ab"), set())
+
+    def test_len(self):
+        self.assertEqual(len(MultiPatternMatcher(["crispr", "crispr", "cas9", "clustered"], 6)), 3)
+
+if __name__ == "__main__":
+    unittest.main()
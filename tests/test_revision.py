@@ -1,6 +1,7 @@
-from code.article.revision.revision import Revision
+from code.article.revision.revision import Revision, stream_sources
 import unittest
 from json import loads
+import pickle
 
 class TestRevision(unittest.TestCase):
 
@@ -9,11 +10,13 @@ class TestRevision(unittest.TestCase):
         # Revision 51 (index 50) of CRISPR
         # https://en.wikipedia.org/w/index.php?title=CRISPR&oldid=369962884
         with open("tests/data/revision1.json") as revision_file:
-            cls.revision1 = Revision(**loads(revision_file.readline()))
+            cls.revision1_line = revision_file.readline()
+            cls.revision1 = Revision(**loads(cls.revision1_line))
         # Revision 2092 (index 2091) of CRISPR
         # https://en.wikipedia.org/w/index.php?title=CRISPR&oldid=1009355338
         with open("tests/data/revision2.json") as revision_file:
-            cls.revision2 = Revision(**loads(revision_file.readline()))
+            cls.revision2_line = revision_file.readline()
+            cls.revision2 = Revision(**loads(cls.revision2_line))
 
     def test_metadata_revision1(self):
         self.assertEqual(369962884, self.revision1.revid)
@@ -51,6 +54,71 @@ class TestRevision(unittest.TestCase):
         # 17 elements in 'Further Reading' section
         self.assertEqual(17, len(self.revision2.get_further_reading()))
 
+    def test_stream_sources(self):
+        for line in [self.revision1_line, self.revision2_line]:
+            streamed_revision = Revision(**loads(line))
+            revision = Revision(**loads(line))
+            revision.etree_from_html()
+            self.assertEqual([source.get_text() for source in streamed_revision.get_references()],
+                             [source.get_text() for source in revision.get_references()])
+            self.assertEqual([source.get_reference_ids() for source in streamed_revision.get_further_reading()],
+                             [source.get_reference_ids() for source in revision.get_further_reading()])
+            self.assertNotIn("etree", streamed_revision.cache)
+        self.assertEqual(stream_sources(""), ([], []))
+
+    def test_stream_sources_unbalanced(self):
+        html = ("<div class='mw-parser-output'><ul><li>Unclosed list"
+                "<!-- <ol> --><script>var list = '</ul>';</script>"
+                "<h2>References</h2><ol class='references'><li id='cite_note-1'>Reference</li></ol>"
+                "<h2>Further reading</h2><ul><li><cite>Further reading</cite></li></ul></div>")
+        self.assertIsNone(stream_sources(html))
+        revision = Revision(**loads(self.revision1_line))
+        revision.html = html
+        self.assertEqual([source.get_text() for source in revision.get_references()], ["Reference"])
+        self.assertEqual(len(revision.get_further_reading()), 1)
+        self.assertIn("etree", revision.cache)
+        references, further_reading = stream_sources(html.replace("Unclosed list", "Closed list</li></ul>"))
+        self.assertEqual([reference.text_content() for reference in references], ["Reference"])
+        self.assertEqual(len(further_reading), 1)
+
+    def test_source_features(self):
+        revision = Revision(**loads(self.revision2_line))
+        features = revision.get_reference_features("en")
+        self.assertEqual(features, [source.features("en") for source in revision.get_references()])
+        self.assertEqual([feature["text"] for feature in revision.get_further_reading_features("en")],
+                         [source.get_text() for source in revision.get_further_reading()])
+        self.assertEqual(features, revision.get_reference_features("en"))
+
+    def test_cache(self):
+        revision = Revision(**loads(self.revision2_line))
+        tree = revision.etree_from_html()
+        self.assertIs(revision.etree_from_html(), tree)
+        text = revision.get_text()
+        references = revision.get_references()
+        section_tree = revision.section_tree()
+        self.assertIs(revision.section_tree(), section_tree)
+        self.assertIs(revision.get_references()[0], references[0])
+        revision.release()
+        self.assertEqual(revision.cache, {})
+        self.assertIsNot(revision.etree_from_html(), tree)
+        self.assertEqual(revision.get_text(), text)
+
+    def test_section_tree_keeps_tree(self):
+        revision = Revision(**loads(self.revision2_line))
+        text = revision.get_text()
+        revision.section_tree()
+        revision.cache.pop("text")
+        self.assertEqual(revision.get_text(), text)
+        self.assertEqual(len(revision.get_references()), 192)
+
+    def test_pickle(self):
+        revision = Revision(**loads(self.revision1_line))
+        revision.get_references()
+        unpickled_revision = pickle.loads(pickle.dumps(revision))
+        self.assertEqual(unpickled_revision.cache, {})
+        self.assertEqual(len(unpickled_revision.get_references()), 8)
+        self.assertNotIn("cache", str(revision))
+
 if __name__ == "__main__":
     unittest.main()
 
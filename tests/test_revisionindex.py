@@ -0,0 +1,95 @@
+from code.article.revisionindex import RevisionIndex
+from os import remove
+from os.path import exists, sep
+from shutil import copyfile, rmtree
+from tempfile import mkdtemp
+import unittest
+
+class TestRevisionIndex(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = mkdtemp()
+        cls.filepath = cls.directory + sep + "6S_%2F_SsrS_RNA_en"
+        copyfile("tests/data/6S_%2F_SsrS_RNA_en", cls.filepath)
+        with open(cls.filepath) as file:
+            cls.lines = file.readlines()
+
+    @classmethod
+    def tearDownClass(cls):
+        rmtree(cls.directory)
+
+    def setUp(self):
+        with open(self.filepath, "w") as file:
+            file.write("".join(self.lines))
+        self.index = RevisionIndex(self.filepath)
+        self.index.update()
+
+    def test_entries(self):
+        self.assertEqual(len(self.index), 54)
+        self.assertEqual(self.index.entry(index=0)[RevisionIndex.REVID], 131124859)
+        self.assertEqual(self.index.entry(revid=997696733)[RevisionIndex.INDEX], 53)
+        self.assertEqual(self.index.entry(timestamp="2007-05-15T20:32:46Z")[RevisionIndex.INDEX], 0)
+        self.assertIsNone(self.index.entry(index=54))
+        with open(self.filepath, "rb") as file:
+            entry = self.index.entry(index=2)
+            file.seek(entry[RevisionIndex.OFFSET])
+            self.assertEqual(file.read(entry[RevisionIndex.LENGTH]).decode("utf-8"), self.lines[2])
+
+    def test_chronology(self):
+        self.assertIsNone(self.index.position_at("2007-01-01T00:00:00Z"))
+        self.assertEqual(self.index.position_at("2007-05-17T16:04:53Z"), 1)
+        self.assertEqual(self.index.position_at("2007-05-17T16:04:54Z"), 1)
+        self.assertEqual(self.index.positions_between("2007-05-15T20:32:46Z", "2007-05-31T22:10:37Z"), [0, 1, 2])
+        self.assertEqual(RevisionIndex(self.filepath).chronology, self.index.chronology)
+
+    def test_persistence(self):
+        self.assertTrue(exists(self.filepath + "_index.json"))
+        index = RevisionIndex(self.filepath)
+        self.assertFalse(index.update())
+        self.assertEqual(index.entries, self.index.entries)
+
+    def test_append(self):
+        with open(self.filepath, "w") as file:
+            file.write("".join(self.lines[:50]))
+        self.index.update()
+        self.assertEqual(len(self.index), 50)
+        with open(self.filepath, "a") as file:
+            file.write("".join(self.lines[50:]))
+        self.assertTrue(self.index.update())
+        self.assertEqual(len(self.index), 54)
+
+    def test_rewrite(self):
+        # The first two lines swapped end at the same offset with a line break, followed by further lines.
+        filepath = self.directory + sep + "rewritten_en"
+        with open(filepath, "w") as file:
+            file.write("".join(self.lines[:2]))
+        index = RevisionIndex(filepath)
+        index.update()
+        with open(filepath, "w") as file:
+            file.write("".join([self.lines[1], self.lines[0]] + self.lines[2:]))
+        self.assertTrue(index.update())
+        self.assertEqual([entry[RevisionIndex.INDEX] for entry in index.entries], [1, 0] + list(range(2, 54)))
+        self.assertEqual(RevisionIndex(filepath).tail, index.tail)
+        # Rewritten to the same size.
+        with open(filepath, "w") as file:
+            file.write("".join(self.lines[::-1]))
+        self.assertTrue(index.update())
+        self.assertEqual([entry[RevisionIndex.INDEX] for entry in index.entries], list(range(53, -1, -1)))
+        self.assertFalse(index.update())
+        remove(self.filepath + "_index.json")
+        rebuilt_index = RevisionIndex(self.filepath)
+        rebuilt_index.update()
+        self.assertEqual(self.index.entries, rebuilt_index.entries)
+        self.assertEqual(self.index.entry(revid=997696733)[RevisionIndex.INDEX], 53)
+
+    def test_rebuild(self):
+        with open(self.filepath, "w") as file:
+            file.write("".join(self.lines[1:]))
+        self.assertTrue(self.index.update())
+        self.assertEqual(len(self.index), 53)
+        self.assertIsNone(self.index.entry(revid=131124859))
+        self.assertEqual(self.index.entry(index=1)[RevisionIndex.OFFSET], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -97,6 +97,34 @@ class TestRevision(unittest.TestCase):
         self.assertEqual(["CRISPR Mechanism", "CRISPR Spacers and Repeats", "References"],
                          [section.name for section in self.revision1_section_tree.find(strings=["Re", "CRISPR"])])
 
+    def test_section_tree_ranges(self):
+        # Every child of the HTML element belongs to exactly one section, in document order.
+        elements = [element for section in self.revision2_section_tree.walk() for element in section.elements]
+        self.assertEqual(elements, list(self.revision2_section_tree.html))
+        history = self.revision2_section_tree.subsections[0]
+        self.assertIs(history.html, self.revision2_section_tree.html)
+        self.assertEqual(history.elements[0].xpath("string()").split("[edit]")[0].strip(), "History")
+        self.assertIs(history.next.prev, history)
+        self.assertIsNone(history.subsections[0].prev)
+
+    def test_lookup(self):
+        self.assertEqual(["root|History|Cas9"],
+                         [section.parent_path() for section in self.revision2_section_tree.lookup(" cas9  ")])
+        self.assertEqual([self.revision2_section_tree], self.revision2_section_tree.lookup("Root"))
+        self.assertEqual([], self.revision2_section_tree.lookup("FOOBAR"))
+        history = self.revision2_section_tree.find(["History"])[0]
+        self.assertEqual([], history.lookup("Mechanism"))
+
+    def test_get_sources(self):
+        with open("tests/data/revision2.json") as revision_file:
+            revision = Revision(**loads(revision_file.readline()))
+        references = revision.get_references()
+        for section in revision.section_tree().walk():
+            for level in [0, 1, -1]:
+                reference_ids = set(section.get_reference_ids(level))
+                self.assertEqual([source for source in references if not set(source.get_reference_ids()).isdisjoint(reference_ids)],
+                                 section.get_sources(references, level, revision.get_reference_map()))
+
     def test_find_reference_section_revision1(self):
         self.maxDiff = None
         reference_section_text_of_revision1 = \
@@ -0,0 +1,97 @@
+from code.article.sectionhistory import SectionHistory
+from code.article.article import Article
+from code.article.revision.revision import Revision
+from os.path import exists, sep
+from shutil import rmtree
+from tempfile import mkdtemp
+from json import dumps, loads
+import unittest
+
+class TestSectionHistory(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = mkdtemp()
+        cls.filepath = cls.directory + sep + "CRISPR_en"
+        cls.lines = []
+        for filename in ["tests/data/revision1.json", "tests/data/revision1.json", "tests/data/revision2.json"]:
+            with open(filename) as file:
+                cls.lines.append(file.readline().strip() + "\n")
+        # The second revision repeats the first one.
+        revision = loads(cls.lines[1])
+        revision["revid"] += 1
+        cls.lines[1] = dumps(revision) + "\n"
+        cls.revisions = [Revision(**loads(line)) for line in cls.lines]
+
+    @classmethod
+    def tearDownClass(cls):
+        rmtree(cls.directory)
+
+    def setUp(self):
+        with open(self.filepath, "w") as file:
+            file.writelines(self.lines[:2])
+        self.article = Article(self.filepath)
+        self.section_history = self.article.section_history(update=True)
+
+    def test_section_history(self):
+        self.assertTrue(exists(self.filepath + "_sections.json"))
+        self.assertEqual(len(self.section_history), 2)
+        sections = list(self.revisions[0].section_tree().walk())
+        self.assertEqual([key for key, _, _ in self.section_history.sections(0)], [section.parent_path() for section in sections])
+        self.assertEqual(self.section_history.sections(0), self.section_history.sections(1))
+        for section in sections:
+            self.assertEqual(self.section_history.changes(section.parent_path()), [0])
+            self.assertEqual(self.section_history.get_hash(section.parent_path(), 1), section.get_hash())
+        self.assertEqual(self.section_history.get_sources_hash(0), self.section_history.get_sources_hash(1))
+        self.assertIsNone(self.section_history.get_hash("root", 2))
+
+    def test_update(self):
+        with open(self.filepath, "a") as file:
+            file.write(self.lines[2])
+        self.assertFalse(self.article.section_history(update=True).update(self.article))
+        section_history = SectionHistory(self.filepath)
+        self.assertEqual(len(section_history), 3)
+        sections = list(self.revisions[2].section_tree().walk())
+        self.assertEqual([key for key, _, _ in section_history.sections(2)], [section.parent_path() for section in sections])
+        self.assertEqual(section_history.changes("root"), [0, 2])
+        self.assertNotEqual(section_history.get_sources_hash(1), section_history.get_sources_hash(2))
+        for key in section_history.hashes:
+            if key not in [section.parent_path() for section in sections]:
+                self.assertIsNone(section_history.get_hash(key, 2))
+
+    def test_rewrite(self):
+        with open(self.filepath, "w") as file:
+            file.writelines([self.lines[2], self.lines[0], self.lines[1]])
+        section_history = self.article.section_history(update=True)
+        self.assertEqual(len(section_history), 3)
+        for position, revision in enumerate([self.revisions[2], self.revisions[0], self.revisions[1]]):
+            sections = list(revision.section_tree().walk())
+            self.assertEqual([key for key, _, _ in section_history.sections(position)], [section.parent_path() for section in sections])
+            self.assertEqual(section_history.get_hash("root", position), sections[0].get_hash())
+        # The first two revisions only differ in their revision id, swapping them keeps the size.
+        with open(self.filepath, "w") as file:
+            file.writelines(self.lines[:2])
+        self.article.section_history(update=True)
+        with open(self.filepath, "w") as file:
+            file.writelines([self.lines[1], self.lines[0]])
+        self.assertTrue(self.article.section_history().update(self.article))
+        self.assertFalse(self.article.section_history().update(self.article))
+
+    def test_find(self):
+        for strings in [["Mechanism"], ["spacers", "links"], [""], ["History"]]:
+            sections = self.revisions[0].section_tree().find(strings, lower=True)
+            self.assertEqual(self.section_history.find(strings, 1, lower=True), [section.parent_path() for section in sections])
+
+    def test_state(self):
+        tree = self.revisions[0].section_tree()
+        section = tree.find(["Mechanism"], lower=True)[0]
+        key = section.parent_path()
+        self.assertEqual(self.section_history.state(key, 1), [[key, section.get_hash()]])
+        self.assertEqual(self.section_history.state(key, 0), self.section_history.state(key, 1))
+        self.assertEqual(self.section_history.state("root", 1), [["root", tree.get_hash()]])
+        self.assertEqual(self.section_history.state("root", 1, -1),
+                         [[subsection.parent_path(), subsection.get_hash()] for subsection in tree.walk()])
+        self.assertEqual(self.section_history.state("root|Missing", 1), [])
+
+if __name__ == "__main__":
+    unittest.main()
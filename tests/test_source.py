@@ -1,4 +1,4 @@
-from code.article.revision.source import Source
+from code.article.revision.source import Source, map_reference_ids
 from lxml import html
 import unittest
 
@@ -109,6 +109,25 @@ class TestSource(unittest.TestCase):
     def test_get_pmc(self):
         pmcs = self.source3.get_pmcs()
         self.assertEqual(pmcs, ["124276"])
+
+    def test_features(self):
+        for source in [self.source1, self.source2, self.source3]:
+            features = source.features("en")
+            self.assertEqual(features, {"text":source.get_text(),
+                                        "reference_ids":source.get_reference_ids(),
+                                        "title":source.get_title("en"),
+                                        "authors":source.get_authors("en"),
+                                        "dois":source.get_dois(),
+                                        "pmids":source.get_pmids(),
+                                        "pmcs":source.get_pmcs()})
+        self.assertEqual(self.source3.get_identifiers(), {"DOI":"10.1073/pnas.112047299", "PMID":"12032318", "PMC":"124276"})
         
+    def test_map_reference_ids(self):
+        source_map = map_reference_ids([self.source1, self.source3])
+        self.assertEqual(source_map["cite_ref-Groenen1993_24-0"], [0])
+        self.assertEqual(source_map["cite_ref-pmid12032318_21-0"], [1])
+        source_map = map_reference_ids([self.source1, self.source2])
+        self.assertEqual(source_map["cite_ref-Groenen1993_24-0"], [0, 1])
+
 if __name__ == "__main__":
     unittest.main()
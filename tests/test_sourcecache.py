@@ -0,0 +1,62 @@
+from code.article.revision.sourcecache import SourceCache
+from code.article.revision.revision import Revision
+import unittest
+from json import loads
+from os.path import sep
+from shutil import rmtree
+from tempfile import mkdtemp
+import pickle
+
+class TestSourceCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open("tests/data/revision2.json") as file:
+            cls.revision = Revision(**loads(file.readline()))
+        cls.sources = cls.revision.get_references()[:20]
+        cls.directory = mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        rmtree(cls.directory)
+
+    def test_get(self):
+        source_cache = SourceCache()
+        features = [source_cache.get(source, "en") for source in self.sources]
+        self.assertEqual(features, [source.features("en") for source in self.sources])
+        self.assertEqual(features, [source_cache.get(source, "en") for source in self.sources])
+        self.assertEqual(source_cache.hits, len(self.sources))
+        # Cached features cannot be altered by callers.
+        features[0]["authors"].append(("Doe", "J"))
+        self.assertEqual(source_cache.get(self.sources[0], "en"), self.sources[0].features("en"))
+
+    def test_key(self):
+        source_cache = SourceCache()
+        self.assertNotEqual(source_cache.key(self.sources[0], "en"), source_cache.key(self.sources[0], "de"))
+        self.assertNotEqual(source_cache.key(self.sources[0], "en"), source_cache.key(self.sources[1], "en"))
+
+    def test_maxsize(self):
+        source_cache = SourceCache(maxsize = 5)
+        for source in self.sources:
+            source_cache.get(source, "en")
+        self.assertEqual(len(source_cache), 5)
+        self.assertEqual(list(source_cache.features), [source_cache.key(source, "en") for source in self.sources[-5:]])
+
+    def test_database(self):
+        databasepath = self.directory + sep + "sources.db"
+        source_cache = SourceCache(databasepath = databasepath)
+        features = [source_cache.get(source, "en") for source in self.sources]
+        source_cache.close()
+        source_cache = pickle.loads(pickle.dumps(SourceCache(maxsize = 1, databasepath = databasepath)))
+        self.assertEqual(features, [source_cache.get(source, "en") for source in self.sources])
+        self.assertEqual((source_cache.hits, source_cache.misses), (len(self.sources), 0))
+        source_cache.close()
+
+    def test_revision_features(self):
+        source_cache = SourceCache()
+        self.assertEqual(self.revision.get_further_reading_features("de", source_cache),
+                         [source.features("de") for source in self.revision.get_further_reading()])
+        self.assertEqual(source_cache.misses, len(self.revision.get_further_reading()))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+from code.article.statistics import Statistics
+from code.article.article import Article
+from os.path import exists, sep
+from shutil import rmtree
+from tempfile import mkdtemp
+import unittest
+
+class TestStatistics(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = mkdtemp()
+        cls.filepath = cls.directory + sep + "6S_%2F_SsrS_RNA_en"
+        with open("tests/data/6S_%2F_SsrS_RNA_en") as file:
+            cls.lines = file.readlines()
+        with open(cls.filepath, "w") as file:
+            file.writelines(cls.lines)
+        cls.revisions = list(Article(cls.filepath).yield_revisions())
+
+    @classmethod
+    def tearDownClass(cls):
+        rmtree(cls.directory)
+
+    def setUp(self):
+        with open(self.filepath, "w") as file:
+            file.writelines(self.lines)
+        self.statistics = Statistics(self.filepath)
+        self.statistics.update()
+
+    def test_statistics(self):
+        self.assertEqual(self.statistics.timestamps, [revision.timestamp.timestamp_string() for revision in self.revisions])
+        self.assertEqual(len(self.statistics.months), (2021 - 2007 + 1) * 12)
+        self.assertEqual(list(self.statistics.months)[0], "2007/01")
+        self.assertEqual(list(self.statistics.months)[-1], "2021/12")
+        self.assertEqual(self.statistics.months["2007/05"], len([revision for revision in self.revisions if revision.timestamp.timestamp_string().startswith("2007-05")]))
+        self.assertEqual(sum(self.statistics.months.values()), 54)
+        self.assertEqual(self.statistics.size_differences[0], self.revisions[0].size)
+        self.assertEqual(self.statistics.size_differences[1], self.revisions[1].size - self.revisions[0].size)
+        self.assertEqual(sum(self.statistics.editors.values()), 54)
+        self.assertEqual(self.statistics.editors["WillowW"], len([revision for revision in self.revisions if revision.user == "WillowW"]))
+
+    def test_cache(self):
+        self.assertTrue(exists(self.filepath + "_statistics.json"))
+        statistics = Statistics(self.filepath)
+        self.assertFalse(statistics.update())
+        self.assertEqual(statistics.months, self.statistics.months)
+        with open(self.filepath, "w") as file:
+            file.writelines(self.lines[:10])
+        self.assertTrue(statistics.update())
+        self.assertEqual(len(statistics.timestamps), 10)
+
+    def test_partial_line(self):
+        with open(self.filepath, "w") as file:
+            file.writelines(self.lines[:10] + [self.lines[10][:100]])
+        statistics = Statistics(self.filepath)
+        self.assertTrue(statistics.update())
+        self.assertEqual(len(statistics.timestamps), 10)
+        self.assertFalse(statistics.update())
+        with open(self.filepath, "a") as file:
+            file.write(self.lines[10][100:])
+        self.assertTrue(statistics.update())
+        self.assertEqual(len(statistics.timestamps), 11)
+
+    def test_rewrite(self):
+        with open(self.filepath, "w") as file:
+            file.writelines(self.lines[::-1])
+        statistics = Statistics(self.filepath)
+        self.assertTrue(statistics.update())
+        self.assertEqual(statistics.timestamps, self.statistics.timestamps[::-1])
+        self.assertFalse(statistics.update())
+        article = Article(self.filepath)
+        self.assertEqual(article.statistics().timestamps, statistics.timestamps)
+        with open(self.filepath, "w") as file:
+            file.writelines(self.lines)
+        self.assertFalse(statistics.current())
+        self.assertEqual(article.statistics().timestamps, self.statistics.timestamps)
+
+    def test_article(self):
+        article = Article(self.filepath)
+        self.assertEqual(article.statistics().timestamps, self.statistics.timestamps)
+        self.assertEqual(article.calculate_revision_size_difference(), self.statistics.size_differences)
+
+if __name__ == "__main__":
+    unittest.main()
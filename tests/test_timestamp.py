@@ -1,4 +1,6 @@
-from code.article.revision.timestamp import Timestamp
+from code.article.revision.timestamp import Timestamp, column_months, column_years, parse_timestamp, timestamp_column
+from datetime import datetime
+import numpy as np
 import unittest
 
 class TestTimestamp(unittest.TestCase):
@@ -16,6 +18,25 @@ class TestTimestamp(unittest.TestCase):
                                           " 'year': 2020}"))
         self.assertEqual(timestamp_string, timestamp.timestamp_string())
 
+    def test_parse_timestamp(self):
+        self.assertEqual(parse_timestamp("2020-07-06T17:10:20Z"), datetime(2020, 7, 6, 17, 10, 20))
+        # Strings of other formats are left to strptime.
+        self.assertEqual(parse_timestamp("2020-7-06T17:10:20Z"), datetime(2020, 7, 6, 17, 10, 20))
+        self.assertEqual(Timestamp("2020-7-06T17:10:20Z").string, "2020-07-06 17:10:20")
+        for timestamp_string in ["2021-02-29T00:00:00Z", "2020-07-06 17:10:20", "2020-07-0xT17:10:20Z"]:
+            with self.assertRaises(ValueError):
+                Timestamp(timestamp_string)
+        with self.assertRaises(AttributeError):
+            Timestamp("2020-07-06T17:10:20Z").weekday = 0
+
+    def test_timestamp_column(self):
+        column = timestamp_column(["2019-12-31T23:59:59Z", "2020-07-06T17:10:20Z"])
+        self.assertEqual(column.dtype, np.dtype("datetime64[s]"))
+        self.assertEqual(column_years(column).tolist(), [2019, 2020])
+        self.assertEqual(column_months(column).tolist(), [12, 7])
+        self.assertEqual(column[1].item(), datetime(2020, 7, 6, 17, 10, 20))
+        self.assertEqual(len(timestamp_column([])), 0)
+
 if __name__ == "__main__":
     unittest.main()
 